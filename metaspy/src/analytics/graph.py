@@ -3,13 +3,11 @@ from ..repository import person_repository
 import matplotlib.pyplot as plt
 
 
-persons = person_repository.get_persons()
-
-
 def create_relationship_graph():
     """
     Create a graph of connections between Person objects based on their Friends
     """
+    persons = person_repository.get_persons()
     G = nx.DiGraph()
 
     for person in persons:
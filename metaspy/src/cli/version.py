@@ -1,5 +1,4 @@
-from rich import print as rprint
-from rich.console import Console
+from rich import get_console, print as rprint
 
 from .baner import print_banner
 
@@ -11,7 +10,7 @@ def return_version_info() -> None:
     Return the version of the package.
     """
 
-    console = Console()
+    console = get_console()
     print_banner(console)
 
     text = f"You are using {VERSION} version of the Meta Spy. For more info visit https://github.com/DEENUU1/facebook-spy"
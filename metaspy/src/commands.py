@@ -1,31 +1,18 @@
 import subprocess
+import sys
+from typing import Optional
 from time import time
 import typer
 from dotenv import load_dotenv
 from rich import print as rprint
 
 from .cli.version import return_version_info
-
-from .facebook.account.account_basic import AccountBasic
-from .facebook.account.account_events import AccountEvents
-from .facebook.account.account_friend import AccountFriend
-from .facebook.account.account_group import AccountGroup
-from .facebook.account.account_image import AccountImage
-from .facebook.account.account_like import AccountLike
-from .facebook.account.account_post import AccountPost
-from .facebook.account.account_recentplace import AccountRecentPlaces
-from .facebook.account.account_reel import AccountReel
-from .facebook.account.account_review import AccountReview
-from .facebook.account.account_videos import AccountVideo
-from .facebook.downloader import Downloader
-from .facebook.login import FacebookLogIn
-from .facebook.post_detail import pipeline
+from .config import Config
+from .facebook.download_order import DownloadOrder
+from .utils.import_section import ImportSection
 from .logs import Logs
-from .analytics.graph import create_relationship_graph
-from .repository import crawlerqueue_repository
+from .reporting import Verbosity, reporter
 from .scripts.urlid import get_account_id
-from .facebook.search import search_post, search as search_scraper
-from .instagram.instagram_profile import ProfileScraper
 from .utils.check_instagram_sessionid import check_instagram_sessionid
 from typing_extensions import Annotated
 
@@ -37,6 +24,46 @@ app = typer.Typer(
 )
 
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Annotated[
+        bool,
+        typer.Option(help="Profile CPU usage of the command and save a pstats file"),
+    ] = False,
+    memprofile: Annotated[
+        bool,
+        typer.Option(
+            help="Trace memory allocations of every pipeline and save a report"
+        ),
+    ] = False,
+    quiet: Annotated[
+        bool,
+        typer.Option("--quiet", "-q", help="Don't print anything to the terminal"),
+    ] = False,
+    verbose: Annotated[
+        bool,
+        typer.Option("--verbose", "-v", help="Print every extracted item"),
+    ] = False,
+) -> None:
+    # Daemon runs many commands in one process, so verbosity is always set
+    if quiet:
+        reporter.set_verbosity(Verbosity.QUIET)
+    elif verbose:
+        reporter.set_verbosity(Verbosity.VERBOSE)
+    else:
+        reporter.set_verbosity(Verbosity.NORMAL)
+
+    if profile or memprofile:
+        from .profiling import Profiler
+
+        # invoked_subcommand is None when the callback runs without a command
+        name = ctx.invoked_subcommand or ctx.info_name
+        profiler = Profiler(name, cpu=profile, memory=memprofile)
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
+
+
 @app.command()
 def version() -> None:
     """Display data about the project version"""
@@ -60,6 +87,78 @@ def server() -> None:
         rprint(f"An error occurred {e}")
 
 
+""" Daemon """
+
+
+def submit_job() -> None:
+    """Add the current command to the daemon queue instead of running it
+    Global options (e.g. --quiet, --profile) are not saved, they apply to the daemon itself
+    """
+    import click
+    from .repository import job_repository
+
+    command = click.get_current_context().info_name
+    argv = sys.argv[1:]
+    start = argv.index(command) if command in argv else 0
+    arguments = [argument for argument in argv[start:] if argument != "--submit"]
+    job = job_repository.create_job(arguments)
+    rprint(f"Job {job.id} queued: {' '.join(arguments)}")
+
+
+@app.command()
+def daemon() -> None:
+    """Run jobs added with --submit, Chrome and the database stay open between jobs"""
+    from .daemon import Daemon
+
+    Daemon(lambda arguments: app(arguments, standalone_mode=False)).run()
+
+
+@app.command()
+def jobs(
+    limit: Annotated[int, typer.Option(help="Number of the newest jobs")] = 20
+) -> None:
+    """Display status and duration of daemon jobs"""
+    from rich.table import Table
+    from .repository import job_repository
+
+    table = Table(title="Jobs")
+    for column in ("ID", "Command", "Status", "Created", "Duration [s]", "Error"):
+        table.add_column(column)
+    for job in job_repository.get_jobs(limit):
+        table.add_row(
+            str(job.id),
+            " ".join(job.arguments),
+            job.status.value,
+            job.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            f"{job.duration:.1f}" if job.duration is not None else "",
+            job.error or "",
+        )
+    rprint(table)
+
+
+""" Database """
+
+
+@app.command()
+def init_db() -> None:
+    """Create database tables"""
+    from .database import init_db as create_tables
+
+    create_tables()
+    rprint(f"✅ Database created: {Config.DATABASE_URL} ✅")
+
+
+@app.command()
+def migrate() -> None:
+    """Add tables, columns and indexes missing in the existing database"""
+    from .database import migrate as migrate_database
+
+    changes = migrate_database()
+    for change in changes:
+        rprint(f" - {change}")
+    rprint(f"✅ Database is up to date, {len(changes)} changes applied ✅")
+
+
 """ Crawler """
 
 
@@ -70,6 +169,8 @@ def friend_crawler(
     # At first the function is scraping a list of friends for specified user
     # Create Person and Friend objects just like in a standard friend scraper
     # But also it create CrawlerQueue objects with url to friend facebook accounts
+    from .facebook.account.account_friend import AccountFriend
+    from .repository import crawlerqueue_repository
 
     rprint(f"Start crawler from {name}")
 
@@ -98,6 +199,7 @@ def display_queue() -> None:
     """
     Display queue objects
     """
+    from .repository import crawlerqueue_repository
 
     queue_data = crawlerqueue_repository.get_crawler_queues_status_false()
     if len(queue_data) == 0:
@@ -117,6 +219,7 @@ def delete_queue_object(
     """
     Delete a specified queue object based on id from db
     """
+    from .repository import crawlerqueue_repository
 
     if crawlerqueue_repository.delete_crawler_queue(id):
         rprint("✅ Queue object deleted ✅")
@@ -129,6 +232,8 @@ def clear_queue() -> None:
     """
     Clear the queue of crawler
     """
+    from .repository import crawlerqueue_repository
+
     delete = crawlerqueue_repository.delete_all()
     if delete:
         rprint("✅ Queue cleared ✅")
@@ -142,15 +247,74 @@ def clear_queue() -> None:
 @app.command()
 def graph() -> None:
     """Create a graph of connections between Person objects based on their Friends"""
+    from .analytics.graph import create_relationship_graph
+
     create_relationship_graph()
 
 
+@app.command()
+def export(
+    incremental: Annotated[
+        bool,
+        typer.Option(help="Export only rows added since the last export"),
+    ] = False,
+    path: Annotated[
+        str, typer.Option(help="Directory for Parquet files, one directory per table")
+    ] = Config.EXPORT_PATH,
+) -> None:
+    """Export all tables to Parquet files"""
+    try:
+        from .utils.export_parquet import ParquetExporter
+    except ImportError:
+        rprint("pyarrow is required for export, install it with: pip install pyarrow")
+        return
+
+    time_start = time()
+    try:
+        ParquetExporter(path, incremental=incremental).export()
+    except Exception as e:
+        rprint(f"❌Export failed: {e} ❌")
+        raise typer.Exit(code=1)
+    time_end = time()
+
+    rprint(f"Export finished after {time_end - time_start} seconds")
+
+
+@app.command(name="import")
+def import_data(
+    path: Annotated[
+        str,
+        typer.Argument(help="Directory or file with scraped data (JSON or JSONL)"),
+    ] = Config.JSON_FILE_PATH,
+    workers: Annotated[
+        int, typer.Option(help="Number of processes decoding files")
+    ] = Config.IMPORT_WORKERS,
+    section: Annotated[
+        Optional[ImportSection],
+        typer.Option(
+            help="Section of legacy JSON files which can't be recognized (e.g. lists of urls)"
+        ),
+    ] = None,
+) -> None:
+    """Load scraped data files into the database, existing rows are skipped"""
+    from .utils.import_data import DataImporter
+
+    time_start = time()
+    DataImporter(
+        path, workers=workers, section=section.value if section else None
+    ).import_data()
+    time_end = time()
+
+    rprint(f"Import finished after {time_end - time_start} seconds")
+
+
 """ Facebook Login """
 
 
 @app.command()
 def login_2_step() -> None:
     """Log in to facebook account with 2-step authentication"""
+    from .facebook.login import FacebookLogIn
 
     facebook = FacebookLogIn()
 
@@ -167,6 +331,7 @@ def login_2_step() -> None:
 @app.command()
 def login() -> None:
     """Log in to facebook account without 2-step authentication"""
+    from .facebook.login import FacebookLogIn
 
     facebook = FacebookLogIn()
 
@@ -188,6 +353,7 @@ def download_video(
     url: Annotated[str, typer.Argument(help="Facebook video url")]
 ) -> None:
     """Download single video"""
+    from .facebook.downloader import Downloader
 
     rprint(f"Start downloading video")
     scraper = Downloader()
@@ -208,13 +374,14 @@ def download_video(
 @app.command()
 def post_details(url: Annotated[str, typer.Argument(help="Facebook post url")]) -> None:
     """Scrape detail of specified post"""
+    from .facebook.post_detail import pipeline
 
     rprint(f"Start scraping posts details")
 
     time_start = time()
 
     scraper_pipeline = pipeline(post_url=url)
-    print(scraper_pipeline)
+    rprint(scraper_pipeline)
 
     time_end = time()
 
@@ -285,65 +452,114 @@ def fb_account(
     events: Annotated[
         bool, typer.Option(help="Scrape events from the given facebook account")
     ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            help="Scrape only new friends, posts, images and videos, stop scrolling after a run of already saved items"
+        ),
+    ] = False,
+    trace: Annotated[
+        bool,
+        typer.Option(help="Save a Chrome trace of this run to the traces directory"),
+    ] = False,
+    workers: Annotated[
+        int, typer.Option(help="Number of videos downloaded at the same time")
+    ] = Config.VIDEO_DOWNLOAD_WORKERS,
+    order: Annotated[
+        Optional[DownloadOrder],
+        typer.Option(help="Download the largest or the smallest videos first"),
+    ] = None,
+    submit: Annotated[
+        bool,
+        typer.Option(help="Add the command to the daemon queue instead of running it"),
+    ] = False,
 ) -> None:
-    time_start = time()
+    if submit:
+        submit_job()
+        return
 
-    if work:
-        wae = AccountBasic(id)
-        wae.work_and_education_pipeline()
-    if contact:
-        c = AccountBasic(id)
-        c.contact_pipeline()
-    if location:
-        l = AccountBasic(id)
-        l.localization_pipeline()
-    if family:
-        fm = AccountBasic(id)
-        fm.family_member_pipeline()
-    if name:
-        fn = AccountBasic(id)
-        fn.full_name_pipeline()
-    if friends:
-        friend_scraper = AccountFriend(id)
-        friend_scraper.pipeline()
-    if images:
-        images_scraper = AccountImage(id)
-        images_scraper.pipeline()
-    if recent:
-        recent_scraper = AccountRecentPlaces(id)
-        recent_scraper.pipeline()
-    if reels:
-        reels_scraper = AccountReel(id)
-        reels_scraper.pipeline()
-    if reviews:
-        reviews_scraper = AccountReview(id)
-        reviews_scraper.pipeline()
-    if videos:
-        videos_scraper = AccountVideo(id)
-        videos_scraper.save_video_urls_to_database_pipeline()
-    if dn or da:
-        downloader = Downloader(id)
-        if da:
-            downloader.download_all_person_videos_pipeline()
-        if dn:
-            downloader.download_new_person_videos_pipeline()
-    if posts:
-        posts_scraper = AccountPost(id)
-        posts_scraper.pipeline()
-    if details:
-        pipeline(name=id)
-    if likes:
-        likes_scraper = AccountLike(id)
-        likes_scraper.pipeline()
-    if groups:
-        groups_scraper = AccountGroup(id)
-        groups_scraper.pipeline()
-    if events:
-        events_scraper = AccountEvents(id)
-        events_scraper.pipeline()
+    from .facebook.account.account_basic import AccountBasic
+    from .facebook.account.account_events import AccountEvents
+    from .facebook.account.account_friend import AccountFriend
+    from .facebook.account.account_group import AccountGroup
+    from .facebook.account.account_image import AccountImage
+    from .facebook.account.account_like import AccountLike
+    from .facebook.account.account_post import AccountPost
+    from .facebook.account.account_recentplace import AccountRecentPlaces
+    from .facebook.account.account_reel import AccountReel
+    from .facebook.account.account_review import AccountReview
+    from .facebook.account.account_videos import AccountVideo
+    from .facebook.downloader import Downloader
+    from .facebook.post_detail import pipeline
+    from .tracing import tracer
 
-    time_end = time()
-    print(f"Scraping finished after {time_end - time_start} seconds")
+    time_start = time()
+    if trace:
+        tracer.start()
+
+    try:
+        if work:
+            wae = AccountBasic(id)
+            wae.work_and_education_pipeline()
+        if contact:
+            c = AccountBasic(id)
+            c.contact_pipeline()
+        if location:
+            l = AccountBasic(id)
+            l.localization_pipeline()
+        if family:
+            fm = AccountBasic(id)
+            fm.family_member_pipeline()
+        if name:
+            fn = AccountBasic(id)
+            fn.full_name_pipeline()
+        if friends:
+            friend_scraper = AccountFriend(id, incremental=incremental)
+            friend_scraper.pipeline()
+        if images:
+            images_scraper = AccountImage(id, incremental=incremental)
+            images_scraper.pipeline()
+        if recent:
+            recent_scraper = AccountRecentPlaces(id)
+            recent_scraper.pipeline()
+        if reels:
+            reels_scraper = AccountReel(id)
+            reels_scraper.pipeline()
+        if reviews:
+            reviews_scraper = AccountReview(id)
+            reviews_scraper.pipeline()
+        if videos:
+            videos_scraper = AccountVideo(id, incremental=incremental)
+            videos_scraper.save_video_urls_to_database_pipeline()
+        if dn or da:
+            downloader = Downloader(id, workers=workers, order=order)
+            if da:
+                downloader.download_all_person_videos_pipeline()
+            if dn:
+                downloader.download_new_person_videos_pipeline()
+        if posts:
+            posts_scraper = AccountPost(id, incremental=incremental)
+            posts_scraper.pipeline()
+        if details:
+            pipeline(name=id)
+        if likes:
+            likes_scraper = AccountLike(id)
+            likes_scraper.pipeline()
+        if groups:
+            groups_scraper = AccountGroup(id)
+            groups_scraper.pipeline()
+        if events:
+            events_scraper = AccountEvents(id)
+            events_scraper.pipeline()
+
+        time_end = time()
+        rprint(f"Scraping finished after {time_end - time_start} seconds")
+
+    finally:
+        # Trace of a failed run shows where it failed
+        if trace:
+            tracer.stop()
+            rprint(f"Trace saved to {tracer.save(id)}")
 
 
 """ Facebook search """
@@ -371,30 +587,54 @@ def fb_search(
     page: Annotated[
         bool, typer.Option(help="Search for pages based on given query")
     ] = False,
+    trace: Annotated[
+        bool,
+        typer.Option(help="Save a Chrome trace of this run to the traces directory"),
+    ] = False,
+    submit: Annotated[
+        bool,
+        typer.Option(help="Add the command to the daemon queue instead of running it"),
+    ] = False,
 ) -> None:
-    time_start = time()
+    if submit:
+        submit_job()
+        return
 
-    if post:
-        post_scraper = search_post.SearchPost(query, results)
-        post_scraper.pipeline()
-    if people:
-        people_scraper = search_scraper.SearchPerson(query, results)
-        people_scraper.pipeline()
-    if group:
-        group_scraper = search_scraper.SearchGroup(query, results)
-        group_scraper.pipeline()
-    if place:
-        places_scraper = search_scraper.SearchPlaces(query, results)
-        places_scraper.pipeline()
-    if event:
-        event_scraper = search_scraper.SearchEvents(query, results)
-        event_scraper.pipeline()
-    if page:
-        page_scraper = search_scraper.SearchPage(query, results)
-        page_scraper.pipeline()
+    from .facebook.search import search_post, search as search_scraper
+    from .tracing import tracer
 
-    time_end = time()
-    print(f"Scraping finished after {time_end - time_start} seconds")
+    time_start = time()
+    if trace:
+        tracer.start()
+
+    try:
+        if post:
+            post_scraper = search_post.SearchPost(query, results)
+            post_scraper.pipeline()
+        if people:
+            people_scraper = search_scraper.SearchPerson(query, results)
+            people_scraper.pipeline()
+        if group:
+            group_scraper = search_scraper.SearchGroup(query, results)
+            group_scraper.pipeline()
+        if place:
+            places_scraper = search_scraper.SearchPlaces(query, results)
+            places_scraper.pipeline()
+        if event:
+            event_scraper = search_scraper.SearchEvents(query, results)
+            event_scraper.pipeline()
+        if page:
+            page_scraper = search_scraper.SearchPage(query, results)
+            page_scraper.pipeline()
+
+        time_end = time()
+        rprint(f"Scraping finished after {time_end - time_start} seconds")
+
+    finally:
+        # Trace of a failed run shows where it failed
+        if trace:
+            tracer.stop()
+            rprint(f"Trace saved to {tracer.save('search')}")
 
 
 """ Instagram """
@@ -409,8 +649,17 @@ def insta_account(
     stats: Annotated[
         bool, typer.Option(help="Scrape stats from the given instagram account")
     ] = False,
+    submit: Annotated[
+        bool,
+        typer.Option(help="Add the command to the daemon queue instead of running it"),
+    ] = False,
 ) -> None:
     """Scrape instagram account"""
+    if submit:
+        submit_job()
+        return
+
+    from .instagram.instagram_profile import ProfileScraper
 
     time_start = time()
 
@@ -10,10 +10,20 @@ class Config:
     Configuration class for the application.
     """
 
+    # Database, tables are created with init-db command
+    DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///database.db"
+
+    # Seconds between checks of the job queue when the daemon is idle
+    DAEMON_POLL_INTERVAL = 2
+
     # Scrolling
     SCROLL_PAUSE_TIME = 3
     MAX_CONSECUTIVE_SCROLLS = 1
 
+    # Incremental scraping
+    # Stop scrolling after this many consecutive already known items
+    INCREMENTAL_STOP_AFTER = 10
+
     # Facebook login
     FACEBOOK_EMAIL = os.getenv("FACEBOOK_EMAIL")
     FACEBOOK_PASSWORD = os.getenv("FACEBOOK_PASSWORD")
@@ -25,10 +35,84 @@ class Config:
 
     # logs
     LOG_FILE_PATH = "logs.log"
+    # Log file is rotated after this size in bytes, this many old files are kept
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+
+    # Number of scraped items printed at the end of a pipeline, all are printed with --verbose
+    PRINT_PREVIEW_ITEMS = 10
+
+    # Print number and duration of WebDriver commands when a pipeline ends
+    PRINT_WEBDRIVER_STATS = True
+
+    # Lean browser mode: headless, smaller window, pages are ready before images and
+    # stylesheets load, fonts, media and images are blocked. Scrapers reading images load them.
+    # Turned on with BROWSER_LEAN=true (and BROWSER_HEADLESS=true) in .env
+    BROWSER_LEAN = (os.getenv("BROWSER_LEAN") or "").lower() == "true"
+    BROWSER_HEADLESS = (os.getenv("BROWSER_HEADLESS") or "").lower() == "true"
+    BROWSER_WINDOW_SIZE = (1280, 900)
+    BROWSER_BLOCKED_URLS = [
+        "*.woff*",
+        "*.ttf*",
+        "*.otf*",
+        "*.mp4*",
+        "*.m4a*",
+        "*.webm*",
+        "*.m3u8*",
+    ]
+    BROWSER_BLOCKED_IMAGE_URLS = ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*"]
+
+    # Extraction backend: "dom" reads rendered pages, "network" reads JSON responses of
+    # Facebook API captured from the performance log of Chrome (friends, posts, photos, search)
+    EXTRACTION_BACKEND = os.getenv("EXTRACTION_BACKEND") or "dom"
+
+    # Chrome profiles (cache, cookies) are kept in this directory between runs
+    BROWSER_PERSISTENT_PROFILES = True
+    BROWSER_PROFILE_PATH = "browser_profiles/"
+    # Number of profiles in BROWSER_PROFILE_PATH, more Chrome instances get temporary profiles
+    BROWSER_MAX_PROFILES = 8
+    # Number of Chrome instances started in advance by the daemon
+    BROWSER_POOL_SIZE = 1
+
+    # Traces
+    TRACE_PATH = "traces/"
+
+    # Profiling
+    PROFILE_PATH = "profiles/"
+    # Number of lines with the biggest allocations in memory report
+    MEMPROFILE_TOP = 10
 
     # Json
     JSON_FILE_PATH = "scraped_data/"
 
+    # Import of scraped data, files are decoded by worker processes
+    IMPORT_WORKERS = 4
+    # Number of rows inserted in one transaction
+    IMPORT_BATCH_SIZE = 10_000
+
+    # Parquet export, one directory per table
+    EXPORT_PATH = "exports/"
+    EXPORT_CHUNK_SIZE = 50_000
+
+    # Content-addressed store, images and videos directories link to its files
+    MEDIA_STORE_PATH = "media_store/"
+    # Number of media files downloaded at the same time, in total and from a single host
+    MEDIA_FETCH_CONCURRENCY = 16
+    MEDIA_FETCH_PER_HOST = 8
+    # Timeout of a single media download in seconds
+    MEDIA_FETCH_TIMEOUT = 60
+    # Failed and partial downloads are retried in later runs up to this number of attempts
+    MEDIA_MAX_ATTEMPTS = 5
+    # Images are recognized by their first bytes, full decoding with PIL is optional
+    MEDIA_VERIFY_IMAGES = False
+    MEDIA_VERIFY_WORKERS = 2
+    # Images with perceptual hashes differing in at most this number of bits are near-duplicates
+    PHASH_MAX_DISTANCE = 6
+    PHASH_WORKERS = 2
+    # Thumbnails served by the local web application, width and height limit in pixels
+    THUMBNAIL_SIZES = (128, 512)
+    THUMBNAIL_WORKERS = 2
+
     # images
     IMAGE_PATH = "images/"
     DOCKER_IMAGE_PATH = "/app/metaspy"
@@ -36,6 +120,10 @@ class Config:
     # videos
     VIDEO_PATH = "videos/"
     DOCKER_VIDEO_PATH = "/app/metaspy"
+    # Number of videos downloaded at the same time
+    VIDEO_DOWNLOAD_WORKERS = 4
+    # Number of downloaded videos marked in the database in one transaction
+    VIDEO_DOWNLOAD_BATCH_SIZE = 20
 
     # Facebook paths
     FRIEND_LIST_URL = "friends"
@@ -44,6 +132,7 @@ class Config:
     FAMILY_URL = "about_family_and_relationships"
     CONTACT_URL = "about_contact_and_basic_info"
 
-    # Save to json
-    INDENT = 4
-    ENSURE_ASCII = False
+    # Scraped data is appended to JSONL files, a new file is started after this size in bytes
+    JSONL_ROTATE_SIZE = 64 * 1024 * 1024
+    # None, "gzip" or "zstd" (requires zstandard package)
+    JSONL_COMPRESSION = None
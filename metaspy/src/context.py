@@ -0,0 +1,10 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Pipeline, account and step that are currently running
+# Shared by metrics, tracing and logs to label recorded data
+current_pipeline: ContextVar[Optional[str]] = ContextVar(
+    "current_pipeline", default=None
+)
+current_account: ContextVar[Optional[str]] = ContextVar("current_account", default=None)
+current_step: ContextVar[Optional[str]] = ContextVar("current_step", default=None)
@@ -0,0 +1,84 @@
+import uuid
+from time import perf_counter, sleep
+from typing import Callable, List, Optional
+
+from rich import print as rprint
+
+from .config import Config
+from .facebook.driver import browser_pool
+from .facebook.scraper import Scraper
+from .logs import Logs
+from .metrics import metrics
+from .models import Job
+from .reporting import reporter
+from .repository import job_repository
+
+logs = Logs()
+
+
+class Daemon:
+    """
+    Run queued jobs one after another in a single process
+
+    Imports, the database engine and the browser pool are set up once and reused by all jobs,
+    so a job only pays for the scraping itself. Metrics of every job are saved
+    with its own run_id.
+    """
+
+    def __init__(
+        self,
+        run_command: Callable[[List[str]], None],
+        poll_interval: float = Config.DAEMON_POLL_INTERVAL,
+    ) -> None:
+        self.run_command = run_command
+        self.poll_interval = poll_interval
+
+    def run_job(self, job: Job) -> Optional[str]:
+        """Run the job and save its status and duration, return error message if it failed"""
+        rprint(f"[bold]Job {job.id}: {' '.join(job.arguments)}[/bold]")
+        error = None
+        verbosity = reporter.verbosity
+        start = perf_counter()
+        try:
+            self.run_command(job.arguments)
+        except SystemExit as e:
+            if e.code:
+                error = f"Exit code {e.code}"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logs.log_error(f"Job {job.id} failed: {error}")
+        finally:
+            # Verbosity set by the job (e.g. --quiet) doesn't apply to the daemon
+            reporter.set_verbosity(verbosity)
+
+        duration = perf_counter() - start
+        job_repository.finish_job(job.id, duration, error)
+        status = f"[red]failed: {error}[/red]" if error else "[green]done[/green]"
+        rprint(f"Job {job.id} {status} after {duration:.1f} seconds")
+        return error
+
+    def run_next_job(self) -> bool:
+        """Run the oldest queued job, return False if the queue is empty"""
+        metrics.run_id = uuid.uuid4().hex
+        job = job_repository.claim_next_job(metrics.run_id)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def run(self) -> None:
+        """Run jobs until interrupted"""
+        requeued = job_repository.requeue_running_jobs()
+        if requeued:
+            rprint(f"{requeued} unfinished jobs queued again")
+
+        try:
+            browser_pool.start(Scraper._chrome_driver_configuration)
+            rprint("Waiting for jobs, press Ctrl+C to stop")
+            while True:
+                if not self.run_next_job():
+                    sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            rprint("Daemon stopped")
+        finally:
+            browser_pool.close()
@@ -1,14 +1,93 @@
-from sqlalchemy import create_engine
+from typing import List, Optional
+
+from sqlalchemy import bindparam, create_engine, func, inspect, select, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
+from .config import Config
 from .models import Base
+from .tracing import trace_engine
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
 
-db_path = "sqlite:///database.db"
 
-engine = create_engine(db_path, max_overflow=-1)
-Base.metadata.create_all(bind=engine)
-Session = sessionmaker(bind=engine)
+def get_engine() -> Engine:
+    """Return engine of Config.DATABASE_URL, it's created on first use
+    Schema isn't created here, use init-db or migrate command"""
+    global _engine, _session_factory
+    if _engine is None:
+        _engine = create_engine(Config.DATABASE_URL, max_overflow=-1)
+        trace_engine(_engine)
+        _session_factory = sessionmaker(bind=_engine)
+    return _engine
 
 
 def get_session():
-    return Session()
+    get_engine()
+    return _session_factory()
+
+
+def init_db() -> None:
+    """Create all tables"""
+    Base.metadata.create_all(bind=get_engine())
+
+
+def _has_duplicates(connection, table, index) -> bool:
+    """Return True if rows of the table have the same values of the index columns"""
+    columns = list(index.columns)
+    duplicate = connection.execute(
+        select(*columns).group_by(*columns).having(func.count() > 1).limit(1)
+    ).first()
+    return duplicate is not None
+
+
+def migrate() -> List[str]:
+    """Create missing tables, columns and indexes, return applied changes
+    Columns are never changed or dropped, added columns of existing rows get the scalar
+    default of the model column, other added columns are empty"""
+    engine = get_engine()
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    changes = []
+
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                table.create(connection)
+                changes.append(f"Created table {table.name}")
+                continue
+
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                    )
+                )
+                if column.default is not None and column.default.is_scalar:
+                    # Typed parameter converts the value like the column does (e.g. enums)
+                    value = bindparam("value", column.default.arg, type_=column.type)
+                    connection.execute(
+                        text(
+                            f'UPDATE "{table.name}" SET "{column.name}" = :value'
+                        ).bindparams(value)
+                    )
+                changes.append(f"Added column {table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in indexes:
+                    continue
+                if index.unique and _has_duplicates(connection, table, index):
+                    changes.append(
+                        f"Skipped unique index {index.name}, {table.name} has duplicate rows"
+                    )
+                    continue
+                index.create(connection)
+                changes.append(f"Created index {index.name}")
+
+    return changes
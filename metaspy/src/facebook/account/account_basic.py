@@ -7,6 +7,7 @@ from selenium.webdriver.common.by import By
 from ..facebook_base import BaseFacebookScraper
 from ...config import Config
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import (
     person_repository,
     work_education_repository,
@@ -32,11 +33,7 @@ class AccountBasic(BaseFacebookScraper):
         """Check if pipeline is successful"""
         return self.success
 
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
-
+    @metrics.timed("extract")
     def extract_full_name(self) -> Optional[str]:
         """Extract full name from homepage"""
         data = None
@@ -52,6 +49,7 @@ class AccountBasic(BaseFacebookScraper):
 
         return data
 
+    @metrics.timed("extract")
     def extract_work_and_education(self) -> List[Dict[str, str]]:
         """Return employment and education history"""
 
@@ -79,6 +77,7 @@ class AccountBasic(BaseFacebookScraper):
 
         return extracted_work_data
 
+    @metrics.timed("extract")
     def extract_places(self) -> List[Dict[str, str]]:
         """Return history of places"""
         places = []
@@ -111,6 +110,7 @@ class AccountBasic(BaseFacebookScraper):
 
         return places
 
+    @metrics.timed("extract")
     def extract_contact_data(self) -> List[Dict[str, str]]:
         """Return phone number and email address"""
         data = []
@@ -149,6 +149,7 @@ class AccountBasic(BaseFacebookScraper):
 
         return data
 
+    @metrics.timed("extract")
     def extract_family(self) -> List[Dict[str, str]]:
         """Return family members"""
         data = []
@@ -177,13 +178,14 @@ class AccountBasic(BaseFacebookScraper):
 
         return data
 
+    @metrics.track_pipeline
     def work_and_education_pipeline(self) -> None:
         """
         Pipeline to run extract work and education data
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             if not person_repository.person_exists(self._user_id):
                 person_repository.create_person(self._user_id)
@@ -207,15 +209,17 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     scraped_data,
+                    section="work_and_education",
                 ).save()
 
-                for data in scraped_data:
-                    if not work_education_repository.work_and_education_exists(
-                        data["name"], person_id
-                    ):
-                        work_education_repository.create_work_and_education(
+                with metrics.timer("db_write", items=len(scraped_data)):
+                    for data in scraped_data:
+                        if not work_education_repository.work_and_education_exists(
                             data["name"], person_id
-                        )
+                        ):
+                            work_education_repository.create_work_and_education(
+                                data["name"], person_id
+                            )
 
                 self._driver.quit()
                 self.success = True
@@ -224,13 +228,14 @@ class AccountBasic(BaseFacebookScraper):
             logs.log_error(f"Error running pipeline: {e}")
             rprint(f"An error occurred {e}")
 
+    @metrics.track_pipeline
     def localization_pipeline(self) -> None:
         """
         Pipeline to return localization data
         """
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Extract localization data[/bold]")
             if not person_repository.person_exists(self._user_id):
@@ -256,15 +261,17 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     places,
+                    section="places",
                 ).save()
 
-                for data in places:
-                    if not place_repository.places_exists(
-                        data["name"], data["date"], person_id
-                    ):
-                        place_repository.create_places(
+                with metrics.timer("db_write", items=len(places)):
+                    for data in places:
+                        if not place_repository.places_exists(
                             data["name"], data["date"], person_id
-                        )
+                        ):
+                            place_repository.create_places(
+                                data["name"], data["date"], person_id
+                            )
 
                 self._driver.quit()
                 self.success = True
@@ -273,13 +280,14 @@ class AccountBasic(BaseFacebookScraper):
             logs.log_error(f"Error running pipeline: {e}")
             rprint(f"An error occurred {e}")
 
+    @metrics.track_pipeline
     def family_member_pipeline(self) -> None:
         """
         Pipeline to extract family members data
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             if not person_repository.person_exists(self._user_id):
                 person_repository.create_person(self._user_id)
@@ -304,18 +312,20 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     family_members,
+                    section="family_members",
                 ).save()
 
-                for member in family_members:
-                    if not family_member_repository.family_member_exists(
-                        person_id, member["name"]
-                    ):
-                        family_member_repository.create_family_member(
-                            member["name"],
-                            member["relationship"],
-                            member["url"],
-                            person_id,
-                        )
+                with metrics.timer("db_write", items=len(family_members)):
+                    for member in family_members:
+                        if not family_member_repository.family_member_exists(
+                            person_id, member["name"]
+                        ):
+                            family_member_repository.create_family_member(
+                                member["name"],
+                                member["relationship"],
+                                member["url"],
+                                person_id,
+                            )
 
                 self._driver.quit()
                 self.success = True
@@ -324,13 +334,14 @@ class AccountBasic(BaseFacebookScraper):
             logs.log_error(f"Error running pipeline: {e}")
             rprint(f"An Error occurred {e}")
 
+    @metrics.track_pipeline
     def contact_pipeline(self) -> None:
         """
         Pipeline to extract phone number and email
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 2 - Extract contact data[/bold]")
             scraped_data = self.extract_contact_data()
@@ -349,29 +360,31 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     scraped_data,
+                    section="contact",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(
-                        self._user_id,
-                    )
+                with metrics.timer("db_write", items=len(scraped_data)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(
+                            self._user_id,
+                        )
 
-                person = person_repository.get_person(self._user_id)
+                    person = person_repository.get_person(self._user_id)
 
-                for data in scraped_data:
-                    if data["phone_number"]:
-                        person_repository.update_phone_number(
-                            person.id, data["phone_number"]
-                        )
+                    for data in scraped_data:
+                        if data["phone_number"]:
+                            person_repository.update_phone_number(
+                                person.id, data["phone_number"]
+                            )
 
-                    else:
-                        rprint("[bold red]Phone number not found[/bold red]")
+                        else:
+                            rprint("[bold red]Phone number not found[/bold red]")
 
-                    if data["email"]:
-                        person_repository.update_email(person.id, data["email"])
+                        if data["email"]:
+                            person_repository.update_email(person.id, data["email"])
 
-                    else:
-                        rprint("[bold red]Email not found[/bold red]")
+                        else:
+                            rprint("[bold red]Email not found[/bold red]")
 
                 self._driver.quit()
                 self.success = True
@@ -380,13 +393,14 @@ class AccountBasic(BaseFacebookScraper):
             logs.log_error(f"Error running pipeline: {e}")
             rprint(f"An error occurred {e}")
 
+    @metrics.track_pipeline
     def full_name_pipeline(self) -> None:
         """
         Pipeline to extract full name data
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 2 - Extract full name[/bold]")
             full_name = self.extract_full_name()
@@ -406,20 +420,24 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     full_name,
+                    section="full_name",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=1):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                # Update full name field in Person object
-                person = person_repository.get_person(self._user_id)
-                update_full_name = person_repository.update_full_name(
-                    person.id, full_name
-                )
-                if update_full_name:
-                    rprint("[bold green]Full name successfully updated[/bold green]")
-                else:
-                    rprint("[bold red]Full name not updated[/bold red]")
+                    # Update full name field in Person object
+                    person = person_repository.get_person(self._user_id)
+                    update_full_name = person_repository.update_full_name(
+                        person.id, full_name
+                    )
+                    if update_full_name:
+                        rprint(
+                            "[bold green]Full name successfully updated[/bold green]"
+                        )
+                    else:
+                        rprint("[bold red]Full name not updated[/bold red]")
 
                 self._driver.quit()
                 self.success = True
@@ -428,13 +446,14 @@ class AccountBasic(BaseFacebookScraper):
             logs.log_error(f"Error running pipeline: {e}")
             rprint(f"An error occurred {e}")
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run full script
         """
         try:
             rprint("[bold]Step 1 of 6 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 6 - Extract full name[/bold]")
             full_name = self.extract_full_name()
@@ -451,6 +470,7 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     full_name,
+                    section="full_name",
                 ).save()
 
                 if not person_repository.person_exists(self._user_id):
@@ -481,6 +501,7 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     family_members,
+                    section="family_members",
                 ).save()
 
                 for member in family_members:
@@ -509,6 +530,7 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     places,
+                    section="places",
                 ).save()
 
                 for data in places:
@@ -534,11 +556,7 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     scraped_data,
-                ).save()
-
-                save_to_json.SaveJSON(
-                    self._user_id,
-                    scraped_data,
+                    section="work_and_education",
                 ).save()
 
                 for data in scraped_data:
@@ -564,6 +582,7 @@ class AccountBasic(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     scraped_contact_data,
+                    section="contact",
                 ).save()
 
                 for data in scraped_contact_data:
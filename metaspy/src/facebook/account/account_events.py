@@ -6,6 +6,7 @@ from selenium.webdriver.common.by import By
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import person_repository, event_repository
 from ...utils import output, save_to_json
 
@@ -21,15 +22,11 @@ class AccountEvents(BaseFacebookScraper):
         super().__init__(user_id, base_url=f"https://www.facebook.com/{user_id}/events")
         self.success = False
 
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
-
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
+    @metrics.timed("extract")
     def extract_events_data(self) -> List[Dict]:
         extracted_data = []
         try:
@@ -57,13 +54,14 @@ class AccountEvents(BaseFacebookScraper):
 
         return extracted_data
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Scrolling page[/bold]")
             scroll_page(self._driver)
@@ -85,21 +83,23 @@ class AccountEvents(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     extracted_data,
+                    section="events",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(extracted_data)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
+                    person_id = person_repository.get_person(self._user_id).id
 
-                for data in extracted_data:
-                    if (
-                        not event_repository.event_exists(data["name"], person_id)
-                        and data["url"] != None
-                    ):
-                        event_repository.create_event(
-                            person_id, data["name"], data["url"]
-                        )
+                    for data in extracted_data:
+                        if (
+                            not event_repository.event_exists(data["name"], person_id)
+                            and data["url"] != None
+                        ):
+                            event_repository.create_event(
+                                person_id, data["name"], data["url"]
+                            )
 
                 self._driver.quit()
                 self.success = True
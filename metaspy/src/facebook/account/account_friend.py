@@ -3,9 +3,12 @@ from typing import List, Dict
 from rich import print as rprint
 from selenium.webdriver.common.by import By
 
+from .. import graphql, network
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page_callback
 from ...logs import Logs
+from ...metrics import metrics
+from ...reporting import reporter
 from ...repository import person_repository, friend_repository, crawlerqueue_repository
 from ...utils import output, save_to_json
 
@@ -17,27 +20,35 @@ class AccountFriend(BaseFacebookScraper):
     Scrape user's friends list
     """
 
-    def __init__(self, user_id: str, crawler: bool = False) -> None:
+    def __init__(
+        self, user_id: str, crawler: bool = False, incremental: bool = False
+    ) -> None:
         super().__init__(
             user_id, base_url=f"https://www.facebook.com/{user_id}/friends"
         )
         self.success = False
         self.crawler = crawler
-        self.number_of_friends = number_of_friends
-
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
+        self.incremental = incremental
+        self._known_items = None
 
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
+    @metrics.timed("extract")
     def extract_friends_data(self) -> List[Dict[str, str]]:
         """
         Return a list of dictionaries with the usernames and the urls to the profile for every person in friends list
         """
+        if network.is_enabled():
+            return network.extract_records(
+                self._driver,
+                graphql.parse_friends,
+                "friends",
+                self._known_items,
+                key=lambda friend: friend["url"],
+            )
+
         extracted_elements = []
         try:
 
@@ -52,24 +63,35 @@ class AccountFriend(BaseFacebookScraper):
                     if username == "" or url is None:
                         continue
                     element_data = {"username": username, "url": url}
+                    if self._known_items and not self._known_items.is_new(url):
+                        continue
                     if element_data not in extracted_elements:
-                        rprint(f"Extracted friend: {username} - {url}")
+                        counter.add(f"{username} - {url}")
                         extracted_elements.append(element_data)
 
-            scroll_page_callback(self._driver, extract_callback)
+                return self._known_items is not None and self._known_items.should_stop
+
+            with reporter.counter("friends") as counter:
+                scroll_page_callback(self._driver, extract_callback)
 
         except Exception as e:
             logs.log_error(f"Error extracting friends data: {e}")
 
         return extracted_elements
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
+
+            if self.incremental:
+                self._known_items = self._load_known_items(
+                    friend_repository.get_friend_urls
+                )
 
             rprint("[bold]Step 2 of 2 - Extracting friends data[/bold]")
             extracted_data = self.extract_friends_data()
@@ -87,39 +109,43 @@ class AccountFriend(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     extracted_data,
+                    section="friends",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(extracted_data)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
+
+                    person_id = person_repository.get_person(self._user_id).id
 
-                person_id = person_repository.get_person(self._user_id).id
+                    for data in extracted_data:
+                        if self.crawler:
+                            if not crawlerqueue_repository.crawler_queue_exists(
+                                data["url"]
+                            ):
+                                crawlerqueue_repository.create_crawler_queue(
+                                    data["url"]
+                                )
 
-                for data in extracted_data:
-                    if self.crawler:
-                        if not crawlerqueue_repository.crawler_queue_exists(
-                            data["url"]
+                        # Create friend object
+                        if not friend_repository.friend_exists(
+                            person_id, data["username"], data["url"]
                         ):
-                            crawlerqueue_repository.create_crawler_queue(data["url"])
-
-                    # Create friend object
-                    if not friend_repository.friend_exists(
-                        person_id, data["username"], data["url"]
-                    ):
-                        friend_repository.create_friends(
-                            data["username"], data["url"], person_id
-                        )
-
-                # Update the number of friends in the person table
-                number_of_person_friends = friend_repository.get_number_of_friends(
-                    person_id
-                )
-                person_repository.update_number_of_friends(
-                    person_id, number_of_person_friends
-                )
-                if person_repository:
-                    rprint("[bold green]Person table updated[/bold green]")
-                else:
-                    rprint("[bold red]Person table not updated[/bold red]")
+                            friend_repository.create_friends(
+                                data["username"], data["url"], person_id
+                            )
+
+                    # Update the number of friends in the person table
+                    number_of_person_friends = friend_repository.get_number_of_friends(
+                        person_id
+                    )
+                    person_repository.update_number_of_friends(
+                        person_id, number_of_person_friends
+                    )
+                    if person_repository:
+                        rprint("[bold green]Person table updated[/bold green]")
+                    else:
+                        rprint("[bold red]Person table not updated[/bold red]")
 
                 self._driver.quit()
                 self.success = True
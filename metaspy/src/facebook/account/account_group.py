@@ -6,6 +6,7 @@ from selenium.webdriver.common.by import By
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import person_repository, group_repository
 from ...utils import output, save_to_json
 
@@ -21,15 +22,11 @@ class AccountGroup(BaseFacebookScraper):
         super().__init__(user_id, base_url=f"https://www.facebook.com/{user_id}/groups")
         self.success = False
 
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
-
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
+    @metrics.timed("extract")
     def extract_groups_data(self) -> List[Dict]:
         extracted_data = []
         try:
@@ -54,13 +51,14 @@ class AccountGroup(BaseFacebookScraper):
 
         return extracted_data
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Scrolling page[/bold]")
             scroll_page(self._driver)
@@ -82,21 +80,23 @@ class AccountGroup(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     extracted_data,
+                    section="groups",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(extracted_data)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
+                    person_id = person_repository.get_person(self._user_id).id
 
-                for data in extracted_data:
-                    if (
-                        not group_repository.group_exists(data["name"], person_id)
-                        and data["url"] != 0
-                    ):
-                        group_repository.create_group(
-                            person_id, data["name"], data["url"]
-                        )
+                    for data in extracted_data:
+                        if (
+                            not group_repository.group_exists(data["name"], person_id)
+                            and data["url"] != 0
+                        ):
+                            group_repository.create_group(
+                                person_id, data["name"], data["url"]
+                            )
 
                 self._driver.quit()
                 self.success = True
@@ -4,9 +4,12 @@ from rich import print as rprint
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 
+from .. import graphql, network
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page_callback
 from ...logs import Logs
+from ...metrics import metrics
+from ...reporting import reporter
 from ...repository import person_repository, post_repository
 from ...utils import output, save_to_json
 
@@ -18,14 +21,11 @@ class AccountPost(BaseFacebookScraper):
     Scrape user's friends list
     """
 
-    def __init__(self, user_id: str) -> None:
+    def __init__(self, user_id: str, incremental: bool = False) -> None:
         super().__init__(user_id, base_url=f"https://www.facebook.com/{user_id}/")
         self.success = False
-
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
+        self.incremental = incremental
+        self._known_items = None
 
     @property
     def is_pipeline_successful(self) -> bool:
@@ -57,10 +57,16 @@ class AccountPost(BaseFacebookScraper):
         actions = ActionChains(self._driver)
         actions.move_by_offset(0, 0).perform()
 
+    @metrics.timed("extract")
     def extract_post_urls(self) -> List[str]:
         """
         Return a list urls for posts from facebook account
         """
+        if network.is_enabled():
+            return network.extract_records(
+                self._driver, graphql.parse_post_urls, "post urls", self._known_items
+            )
+
         extracted_urls = []
         try:
 
@@ -76,27 +82,37 @@ class AccountPost(BaseFacebookScraper):
                     parsed_url = self._extract_url_prefix(actual_url)
                     if parsed_url.endswith("#"):
                         continue
+                    if self._known_items and not self._known_items.is_new(parsed_url):
+                        continue
                     if parsed_url not in extracted_urls:
-                        rprint(f"Extracted URL: {parsed_url}")
-
+                        counter.add(parsed_url)
                         extracted_urls.append(parsed_url)
 
                     self._move_cursor_away()
 
-            scroll_page_callback(self._driver, extract_callback)
+                return self._known_items is not None and self._known_items.should_stop
+
+            with reporter.counter("post urls") as counter:
+                scroll_page_callback(self._driver, extract_callback)
 
         except Exception as e:
             logs.log_error(f"Error extracting post URLs: {e}")
 
         return extracted_urls
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 2 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
+
+            if self.incremental:
+                self._known_items = self._load_known_items(
+                    post_repository.get_post_urls
+                )
 
             rprint("[bold]Step 2 of 2 - Extracting post urls[/bold]")
             extracted_data = self.extract_post_urls()
@@ -115,16 +131,20 @@ class AccountPost(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     extracted_data,
+                    section="posts",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(extracted_data)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
+                    person_id = person_repository.get_person(self._user_id).id
 
-                for data in extracted_data:
-                    if not post_repository.post_exists(data):
-                        post_repository.create_post(data, person_id)
+                    for data in extracted_data:
+                        # Known posts of this person were skipped in memory,
+                        # the url may still be saved for another person
+                        if not post_repository.post_exists(data):
+                            post_repository.create_post(data, person_id)
 
                 self._driver.quit()
                 self.success = True
@@ -6,6 +6,7 @@ from selenium.webdriver.common.by import By
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import person_repository, recent_place_repository
 from ...utils import output, save_to_json
 
@@ -23,15 +24,11 @@ class AccountRecentPlaces(BaseFacebookScraper):
         )
         self.success = False
 
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
-
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
+    @metrics.timed("extract")
     def extract_recent_places(self) -> List[Dict[str, str]]:
         """
         Return data about recent places
@@ -65,13 +62,14 @@ class AccountRecentPlaces(BaseFacebookScraper):
 
         return extracted_image_urls
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Scrolling page[/bold]")
             scroll_page(self._driver)
@@ -93,20 +91,22 @@ class AccountRecentPlaces(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     recent_places,
+                    section="recent_places",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(recent_places)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
+                    person_id = person_repository.get_person(self._user_id).id
 
-                for place in recent_places:
-                    if not recent_place_repository.recent_places_exists(
-                        place["localization"], place["date"], person_id
-                    ):
-                        recent_place_repository.create_recent_places(
+                    for place in recent_places:
+                        if not recent_place_repository.recent_places_exists(
                             place["localization"], place["date"], person_id
-                        )
+                        ):
+                            recent_place_repository.create_recent_places(
+                                place["localization"], place["date"], person_id
+                            )
 
                 self._driver.quit()
                 self.success = True
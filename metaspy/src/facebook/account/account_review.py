@@ -6,6 +6,7 @@ from selenium.webdriver.common.by import By
 from ..facebook_base import BaseFacebookScraper
 from ..scroll import scroll_page
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import person_repository, review_repository
 from ...utils import output, save_to_json
 
@@ -23,15 +24,11 @@ class AccountReview(BaseFacebookScraper):
         )
         self.success = False
 
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
-
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
+    @metrics.timed("extract")
     def extract_reviews(self) -> List[Dict[str, str]]:
         """
         Return data about recent places
@@ -66,13 +63,14 @@ class AccountReview(BaseFacebookScraper):
 
         return extracted_reviews
 
+    @metrics.track_pipeline
     def pipeline(self) -> None:
         """
         Pipeline to run the scraper
         """
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Scrolling page[/bold]")
             scroll_page(self._driver)
@@ -94,21 +92,23 @@ class AccountReview(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     reviews,
+                    section="reviews",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(reviews)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
+                    person_id = person_repository.get_person(self._user_id).id
 
-                for review_data in reviews:
-                    opinion = "".join([data for data in review_data["opinions"]])
-                    if not review_repository.review_exists(
-                        review_data["company"], opinion, person_id
-                    ):
-                        review_repository.create_reviews(
+                    for review_data in reviews:
+                        opinion = "".join([data for data in review_data["opinions"]])
+                        if not review_repository.review_exists(
                             review_data["company"], opinion, person_id
-                        )
+                        ):
+                            review_repository.create_reviews(
+                                review_data["company"], opinion, person_id
+                            )
 
                 self._driver.quit()
                 self.success = True
@@ -4,8 +4,9 @@ from rich import print as rprint
 from selenium.webdriver.common.by import By
 
 from ..facebook_base import BaseFacebookScraper
-from ..scroll import scroll_page
+from ..scroll import scroll_page, scroll_page_callback
 from ...logs import Logs
+from ...metrics import metrics
 from ...repository import (
     person_repository,
     video_repository,
@@ -20,14 +21,11 @@ class AccountVideo(BaseFacebookScraper):
     Scrape user's pictures
     """
 
-    def __init__(self, user_id: str) -> None:
+    def __init__(self, user_id: str, incremental: bool = False) -> None:
         super().__init__(user_id, base_url=f"https://www.facebook.com/{user_id}/videos")
         self.success = False
-
-    def _load_cookies_and_refresh_driver(self) -> None:
-        """Load cookies and refresh driver"""
-        self._load_cookies()
-        self._driver.refresh()
+        self.incremental = incremental
+        self._known_items = None
 
     @property
     def is_pipeline_successful(self) -> bool:
@@ -42,50 +40,83 @@ class AccountVideo(BaseFacebookScraper):
                 extracted_videos_urls.append(src_attribute)
         return extracted_videos_urls
 
-    def scrape_video_urls(self) -> List[str]:
+    def _video_elements(self) -> List:
         """
-        Return a list of all the image urls
+        Return links to videos rendered on the page
         """
-        extracted_videos_urls = []
+        video_elements = []
         try:
             div_element = self._driver.find_element(
                 By.CLASS_NAME,
                 "x1qjc9v5.x1lq5wgf.xgqcy7u.x30kzoy.x9jhf4c.x78zum5.xdt5ytf.x1l90r2v.xyamay9.xjl7jj",
             )
-            videos_elements = div_element.find_elements(
+            video_elements = div_element.find_elements(
                 By.CSS_SELECTOR,
                 "a.x1i10hfl.xjbqb8w.x6umtig.x1b1mbwd.xaqea5y.xav7gou.x9f619.x1ypdohk.xt0psk2.xe8uvvx.xdj266r.x11i5rnm.xat24cr.x1mh8g0r.xexx8yu.x4uap5.x18d9i69.xkhd6sd.x16tdsg8.x1hl2dhg.xggy1nq.x1a2a7pz.x1heor9g.xt0b8zv",
             )
-            extracted_videos_urls = self.extract_urls(videos_elements)
         except Exception as e:
             logs.log_error(f"An Error extracting while extracting video URL: {e}")
 
-        if not extracted_videos_urls:
+        if not video_elements:
             try:
                 div_element = self._driver.find_element(
                     By.CLASS_NAME, "xyamay9.x1pi30zi.x1l90r2v.x1swvt13"
                 )
-                videos_elements = div_element.find_elements(
+                video_elements = div_element.find_elements(
                     By.CSS_SELECTOR,
                     "a.x1i10hfl.xjbqb8w.x6umtig.x1b1mbwd.xaqea5y.xav7gou.x9f619.x1ypdohk.xe8uvvx.xdj266r.x11i5rnm.xat24cr.x1mh8g0r.xexx8yu.x4uap5.x18d9i69.xkhd6sd.x16tdsg8.x1hl2dhg.xggy1nq.x1a2a7pz.x1heor9g.xt0b8zv.x1lliihq.x5yr21d.x1n2onr6.xh8yej3",
                 )
-                extracted_videos_urls = self.extract_urls(videos_elements)
             except Exception as e:
                 logs.log_error(f"An Error extracting while extracting video URL: {e}")
 
-        return extracted_videos_urls
+        return video_elements
 
+    @metrics.timed("extract")
+    def scrape_video_urls(self) -> List[str]:
+        """
+        Return a list of all the video urls
+        """
+        return self.extract_urls(self._video_elements())
+
+    def _scroll_until_known_videos(self) -> None:
+        """Scroll the page until a run of already saved videos appears
+        Only videos rendered since the previous scroll are read"""
+        processed = 0
+
+        def check_callback(driver):
+            nonlocal processed
+            video_elements = self._video_elements()
+            for url in self.extract_urls(video_elements[processed:]):
+                self._known_items.is_new(url)
+            processed = len(video_elements)
+            return self._known_items.should_stop
+
+        scroll_page_callback(self._driver, check_callback)
+
+    @metrics.track_pipeline
     def save_video_urls_to_database_pipeline(self) -> None:
         """Pipeline to save video url to database"""
         try:
             rprint("[bold]Step 1 of 3 - Load cookies[/bold]")
-            self._load_cookies_and_refresh_driver()
+            self._open_with_session()
 
             rprint("[bold]Step 2 of 3 - Scrolling page[/bold]")
-            scroll_page(self._driver)
+            if self.incremental:
+                self._known_items = self._load_known_items(
+                    video_repository.get_video_urls
+                )
+                self._scroll_until_known_videos()
+            else:
+                scroll_page(self._driver)
 
             rprint("[bold]Step 3 of 3 - Extract videos urls[/bold]")
             videos = self.scrape_video_urls()
+            if self.incremental:
+                videos = [
+                    url
+                    for url in dict.fromkeys(videos)
+                    if url not in self._known_items.known_items
+                ]
 
             if not videos:
                 output.print_no_data_info()
@@ -101,15 +132,17 @@ class AccountVideo(BaseFacebookScraper):
                 save_to_json.SaveJSON(
                     self._user_id,
                     videos,
+                    section="videos",
                 ).save()
 
-                if not person_repository.person_exists(self._user_id):
-                    person_repository.create_person(self._user_id)
+                with metrics.timer("db_write", items=len(videos)):
+                    if not person_repository.person_exists(self._user_id):
+                        person_repository.create_person(self._user_id)
 
-                person_id = person_repository.get_person(self._user_id).id
-                for data in videos:
-                    if not video_repository.video_exists(data, person_id):
-                        video_repository.create_videos(data, person_id)
+                    person_id = person_repository.get_person(self._user_id).id
+                    for data in videos:
+                        if not video_repository.video_exists(data, person_id):
+                            video_repository.create_videos(data, person_id)
 
                 self._driver.quit()
                 self.success = True
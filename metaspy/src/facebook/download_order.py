@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class DownloadOrder(str, Enum):
+    """Order of downloaded videos, kept apart from the downloader so the CLI can use it
+    without importing youtube_dl"""
+
+    LARGEST = "largest"
+    SMALLEST = "smallest"
@@ -1,95 +1,400 @@
 import os
-import random
-import string
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
 
 import youtube_dl
 from rich.progress import Progress
 
+from .download_order import DownloadOrder
 from ..config import Config
 from ..logs import Logs
-from ..repository import video_repository, person_repository
+from ..metrics import metrics
+from ..media import store
+from ..media.store import StoredMedia
+from ..models import Videos, VideoMetadata
+from ..repository import (
+    media_repository,
+    video_metadata_repository,
+    video_repository,
+    person_repository,
+)
 
 logs = Logs()
 
 
+class DownloadProgress:
+    """
+    Aggregate youtube_dl progress of all workers into a single progress bar
+    """
+
+    def __init__(self, progress: Progress, task, total: int) -> None:
+        self._progress = progress
+        self._task = task
+        self._total = total
+        self._completed = 0
+        self._downloaded_bytes: Dict[str, int] = {}
+        self._start = perf_counter()
+        self._lock = Lock()
+
+    def hook(self, status: Dict) -> None:
+        """youtube_dl progress hook, it's called from worker threads"""
+        downloaded_bytes = status.get("downloaded_bytes")
+        if downloaded_bytes is None:
+            return
+
+        with self._lock:
+            self._downloaded_bytes[status.get("filename")] = downloaded_bytes
+            self._refresh()
+
+    def advance(self) -> None:
+        """Mark a single video as finished"""
+        with self._lock:
+            self._completed += 1
+            self._progress.update(self._task, advance=1)
+            self._refresh()
+
+    def _refresh(self) -> None:
+        downloaded = sum(self._downloaded_bytes.values()) / 1024 / 1024
+        speed = downloaded / max(perf_counter() - self._start, 0.001)
+        self._progress.update(
+            self._task,
+            description=f"[cyan]Downloading... {self._completed}/{self._total} "
+            f"({downloaded:.1f} MiB, {speed:.1f} MiB/s)",
+        )
+
+
 class Downloader:
     """
     Download videos from facebook
     """
 
-    def __init__(self, person_facebook_id: str = None) -> None:
+    def __init__(
+        self,
+        person_facebook_id: str = None,
+        workers: int = Config.VIDEO_DOWNLOAD_WORKERS,
+        order: Optional[DownloadOrder] = None,
+    ) -> None:
         self.person_facebook_id = person_facebook_id
         self.video_path = Config.VIDEO_PATH
+        self.workers = workers
+        self.order = order
         self.success = False
 
+    @property
+    def _person_video_path(self) -> str:
+        return os.path.join(self.video_path, self.person_facebook_id)
+
     @property
     def is_pipeline_successful(self) -> bool:
         return self.success
 
     @staticmethod
-    def _generate_random_video_title() -> str:
-        """Generate random video title"""
-        chars = string.ascii_letters
-        return "".join(random.choice(chars) for _ in range(12))
-
-    @staticmethod
-    def _download_video(path: str, video_url: str) -> None:
+    @metrics.timed("download")
+    def _download_video(
+        path: str, video_url: str, progress_hook: Optional[Callable] = None
+    ) -> bool:
+        """Download video with youtube_dl, return True if it was successful"""
         try:
             ydl_opts = {
                 "outtmpl": os.path.join(path, "%(title)s.%(ext)s"),
+                "quiet": progress_hook is not None,
+                "noprogress": progress_hook is not None,
+                "progress_hooks": [progress_hook] if progress_hook else [],
+                # Interrupted downloads are continued from their .part files
+                "continuedl": True,
             }
             with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
+                return ydl.download([video_url]) == 0
         except Exception as e:
             logs.log_error(f"An Error occurred while downloading videos: {e}")
+            return False
 
-    def save_person_video(self, video_url: str) -> None:
-        """Download videos from specified account"""
-        if not os.path.exists(self.video_path):
-            os.makedirs(self.video_path)
+    @staticmethod
+    def _download_path(video_url: str) -> str:
+        """Return temporary directory of the video, it's the same in every run to resume downloads"""
+        return store.temporary_path(store.url_key(video_url))
 
-        person_video_path = os.path.dirname(
-            f"{self.video_path}/{self.person_facebook_id}/"
-        )
-        print(person_video_path)
-        if not os.path.exists(person_video_path):
-            os.makedirs(person_video_path)
+    def _is_partial(self, video_url: str) -> bool:
+        """Check if some bytes of the video were downloaded"""
+        download_path = self._download_path(video_url)
+        return os.path.isdir(download_path) and bool(os.listdir(download_path))
 
-        video_filename = self._generate_random_video_title()
-        video_full_path = os.path.join(person_video_path, video_filename)
+    def _download_to_store(
+        self, video_url: str, progress_hook: Optional[Callable] = None
+    ) -> Optional[StoredMedia]:
+        """Download video into a temporary directory and move it to the media store
+        The directory is kept if the download fails, so the next run can resume it"""
+        download_path = self._download_path(video_url)
+        if not self._download_video(download_path, video_url, progress_hook):
+            return None
 
-        self._download_video(video_full_path, video_url)
+        filenames = [
+            filename
+            for filename in os.listdir(download_path)
+            if not filename.endswith((".part", ".ytdl"))
+        ]
+        if not filenames:
+            return None
+
+        filename = filenames[0]
+        extension = os.path.splitext(filename)[1].lstrip(".") or "mp4"
+        stored = store.ingest_file(os.path.join(download_path, filename), extension)
+        shutil.rmtree(download_path, ignore_errors=True)
+        return stored
+
+    def save_person_video(
+        self, video_url: str, progress_hook: Optional[Callable] = None
+    ) -> Optional[StoredMedia]:
+        """Download videos from specified account"""
+        stored = self._download_to_store(video_url, progress_hook)
+        if stored:
+            store.link(stored.content_hash, stored.extension, self._person_video_path)
+        return stored
 
     def save_single_video(self, video_url: str) -> None:
         """Download single video just by passing url"""
-        if not os.path.exists(self.video_path):
-            os.makedirs(self.video_path)
+        media_file = media_repository.get_media_file(video_url)
+        if media_file:
+            store.link(media_file.content_hash, media_file.extension, self.video_path)
+            return
+
+        media_repository.update_media_files(
+            store.pending_rows([video_url], self.video_path)
+        )
+        stored = self._download_to_store(video_url)
+        if stored:
+            store.link(stored.content_hash, stored.extension, self.video_path)
+            row = store.media_file_row(video_url, stored, self.video_path)
+        else:
+            row = store.unfinished_row(
+                video_url, self.video_path, self._is_partial(video_url)
+            )
+        media_repository.update_media_files([row])
+
+    @staticmethod
+    def _mark_downloaded(video_ids: List[int], media_files: List[dict]) -> None:
+        """Update 'downloaded' field and save media files for a batch of videos in one transaction"""
+        if not video_ids and not media_files:
+            return
+        with metrics.timer("db_write", items=len(media_files)):
+            media_repository.update_media_files(media_files)
+            if video_ids:
+                video_repository.update_videos_downloaded_bulk(video_ids)
+
+    @staticmethod
+    def _video_size(info: Dict[str, Any]) -> Optional[int]:
+        """Return size of the format youtube_dl would download, or the largest known format size"""
+        size = info.get("filesize") or info.get("filesize_approx")
+        if size:
+            return int(size)
+        sizes = [
+            video_format.get("filesize") or video_format.get("filesize_approx") or 0
+            for video_format in info.get("formats") or []
+        ]
+        return int(max(sizes)) if any(sizes) else None
+
+    @classmethod
+    def _extract_metadata(cls, video_url: str) -> Optional[Dict[str, Any]]:
+        """Read video id, duration and size with youtube_dl without downloading the video"""
+        try:
+            ydl_opts = {"quiet": True, "no_warnings": True}
+            with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(video_url, download=False)
+        except Exception as e:
+            logs.log_error(f"Can't read metadata of video {video_url}: {e}")
+            return None
+
+        if info.get("entries"):
+            info = info["entries"][0]
+
+        extractor = info.get("extractor_key") or info.get("extractor")
+        video_id = info.get("id")
+        if not extractor or video_id is None:
+            # Video can't be matched with other urls, it's grouped by its url
+            logs.log_error(f"Video {video_url} has no extractor or id")
+            return None
 
-        video_filename = self._generate_random_video_title()
-        video_full_path = os.path.join(self.video_path, video_filename)
+        return {
+            "url": video_url,
+            "extractor": extractor,
+            "video_id": str(video_id),
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+            "size": cls._video_size(info),
+        }
 
-        self._download_video(video_full_path, video_url)
+    @metrics.timed("metadata")
+    def collect_metadata(self, videos: List[Videos]) -> Dict[str, VideoMetadata]:
+        """Return metadata of videos, metadata not saved in the database yet is read concurrently"""
+        metadata = video_metadata_repository.get_video_metadata(
+            video.url for video in videos
+        )
+        missing_urls = [
+            url
+            for url in dict.fromkeys(video.url for video in videos)
+            if url not in metadata
+        ]
+        if not missing_urls:
+            return metadata
+
+        with Progress() as progress:
+            task = progress.add_task(
+                "[cyan]Reading video metadata...", total=len(missing_urls)
+            )
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(copy_context().run, self._extract_metadata, url)
+                    for url in missing_urls
+                ]
+                rows = []
+                for future in as_completed(futures):
+                    progress.update(task, advance=1)
+                    row = future.result()
+                    if row:
+                        rows.append(row)
+
+        try:
+            with metrics.timer("db_write", items=len(rows)):
+                video_metadata_repository.create_video_metadata(rows)
+        except Exception as e:
+            # Videos without metadata are downloaded by their url
+            logs.log_error(f"An error occurred while saving video metadata: {e}")
+        return video_metadata_repository.get_video_metadata(
+            video.url for video in videos
+        )
+
+    def plan_downloads(self, videos: List[Videos]) -> List[List[Videos]]:
+        """Group urls of the same video (the same extractor and video id)
+        The first video of every group is downloaded, groups are sorted by size if order is set
+        """
+        metadata = self.collect_metadata(videos)
+        groups: Dict[Any, List[Videos]] = {}
+        for video in videos:
+            video_metadata = metadata.get(video.url)
+            key = (
+                (video_metadata.extractor, video_metadata.video_id)
+                if video_metadata
+                else video.url
+            )
+            groups.setdefault(key, []).append(video)
 
+        planned = list(groups.values())
+        if self.order is not None:
+
+            def size(group: List[Videos]) -> int:
+                video_metadata = metadata.get(group[0].url)
+                return (video_metadata.size if video_metadata else None) or 0
+
+            planned.sort(key=size, reverse=self.order == DownloadOrder.LARGEST)
+        return planned
+
+    def _link_known_videos(self, groups: List[List[Videos]]) -> List[List[Videos]]:
+        """Link videos which content is already stored under any url of the group,
+        return groups to download"""
+        known_ids = []
+        media_files = []
+        to_download = []
+        stored_files = media_repository.get_media_files(
+            video.url for group in groups for video in group
+        )
+
+        for group in groups:
+            media_file = next(
+                filter(None, (stored_files.get(video.url) for video in group)),
+                None,
+            )
+            if media_file is None:
+                to_download.append(group)
+                continue
+
+            store.link(
+                media_file.content_hash, media_file.extension, self._person_video_path
+            )
+            stored = store.stored_media(media_file)
+            for video in group:
+                known_ids.append(video.id)
+                media_files.append(
+                    store.media_file_row(video.url, stored, self._person_video_path)
+                )
+
+        self._mark_downloaded(known_ids, media_files)
+        return to_download
+
+    def download_videos(self, videos: List[Videos]) -> None:
+        """Download videos using a pool of workers
+        Every video is downloaded once even if it's saved under different urls,
+        videos with content already in the media store are not downloaded again.
+        'downloaded' flags and download statuses are saved in batches of Config.VIDEO_DOWNLOAD_BATCH_SIZE
+        """
+        groups = self._link_known_videos(self.plan_downloads(videos))
+        media_repository.update_media_files(
+            store.pending_rows(
+                [video.url for group in groups for video in group],
+                self._person_video_path,
+            )
+        )
+        downloaded_ids = []
+        media_files = []
+
+        with Progress() as progress:
+            task = progress.add_task("[cyan]Downloading...", total=len(groups))
+            download_progress = DownloadProgress(progress, task, len(groups))
+
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                # Every worker gets its own copy of the context to keep metrics labels
+                futures = {
+                    executor.submit(
+                        copy_context().run,
+                        self.save_person_video,
+                        group[0].url,
+                        download_progress.hook,
+                    ): group
+                    for group in groups
+                }
+
+                for future in as_completed(futures):
+                    download_progress.advance()
+                    group = futures[future]
+                    stored = future.result()
+                    if stored:
+                        for video in group:
+                            downloaded_ids.append(video.id)
+                            media_files.append(
+                                store.media_file_row(
+                                    video.url, stored, self._person_video_path
+                                )
+                            )
+                    else:
+                        logs.log_error(f"Video {group[0].url} was not downloaded")
+                        for video in group:
+                            media_files.append(
+                                store.unfinished_row(
+                                    video.url,
+                                    self._person_video_path,
+                                    self._is_partial(video.url),
+                                )
+                            )
+
+                    if len(media_files) >= Config.VIDEO_DOWNLOAD_BATCH_SIZE:
+                        self._mark_downloaded(downloaded_ids, media_files)
+                        downloaded_ids = []
+                        media_files = []
+
+        self._mark_downloaded(downloaded_ids, media_files)
+
+    @metrics.track_pipeline
     def download_all_person_videos_pipeline(self) -> None:
         """Download videos from specified facebook account based on the urls from the database
-        This command download all videos and may create duplicates"""
+        Videos already in the media store are linked instead of downloaded again"""
 
         person_object = person_repository.get_person(self.person_facebook_id)
         videos = video_repository.get_videos(person_object.id)
         try:
-            with Progress() as progress:
-                task = progress.add_task("[cyan]Downloading...", total=len(videos))
-
-                for idx, data in enumerate(videos, 1):
-                    self.save_person_video(data.url)
-
-                    progress.update(
-                        task,
-                        advance=1,
-                        description=f"[cyan]Downloading... {idx}/{len(videos)}",
-                    )
-                    video_repository.update_videos_downloaded(data.id)
-
+            self.download_videos(videos)
             self.success = True
 
         except Exception as e:
@@ -97,25 +402,14 @@ class Downloader:
                 f"An Error occurred while downloading videos for {self.person_facebook_id}: {e}"
             )
 
+    @metrics.track_pipeline
     def download_new_person_videos_pipeline(self) -> None:
         """Download videos from specified facebook account based on the urls from the database
         This command downloads only new not downloaded yet videos"""
         person_object = person_repository.get_person(self.person_facebook_id)
         videos = video_repository.get_new_videos(person_object.id)
         try:
-            with Progress() as progress:
-                task = progress.add_task("[cyan]Downloading...", total=len(videos))
-
-                for idx, data in enumerate(videos, 1):
-                    self.save_person_video(data.url)
-
-                    progress.update(
-                        task,
-                        advance=1,
-                        description=f"[cyan]Downloading... {idx}/{len(videos)}",
-                    )
-                    video_repository.update_videos_downloaded(data.id)
-
+            self.download_videos(videos)
             self.success = True
 
         except Exception as e:
@@ -123,6 +417,7 @@ class Downloader:
                 f"An Error occurred while downloading videos for {self.person_facebook_id}: {e}"
             )
 
+    @metrics.track_pipeline
     def download_single_video_pipeline(self, video_url: str) -> None:
         """Download videos just by passing a URL"""
         try:
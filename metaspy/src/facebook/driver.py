@@ -0,0 +1,358 @@
+import os
+import socket
+import sys
+from collections import defaultdict
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from rich import get_console
+from rich.table import Table
+from selenium import webdriver
+from selenium.webdriver.remote.command import Command
+
+from ..config import Config
+from ..logs import Logs
+from ..metrics import metrics
+from ..tracing import tracer
+
+logs = Logs()
+
+# Commands executed by WebElement methods through JavaScript atoms
+SCRIPT_ATOMS = {
+    "/* getAttribute */": "getAttribute",
+    "/* isDisplayed */": "isDisplayed",
+}
+
+COMMAND_TYPES = {
+    Command.FIND_ELEMENT: "find_element",
+    Command.FIND_ELEMENTS: "find_element",
+    Command.FIND_CHILD_ELEMENT: "find_element",
+    Command.FIND_CHILD_ELEMENTS: "find_element",
+    "getAttribute": "get_attribute",
+    Command.GET_ELEMENT_ATTRIBUTE: "get_attribute",
+    Command.GET_ELEMENT_PROPERTY: "get_attribute",
+    Command.GET_ELEMENT_TEXT: "get_text",
+    Command.W3C_EXECUTE_SCRIPT: "execute_script",
+    Command.W3C_EXECUTE_SCRIPT_ASYNC: "execute_script",
+    Command.GET: "navigation",
+    Command.REFRESH: "navigation",
+    Command.GO_BACK: "navigation",
+    Command.GO_FORWARD: "navigation",
+}
+
+
+def command_name(driver_command: str, params: Optional[Dict[str, Any]]) -> str:
+    """Return name of the WebDriver command, scripts run by WebElement methods get their own name"""
+    if driver_command == Command.W3C_EXECUTE_SCRIPT and params:
+        script = params.get("script", "")
+        for prefix, name in SCRIPT_ATOMS.items():
+            if script.startswith(prefix):
+                return name
+    return driver_command
+
+
+def command_type(name: str) -> str:
+    """Group WebDriver commands into find_element, get_attribute, execute_script, navigation etc."""
+    return COMMAND_TYPES.get(name, "other")
+
+
+# Number of frames searched for the caller of a command, selenium calls are not deeper
+MAX_CALLER_DEPTH = 20
+
+
+def _calling_extractor() -> str:
+    """Return qualified name of the first function outside selenium that runs a command"""
+    frame = sys._getframe(2)
+    for _ in range(MAX_CALLER_DEPTH):
+        if frame is None:
+            break
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith("selenium") and module != __name__:
+            code = frame.f_code
+            return getattr(code, "co_qualname", code.co_name)
+        frame = frame.f_back
+    return "unknown"
+
+
+class CommandStats:
+    """
+    Number and total duration of WebDriver commands grouped by caller and command type
+    """
+
+    def __init__(self) -> None:
+        self.counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.durations: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    def add(self, caller: str, type_: str, duration: float) -> None:
+        self.counts[(caller, type_)] += 1
+        self.durations[(caller, type_)] += duration
+
+    def by_type(self) -> Dict[str, Tuple[int, float]]:
+        """Return number and duration of commands for every command type"""
+        result = defaultdict(lambda: (0, 0.0))
+        for key, count in self.counts.items():
+            total_count, total_duration = result[key[1]]
+            result[key[1]] = (total_count + count, total_duration + self.durations[key])
+        return dict(result)
+
+    def print_summary(self) -> None:
+        """Print commands grouped by caller, the slowest first"""
+        if not self.counts:
+            return
+
+        table = Table(title="WebDriver commands")
+        table.add_column("Caller")
+        table.add_column("Type")
+        table.add_column("Count", justify="right")
+        table.add_column("Time [s]", justify="right")
+
+        for key in sorted(self.durations, key=self.durations.get, reverse=True):
+            caller, type_ = key
+            table.add_row(
+                caller, type_, str(self.counts[key]), f"{self.durations[key]:.3f}"
+            )
+
+        get_console().print(table)
+
+
+class Chrome(webdriver.Chrome):
+    """
+    Chrome WebDriver counting and timing every command
+
+    Commands are grouped by type and by the extractor that called them,
+    the summary is printed when the driver quits at the end of a pipeline.
+    Every command is also recorded as a trace span.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.command_stats = CommandStats()
+        self._closed = False
+        self.profile_directory: Optional[str] = None
+        super().__init__(*args, **kwargs)
+
+    def execute(self, driver_command: str, params: Optional[Dict[str, Any]] = None):
+        name = command_name(driver_command, params)
+        start = perf_counter()
+        try:
+            return super().execute(driver_command, params)
+        finally:
+            duration = perf_counter() - start
+            # Callers are only shown in the summary table, the stack isn't walked without it
+            caller = _calling_extractor() if Config.PRINT_WEBDRIVER_STATS else "unknown"
+            self.command_stats.add(caller, command_type(name), duration)
+            tracer.add_span(name, "webdriver", start, duration)
+
+    def is_alive(self) -> bool:
+        try:
+            self.current_url
+            return True
+        except Exception:
+            return False
+
+    def block_urls(self, images: bool) -> None:
+        """Block fonts and media (and images) in lean browser mode
+        Blocked urls can be changed while the driver runs, so pooled drivers serve all scrapers
+        """
+        if not Config.BROWSER_LEAN:
+            return
+        urls = Config.BROWSER_BLOCKED_URLS + (
+            Config.BROWSER_BLOCKED_IMAGE_URLS if images else []
+        )
+        try:
+            self.execute_cdp_cmd("Network.enable", {})
+            self.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+        except Exception as e:
+            logs.log_error(f"An error occurred while blocking urls: {e}")
+
+    def record_stats(self) -> None:
+        """Record command stats of the pipeline and start counting again"""
+        for type_, (count, duration) in self.command_stats.by_type().items():
+            metrics.record(f"webdriver.{type_}", duration, count)
+        if Config.PRINT_WEBDRIVER_STATS:
+            self.command_stats.print_summary()
+        self.command_stats = CommandStats()
+
+    def quit(self) -> None:
+        # Driver of the started pool stays open for the next pipeline
+        if browser_pool.release(self):
+            self.record_stats()
+            return
+
+        # Some pipelines quit the driver in more than one place
+        if self._closed:
+            return
+        self._closed = True
+
+        super().quit()
+        browser_pool.forget(self.profile_directory)
+        self.record_stats()
+
+
+def is_stale_lock(path: str) -> bool:
+    """Return True if the SingletonLock of a profile was left by a Chrome which doesn't run
+    The lock is a symlink to "<hostname>-<pid>", locks of other hosts are never stale"""
+    try:
+        host, _, pid = os.readlink(path).rpartition("-")
+        pid = int(pid)
+    except (OSError, ValueError):
+        return False
+    if host != socket.gethostname():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        # Process of another user
+        return False
+    return False
+
+
+class BrowserPool:
+    """
+    Lend Chrome drivers to scrapers
+
+    Every driver is started with its own persistent profile (--user-data-dir) in
+    Config.BROWSER_PROFILE_PATH, so HTTP cache, compiled scripts and cookies survive between
+    runs. Profiles used by other running Chrome processes are skipped, locks left by crashed
+    Chrome are removed. At most Config.BROWSER_MAX_PROFILES profiles are created, Chrome
+    gets a temporary profile when all of them are used.
+
+    When the pool is started (by the daemon), Config.BROWSER_POOL_SIZE drivers are launched
+    in advance, quit() at the end of a pipeline returns the driver to the pool and drivers
+    are health-checked before they are lent again, dead drivers are replaced by new ones.
+    Otherwise every scraper gets a new driver which is closed by quit().
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._idle: List[Chrome] = []
+        self._lent: List[Chrome] = []
+        self._profiles: Set[str] = set()
+        self._lock = Lock()
+        self._options_factory: Optional[Callable[[], Any]] = None
+
+    def _profile_directory(self) -> Optional[str]:
+        """Return the first profile directory which is not used by a running Chrome,
+        None if all Config.BROWSER_MAX_PROFILES profiles are used"""
+        for number in range(Config.BROWSER_MAX_PROFILES):
+            directory = os.path.abspath(
+                os.path.join(Config.BROWSER_PROFILE_PATH, f"profile_{number}")
+            )
+            if directory in self._profiles:
+                continue
+            # Chrome creates this symlink while it uses the profile
+            lock = os.path.join(directory, "SingletonLock")
+            if os.path.lexists(lock):
+                if not is_stale_lock(lock):
+                    continue
+                os.remove(lock)
+            self._profiles.add(directory)
+            return directory
+        return None
+
+    def launch(self, options) -> Chrome:
+        if not Config.BROWSER_PERSISTENT_PROFILES:
+            return Chrome(options=options)
+
+        with self._lock:
+            directory = self._profile_directory()
+        if directory is None:
+            logs.log_error(
+                f"All {Config.BROWSER_MAX_PROFILES} browser profiles are used, "
+                "Chrome is started with a temporary profile"
+            )
+            return Chrome(options=options)
+
+        options.add_argument(f"--user-data-dir={directory}")
+        try:
+            driver = Chrome(options=options)
+        except Exception:
+            self.forget(directory)
+            raise
+        driver.profile_directory = directory
+        return driver
+
+    def forget(self, directory: Optional[str]) -> None:
+        """Profile can be used by the next driver"""
+        with self._lock:
+            self._profiles.discard(directory)
+
+    def start(self, options_factory: Callable[[], Any]) -> None:
+        """Launch drivers in advance, options_factory returns options of a new driver"""
+        self.enabled = True
+        self._options_factory = options_factory
+        for _ in range(Config.BROWSER_POOL_SIZE - len(self._idle)):
+            self._idle.append(self.launch(options_factory()))
+
+    def acquire(self, options) -> Chrome:
+        """Return a healthy idle driver or launch a new one"""
+        if not self.enabled:
+            return self.launch(options)
+
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self.launch(options)
+                break
+            if driver.is_alive():
+                break
+            self._discard(driver)
+
+        with self._lock:
+            self._lent.append(driver)
+        return driver
+
+    def release(self, driver: Chrome) -> bool:
+        """Return the driver to the pool, False if it doesn't belong to the pool
+        Driver which died while it was lent is replaced by a new one"""
+        with self._lock:
+            if not self.enabled:
+                return False
+            if driver not in self._lent:
+                return driver in self._idle
+            self._lent.remove(driver)
+
+        if not driver.is_alive():
+            self._discard(driver)
+            try:
+                driver = self.launch(self._options_factory())
+            except Exception as e:
+                logs.log_error(f"An error occurred while replacing dead Chrome: {e}")
+                return True
+        self._add_idle(driver)
+        return True
+
+    def _add_idle(self, driver: Chrome) -> None:
+        """Keep the driver for the next pipeline, it's closed if the pool was closed meanwhile"""
+        with self._lock:
+            if self.enabled:
+                self._idle.append(driver)
+                return
+        self._discard(driver)
+
+    def _discard(self, driver: Chrome) -> None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logs.log_error(f"An error occurred while closing Chrome: {e}")
+
+    def close(self) -> None:
+        """Quit all drivers of the pool"""
+        with self._lock:
+            self.enabled = False
+            drivers, self._idle, self._lent = self._idle + self._lent, [], []
+        for driver in drivers:
+            self._discard(driver)
+
+
+browser_pool = BrowserPool()
+
+
+def get_driver(options, load_images: bool = False) -> Chrome:
+    """Return Chrome for a scraper from the browser pool"""
+    driver = browser_pool.acquire(options)
+    driver.block_urls(images=not load_images)
+    return driver
@@ -1,12 +1,14 @@
-import pickle
+from typing import Callable, Set
 
-from rich import print as rprint
-from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 
+from . import session
+from .driver import get_driver
+from .incremental import KnownItemsTracker
 from .scraper import Scraper
-from ..config import Config
 from ..logs import Logs
+from ..metrics import metrics
+from ..repository import person_repository
 
 logs = Logs()
 
@@ -16,23 +18,21 @@ class BaseFacebookScraper(Scraper):
         super().__init__()
         self._user_id = user_id
         self._base_url = base_url.format(self._user_id)
-        self._driver = webdriver.Chrome(options=self._chrome_driver_configuration())
-        self._driver.get(self._base_url)
+        with metrics.timer("driver_start"):
+            self._driver = get_driver(
+                self._chrome_driver_configuration(), self.load_images
+            )
         self._wait = WebDriverWait(self._driver, 10)
         self.success = False
 
-    def _load_cookies(self) -> None:
-        try:
-            self._driver.delete_all_cookies()
-            with open(Config.COOKIES_FILE_PATH, "rb") as file:
-                cookies = pickle.load(file)
-                for cookie in cookies:
-                    try:
-                        self._driver.add_cookie(cookie)
-                    except Exception as e:
-                        logs.log_error(f"An Error occurred adding cookies {e}")
-                        rprint(f"An Error occurred while adding cookies {e}")
+    def _open_with_session(self) -> None:
+        """Load the page of the scraper logged in, cookies are set before the first navigation"""
+        session.open_with_session(self._driver, self._base_url)
 
-        except Exception as e:
-            logs.log_error(f"An Error occurred while loading cookies: {e}")
-            rprint(f"An Error occurred while loading cookies {e}")
+    def _load_known_items(
+        self, get_known_urls: Callable[[int], Set[str]]
+    ) -> KnownItemsTracker:
+        """Preload urls already saved for this person to scrape only new items"""
+        person = person_repository.get_person(self._user_id)
+        known_urls = get_known_urls(person.id) if person else set()
+        return KnownItemsTracker(known_urls)
@@ -0,0 +1,111 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+# Responses of Facebook API are captured only from this endpoint
+GRAPHQL_URL = "/api/graphql/"
+
+# Prefix added by Facebook to some JSON responses to prevent JSON hijacking
+JSON_PREFIX = "for (;;);"
+
+# Type names of search results for every search source
+SEARCH_TYPENAMES = {
+    "people": {"User"},
+    "pages": {"Page"},
+    "groups": {"Group"},
+    "places": {"Page", "Place"},
+    "events": {"Event"},
+}
+
+
+def parse_response_body(body: str) -> List[Any]:
+    """
+    Return JSON documents from the response body
+
+    Facebook streams deferred parts of a query in the same response,
+    every part is a separate JSON document in its own line.
+    """
+    payloads = []
+    for line in body.splitlines():
+        line = line.strip()
+        if line.startswith(JSON_PREFIX):
+            line = line[len(JSON_PREFIX) :]
+        if not line:
+            continue
+        try:
+            payloads.append(json.loads(line))
+        except ValueError:
+            continue
+    return payloads
+
+
+def iter_objects(data: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every JSON object nested in data"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            yield value
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+
+def iter_typename(
+    payloads: Iterable[Any], typenames: Set[str]
+) -> Iterator[Dict[str, Any]]:
+    """Yield objects of the given GraphQL types"""
+    for payload in payloads:
+        for obj in iter_objects(payload):
+            if obj.get("__typename") in typenames:
+                yield obj
+
+
+def _text(value: Any) -> str:
+    """Return text of GraphQL TextWithEntities or a plain string"""
+    if isinstance(value, dict):
+        value = value.get("text")
+    return value.strip() if isinstance(value, str) else ""
+
+
+def parse_friends(payloads: Iterable[Any]) -> List[Dict[str, str]]:
+    """Return usernames and urls to the profile of friends list items"""
+    friends = {}
+    for item in iter_typename(payloads, {"TimelineAppCollectionItem"}):
+        username = _text(item.get("title"))
+        url = item.get("url")
+        if username and isinstance(url, str) and url not in friends:
+            friends[url] = {"username": username, "url": url}
+    return list(friends.values())
+
+
+def parse_post_urls(payloads: Iterable[Any]) -> List[str]:
+    """Return urls of posts of the timeline"""
+    return list(
+        dict.fromkeys(
+            story["url"]
+            for story in iter_typename(payloads, {"Story"})
+            if isinstance(story.get("url"), str)
+        )
+    )
+
+
+def parse_image_urls(payloads: Iterable[Any]) -> List[str]:
+    """Return urls of photos of the photos tab"""
+    urls = []
+    for photo in iter_typename(payloads, {"Photo"}):
+        image = photo.get("image") or photo.get("photo_image") or {}
+        if isinstance(image, dict) and isinstance(image.get("uri"), str):
+            urls.append(image["uri"])
+    return list(dict.fromkeys(urls))
+
+
+def parse_search_results(payloads: Iterable[Any], source: str) -> List[str]:
+    """Return urls of search results of the source (people, pages, groups...)"""
+    typenames = SEARCH_TYPENAMES.get(source, set())
+    return list(
+        dict.fromkeys(
+            result["url"]
+            for result in iter_typename(payloads, typenames)
+            if isinstance(result.get("url"), str)
+        )
+    )
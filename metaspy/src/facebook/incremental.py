@@ -0,0 +1,42 @@
+from typing import Set
+
+from ..config import Config
+
+
+class KnownItemsTracker:
+    """
+    Track items that are already stored in the database during an incremental scrape
+
+    Every item is checked only once per run, so elements that are visible again after
+    the next scroll don't affect the run of consecutive known items.
+    """
+
+    def __init__(
+        self, known_items: Set[str], stop_after: int = Config.INCREMENTAL_STOP_AFTER
+    ) -> None:
+        self._known_items = known_items
+        self._seen_items = set()
+        self._stop_after = stop_after
+        self._known_streak = 0
+
+    def is_new(self, item: str) -> bool:
+        """Return True if the item wasn't seen in this run and isn't stored in the database"""
+        if item in self._seen_items:
+            return False
+
+        self._seen_items.add(item)
+        if item in self._known_items:
+            self._known_streak += 1
+            return False
+
+        self._known_streak = 0
+        return True
+
+    @property
+    def known_items(self) -> Set[str]:
+        return self._known_items
+
+    @property
+    def should_stop(self) -> bool:
+        """Return True when enough consecutive known items appeared to stop scrolling"""
+        return self._known_streak >= self._stop_after
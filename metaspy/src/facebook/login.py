@@ -22,7 +22,10 @@ class FacebookLogIn(Scraper):
     def __init__(self) -> None:
         super().__init__()
         self._base_url = "https://www.facebook.com/"
-        self._driver = webdriver.Chrome(options=self._chrome_driver_configuration())
+        # Log in needs a visible window
+        self._driver = webdriver.Chrome(
+            options=self._chrome_driver_configuration(lean=False)
+        )
         self._driver = self._driver
         self._driver.get(self._base_url)
         self._cookie_term_css_selector = "._42ft._4jy0._al65._4jy3._4jy1.selected._51sy"
@@ -0,0 +1,152 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from . import graphql
+from .incremental import KnownItemsTracker
+from .scroll import scroll_page_callback
+from ..config import Config
+from ..logs import Logs
+from ..metrics import metrics
+from ..reporting import reporter
+
+logs = Logs()
+
+# Data of the first page is rendered by the server into these script tags
+PAGE_DATA_SCRIPT = """
+return Array.from(
+    document.querySelectorAll('script[type="application/json"]'),
+    script => script.textContent
+);
+"""
+
+
+def is_enabled() -> bool:
+    """Return True if extractors read captured API responses instead of the DOM"""
+    return Config.EXTRACTION_BACKEND == "network"
+
+
+def parse_log_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Return DevTools event ({"method": ..., "params": ...}) of a performance log entry"""
+    try:
+        return json.loads(entry["message"])["message"]
+    except (KeyError, TypeError, ValueError):
+        return {}
+
+
+class NetworkCapture:
+    """
+    Read API responses of the page loaded in Chrome
+
+    Chrome is started with the performance log (see Scraper._chrome_driver_configuration),
+    responses of Facebook GraphQL API are found in the log and their bodies are read
+    with the Network.getResponseBody command once they finish loading. Responses of
+    other documents (e.g. the previous page of a pooled driver) are skipped.
+    """
+
+    def __init__(self, driver, url_fragment: str = graphql.GRAPHQL_URL) -> None:
+        self._driver = driver
+        self._url_fragment = url_fragment
+        self._pending: Set[str] = set()
+        self._loader_id = self._current_loader_id()
+
+    def _current_loader_id(self) -> Optional[str]:
+        try:
+            frame_tree = self._driver.execute_cdp_cmd("Page.getFrameTree", {})
+            return frame_tree["frameTree"]["frame"]["loaderId"]
+        except Exception as e:
+            logs.log_error(f"An error occurred while reading the loaded page: {e}")
+            return None
+
+    def _response_body(self, request_id: str) -> str:
+        try:
+            response = self._driver.execute_cdp_cmd(
+                "Network.getResponseBody", {"requestId": request_id}
+            )
+        except Exception as e:
+            logs.log_error(f"An error occurred while reading response body: {e}")
+            return ""
+        body = response.get("body", "")
+        if response.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        return body
+
+    def read_page(self) -> List[Any]:
+        """Return JSON documents embedded in the loaded page"""
+        try:
+            with metrics.timer("network_capture"):
+                scripts = self._driver.execute_script(PAGE_DATA_SCRIPT) or []
+        except Exception as e:
+            logs.log_error(f"An error occurred while reading page data: {e}")
+            return []
+        return [
+            payload
+            for script in scripts
+            for payload in graphql.parse_response_body(script or "")
+        ]
+
+    def read(self) -> List[Any]:
+        """Return JSON documents of API responses finished since the last call"""
+        payloads = []
+        with metrics.timer("network_capture"):
+            for entry in self._driver.get_log("performance"):
+                event = parse_log_entry(entry)
+                method = event.get("method")
+                params = event.get("params", {})
+
+                if method == "Network.responseReceived":
+                    url = params.get("response", {}).get("url", "")
+                    loader_id = params.get("loaderId")
+                    if self._url_fragment in url and (
+                        self._loader_id is None or loader_id == self._loader_id
+                    ):
+                        self._pending.add(params.get("requestId"))
+
+                elif method == "Network.loadingFinished":
+                    request_id = params.get("requestId")
+                    if request_id in self._pending:
+                        self._pending.discard(request_id)
+                        body = self._response_body(request_id)
+                        payloads.extend(graphql.parse_response_body(body))
+
+        return payloads
+
+
+def extract_records(
+    driver,
+    parse: Callable[[List[Any]], List[Any]],
+    kind: str,
+    known_items: Optional[KnownItemsTracker] = None,
+    key: Callable[[Any], str] = lambda record: record,
+    max_records: Optional[int] = None,
+) -> List[Any]:
+    """
+    Scroll the loaded page and return records parsed from its data and API responses
+
+    Records are checked by key with known_items in incremental runs. Scrolling stops
+    when known_items says so or after max_records records.
+    """
+    capture = NetworkCapture(driver)
+    records = []
+    seen = set()
+
+    def add_records(payloads: List[Any]) -> bool:
+        for record in parse(payloads):
+            record_key = key(record)
+            if record_key in seen:
+                continue
+            seen.add(record_key)
+            if known_items and not known_items.is_new(record_key):
+                continue
+            counter.add(record_key)
+            records.append(record)
+
+        if max_records is not None and len(records) >= max_records:
+            return True
+        return known_items is not None and known_items.should_stop
+
+    with reporter.counter(kind) as counter:
+        if not add_records(capture.read_page() + capture.read()):
+            scroll_page_callback(driver, lambda driver: add_records(capture.read()))
+
+    return records[:max_records]
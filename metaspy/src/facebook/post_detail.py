@@ -1,13 +1,13 @@
-import pickle
 from typing import List, Dict, Optional, Any
 
 from rich import print as rprint
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 
+from . import session
+from .driver import get_driver
 from .scraper import Scraper
-from ..config import Config
 from ..logs import Logs
+from ..metrics import metrics
 from ..repository import person_repository, post_repository
 from ..utils import output, save_to_json
 
@@ -19,9 +19,15 @@ class PostDetail(Scraper):
     Scrape detail of Post
     """
 
+    # Image urls are read from loaded images
+    load_images = True
+
     def __init__(self, url: str) -> None:
         super().__init__()
-        self._driver = webdriver.Chrome(options=self._chrome_driver_configuration())
+        with metrics.timer("driver_start"):
+            self._driver = get_driver(
+                self._chrome_driver_configuration(), self.load_images
+            )
         self._url = url
         self.success = False
 
@@ -30,23 +36,6 @@ class PostDetail(Scraper):
         """Check if pipeline is success"""
         return self.success
 
-    def _load_cookies(self) -> None:
-        """Load cookies with log in session"""
-        try:
-            self._driver.delete_all_cookies()
-            with open(Config.COOKIES_FILE_PATH, "rb") as file:
-                cookies = pickle.load(file)
-                for cookie in cookies:
-                    try:
-                        self._driver.add_cookie(cookie)
-                    except Exception as e:
-                        logs.log_error(f"An Error occurred adding cookies {e}")
-                        rprint(f"An Error occurred while adding cookies {e}")
-
-        except Exception as e:
-            logs.log_error(f"An Error occurred while loading cookies: {e}")
-            rprint(f"An Error occurred while loading cookies {e}")
-
     @staticmethod
     def _extract_number(text: str) -> Optional[int]:
         """Extract number from string
@@ -195,6 +184,7 @@ class PostDetail(Scraper):
             image_urls_dict[image_url] = image_url
         return image_urls_dict
 
+    @metrics.timed("extract")
     def scrape_post_data(self) -> List[Dict[str, Any]]:
         """Scrape data from post
         Content, url, number of likes, comments and shares
@@ -209,9 +199,7 @@ class PostDetail(Scraper):
         photo = False
 
         try:
-            self._driver.get(self._url)
-            self._load_cookies()
-            self._driver.refresh()
+            session.open_with_session(self._driver, self._url)
 
             if "post" in self._url:
                 post = True
@@ -243,9 +231,14 @@ class PostDetail(Scraper):
 
 
 def pipeline(name: str = None, post_url: str = None):
+    with metrics.pipeline("PostDetail.pipeline", name or post_url):
+        _pipeline(name, post_url)
+
+
+def _pipeline(name: str = None, post_url: str = None):
     if name:
         if not person_repository.person_exists(name):
-            print(
+            rprint(
                 "This person does not exist in database, at first you should scrape post urls"
             )
             return
@@ -263,6 +256,7 @@ def pipeline(name: str = None, post_url: str = None):
 
             scraper = PostDetail(post.url)
             scraped_data = scraper.scrape_post_data()
+            scraper._driver.quit()
 
             if not any(scraped_data):
                 output.print_no_data_info()
@@ -273,17 +267,19 @@ def pipeline(name: str = None, post_url: str = None):
                 save_to_json.SaveJSON(
                     name,
                     scraped_data,
+                    section="post_details",
                 ).save()
 
-                for data in scraped_data:
-                    post_repository.create_post(
-                        person_id=person_object.id,
-                        url=data["url"],
-                        number_of_likes=data["number_of_likes"],
-                        image_urls=data["image_url"],
-                        content=data["content"],
-                        author=data["author"],
-                    )
+                with metrics.timer("db_write", items=len(scraped_data)):
+                    for data in scraped_data:
+                        post_repository.create_post(
+                            person_id=person_object.id,
+                            url=data["url"],
+                            number_of_likes=data["number_of_likes"],
+                            image_urls=data["image_url"],
+                            content=data["content"],
+                            author=data["author"],
+                        )
 
     if post_url:
         if "pages" in post_url:
@@ -292,6 +288,7 @@ def pipeline(name: str = None, post_url: str = None):
 
         scraper = PostDetail(post_url)
         scraped_data = scraper.scrape_post_data()
+        scraper._driver.quit()
 
         if not any(scraped_data):
             output.print_no_data_info()
@@ -301,6 +298,7 @@ def pipeline(name: str = None, post_url: str = None):
             save_to_json.SaveJSON(
                 post_url,
                 scraped_data,
+                section="post_details",
             ).save()
 
             if not person_repository.person_exists("Anonymous"):
@@ -310,15 +308,16 @@ def pipeline(name: str = None, post_url: str = None):
 
             person_object = person_repository.get_person("Anonymous")
 
-            for data in scraped_data:
-                post_repository.create_post(
-                    url=data["url"],
-                    number_of_likes=data["number_of_likes"],
-                    image_urls=data["image_url"],
-                    content=data["content"],
-                    author=data["author"],
-                    person_id=person_object.id,  # Anonymous user
-                )
+            with metrics.timer("db_write", items=len(scraped_data)):
+                for data in scraped_data:
+                    post_repository.create_post(
+                        url=data["url"],
+                        number_of_likes=data["number_of_likes"],
+                        image_urls=data["image_url"],
+                        content=data["content"],
+                        author=data["author"],
+                        person_id=person_object.id,  # Anonymous user
+                    )
 
-                created_post = post_repository.get_post_by_url(data["url"])
-                post_repository.mark_post_as_scraped(created_post.id)
+                    created_post = post_repository.get_post_by_url(data["url"])
+                    post_repository.mark_post_as_scraped(created_post.id)
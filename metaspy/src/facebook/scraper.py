@@ -1,5 +1,9 @@
+from typing import Optional
+
 from selenium.webdriver.chrome.options import Options
 
+from ..config import Config
+
 
 class Scraper:
     """
@@ -8,18 +12,21 @@ class Scraper:
     This class provides common methods and configurations for web scraping tasks using Selenium.
 
     Attributes:
-        None
+        load_images (bool): Scrapers reading images set it to True, so images
+            are not blocked in lean browser mode.
 
     Methods:
-        _chrome_driver_configuration() -> Options:
+        _chrome_driver_configuration(lean: Optional[bool] = None) -> Options:
             Configures Chrome WebDriver options for Selenium.
 
             Returns:
                 Options: A configured ChromeOptions instance to be used with Chrome WebDriver.
     """
 
+    load_images = False
+
     @staticmethod
-    def _chrome_driver_configuration() -> Options:
+    def _chrome_driver_configuration(lean: Optional[bool] = None) -> Options:
         """
         Configures Chrome WebDriver options for Selenium.
 
@@ -27,6 +34,11 @@ class Scraper:
         when creating an instance of it. These options modify the behavior of the Chrome browser
         during automated testing or scraping.
 
+        Args:
+            lean (Optional[bool]): Run Chrome with a smaller window (headless if
+                Config.BROWSER_HEADLESS is set) and don't wait for images and stylesheets
+                when a page loads. Config.BROWSER_LEAN by default.
+
         Returns:
             Options: A configured ChromeOptions instance to be used with Chrome WebDriver.
         """
@@ -45,4 +57,18 @@ class Scraper:
         )
         chrome_options.add_argument("--profile-directory=Default")
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+
+        if Config.BROWSER_LEAN if lean is None else lean:
+            if Config.BROWSER_HEADLESS:
+                chrome_options.add_argument("--headless=new")
+            width, height = Config.BROWSER_WINDOW_SIZE
+            chrome_options.add_argument(f"--window-size={width},{height}")
+            chrome_options.page_load_strategy = "eager"
+
+        if Config.EXTRACTION_BACKEND == "network":
+            # API responses are read from the performance log
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            chrome_options.add_experimental_option(
+                "perfLoggingPrefs", {"enableNetwork": True, "enablePage": False}
+            )
         return chrome_options
@@ -2,6 +2,7 @@ from time import sleep
 
 from ..config import Config
 from ..logs import Logs
+from ..metrics import metrics
 
 logs = Logs()
 
@@ -15,10 +16,11 @@ def scroll_page(driver) -> None:
         consecutive_scrolls = 0
 
         while consecutive_scrolls < Config.MAX_CONSECUTIVE_SCROLLS:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            with metrics.timer("scroll"):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-            sleep(Config.SCROLL_PAUSE_TIME)
-            new_height = driver.execute_script("return document.body.scrollHeight")
+                sleep(Config.SCROLL_PAUSE_TIME)
+                new_height = driver.execute_script("return document.body.scrollHeight")
 
             if new_height == last_height:
                 consecutive_scrolls += 1
@@ -33,16 +35,18 @@ def scroll_page(driver) -> None:
 def scroll_page_callback(driver, callback) -> None:
     """
     Scrolls the page to load more data from a website
+    Scrolling stops early when the callback returns True
     """
     try:
         last_height = driver.execute_script("return document.body.scrollHeight")
         consecutive_scrolls = 0
 
         while consecutive_scrolls < Config.MAX_CONSECUTIVE_SCROLLS:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            with metrics.timer("scroll"):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-            sleep(Config.SCROLL_PAUSE_TIME)
-            new_height = driver.execute_script("return document.body.scrollHeight")
+                sleep(Config.SCROLL_PAUSE_TIME)
+                new_height = driver.execute_script("return document.body.scrollHeight")
 
             if new_height == last_height:
                 consecutive_scrolls += 1
@@ -51,7 +55,10 @@ def scroll_page_callback(driver, callback) -> None:
 
             last_height = new_height
 
-            callback(driver)
+            with metrics.timer("scroll_callback"):
+                stop = callback(driver)
+            if stop:
+                break
 
     except Exception as e:
         logs.log_error(f"Error occurred while scrolling: {e}")
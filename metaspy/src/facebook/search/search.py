@@ -1,7 +1,8 @@
-from rich import print as rprint
 from ...logs import Logs
+from ...reporting import reporter
 from selenium.webdriver.common.by import By
 from typing import List, Optional
+from .. import graphql, network
 from ..scroll import scroll_page_callback
 from .search_post import SearchBase
 from enum import Enum
@@ -34,6 +35,16 @@ class Search(SearchBase):
         try:
             self.load_driver(url)
 
+            if network.is_enabled():
+                return network.extract_records(
+                    self._driver,
+                    lambda payloads: graphql.parse_search_results(
+                        payloads, self.source
+                    ),
+                    self.source,
+                    max_records=self.max_result,
+                )
+
             def extract_callback(driver):
                 elements = driver.find_elements(
                     By.CSS_SELECTOR,
@@ -46,10 +57,11 @@ class Search(SearchBase):
                         self.success = True
 
                     if url not in extracted_urls:
-                        rprint(f"Extracted {self.source}: {url}")
+                        counter.add(url)
                         extracted_urls.append(url)
 
-            scroll_page_callback(self._driver, extract_callback)
+            with reporter.counter(self.source) as counter:
+                scroll_page_callback(self._driver, extract_callback)
 
         except Exception as e:
             logs.log_error(f"An error occurred {e}")
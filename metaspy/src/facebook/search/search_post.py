@@ -1,5 +1,5 @@
-from rich import print as rprint
 from ...logs import Logs
+from ...reporting import reporter
 from selenium.webdriver.common.by import By
 from typing import List
 from ..scroll import scroll_page_callback
@@ -69,12 +69,13 @@ class SearchPost(SearchBase):
                         self.success = True
 
                     if parsed_url not in excracted_elements:
-                        rprint(f"Extracted post: {parsed_url}")
+                        counter.add(parsed_url)
                         excracted_elements.append(parsed_url)
 
                     self._move_cursor_away()
 
-            scroll_page_callback(self._driver, extract_callback)
+            with reporter.counter("posts") as counter:
+                scroll_page_callback(self._driver, extract_callback)
 
         except Exception as e:
             logs.log_error(f"An error occurred: {e}")
@@ -0,0 +1,87 @@
+import os
+import pickle
+from typing import Any, Dict, List, Tuple
+
+from rich import print as rprint
+
+from ..config import Config
+from ..logs import Logs
+from ..metrics import metrics
+
+logs = Logs()
+
+# Cookies of every file with its modification time, files are read again only when they change
+_cookies: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+SAME_SITE_VALUES = {"strict": "Strict", "lax": "Lax", "none": "None"}
+
+
+def load_cookies(path: str = Config.COOKIES_FILE_PATH) -> List[Dict[str, Any]]:
+    """Return cookies saved by log in, the file is unpickled once per process"""
+    try:
+        modified = os.path.getmtime(path)
+        if path not in _cookies or _cookies[path][0] != modified:
+            with open(path, "rb") as file:
+                _cookies[path] = (modified, pickle.load(file))
+        return _cookies[path][1]
+
+    except Exception as e:
+        logs.log_error(f"An Error occurred while loading cookies: {e}")
+        rprint(f"An Error occurred while loading cookies {e}")
+        return []
+
+
+def to_cdp_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert cookie in WebDriver format to Network.CookieParam of Chrome DevTools Protocol"""
+    cdp_cookie = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain"),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if "expiry" in cookie:
+        cdp_cookie["expires"] = cookie["expiry"]
+    same_site = SAME_SITE_VALUES.get(str(cookie.get("sameSite", "")).lower())
+    if same_site:
+        cdp_cookie["sameSite"] = same_site
+    return cdp_cookie
+
+
+def _add_cookies_and_refresh(driver, url: str, cookies: List[Dict[str, Any]]) -> None:
+    """Load the page, add cookies one by one and load it again, used if CDP is not available"""
+    with metrics.timer("navigation"):
+        driver.get(url)
+    with metrics.timer("cookie_load"):
+        driver.delete_all_cookies()
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logs.log_error(f"An Error occurred adding cookies {e}")
+    with metrics.timer("navigation"):
+        driver.refresh()
+
+
+def open_with_cookies(driver, url: str, cookies: List[Dict[str, Any]]) -> None:
+    """Replace cookies of the browser before the first navigation and load the url once"""
+    try:
+        with metrics.timer("cookie_load"):
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd(
+                "Network.setCookies",
+                {"cookies": [to_cdp_cookie(cookie) for cookie in cookies]},
+            )
+    except Exception as e:
+        logs.log_error(f"An Error occurred while setting cookies through CDP: {e}")
+        _add_cookies_and_refresh(driver, url, cookies)
+        return
+
+    with metrics.timer("navigation"):
+        driver.get(url)
+
+
+def open_with_session(driver, url: str) -> None:
+    """Load the url logged in to Facebook"""
+    open_with_cookies(driver, url, load_cookies())
@@ -1,8 +1,12 @@
+from typing import Any, Dict, List
+
+from ..facebook import session
+from ..facebook.driver import get_driver
 from ..facebook.scraper import Scraper
-from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from ..config import Config
 from ..logs import Logs
+from ..metrics import metrics
 
 logs = Logs()
 config = Config()
@@ -13,7 +17,22 @@ class BaseInstagramScraper(Scraper):
         super().__init__()
         self._user_id = user_id
         self._base_url = base_url.format(self._user_id)
-        self._driver = webdriver.Chrome(options=self._chrome_driver_configuration())
-        self._driver.get(self._base_url)
+        with metrics.timer("driver_start"):
+            self._driver = get_driver(
+                self._chrome_driver_configuration(), self.load_images
+            )
+        session.open_with_cookies(self._driver, self._base_url, self._cookies())
         self._wait = WebDriverWait(self._driver, 10)
         self.success = False
+
+    @staticmethod
+    def _cookies() -> List[Dict[str, Any]]:
+        """Cookie with session id of logged in Instagram account"""
+        return [
+            {
+                "name": "sessionid",
+                "value": config.INSTAGRAM_SESSIONID_VALUE,
+                "domain": ".instagram.com",
+                "path": "/",
+            }
+        ]
@@ -1,6 +1,129 @@
+import atexit
+import copy
+import json
 import logging
+import multiprocessing
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
 from .config import Config
+from .context import current_account, current_pipeline, current_step
+
+CONTEXT_FIELDS = {
+    "pipeline": current_pipeline,
+    "account": current_account,
+    "step": current_step,
+}
+
+
+class ContextFilter(logging.Filter):
+    """Add pipeline, account and step of the logging thread to the record
+    Runs before the record is queued, the listener thread doesn't know the context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field, variable in CONTEXT_FIELDS.items():
+            setattr(record, field, variable.get())
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            data[field] = getattr(record, field, None)
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SharedQueueHandler(QueueHandler):
+    """
+    Queue records, they are written to the rotating log file by a listener thread
+
+    Worker processes (e.g. of a ProcessPoolExecutor) don't run atexit handlers, so queued
+    records would be lost there. They append records to the log file directly instead,
+    only the main process rotates it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.addFilter(ContextFilter())
+        self._pid = None
+        self._listener: Optional[QueueListener] = None
+        self.start()
+
+    def start(self) -> None:
+        """Start the listener of the queue created in __init__, records queued while
+        it was stopped are written too"""
+        file_handler = RotatingFileHandler(
+            Config.LOG_FILE_PATH,
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(JSONFormatter())
+        self._pid = os.getpid()
+        self._listener = QueueListener(self.queue, file_handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Write queued records and stop the listener"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+        self._listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge message arguments, the traceback is kept apart for JSONFormatter
+        QueueHandler.prepare would append it to the message"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = JSONFormatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if multiprocessing.parent_process() is not None:
+            self.write(record)
+        else:
+            super().emit(record)
+
+    def write(self, record: logging.LogRecord) -> None:
+        """Append the record to the log file without the listener"""
+        file_handler = logging.FileHandler(Config.LOG_FILE_PATH, encoding="utf-8")
+        file_handler.setFormatter(JSONFormatter())
+        try:
+            file_handler.emit(self.prepare(record))
+        finally:
+            file_handler.close()
+
+
+_handler: Optional[SharedQueueHandler] = None
+
+
+def get_handler() -> SharedQueueHandler:
+    """Return the handler shared by all loggers, it's created on first use"""
+    global _handler
+    if _handler is None:
+        _handler = SharedQueueHandler()
+        atexit.register(_handler.stop)
+    return _handler
 
 
 class Logs(logging.Logger):
@@ -8,12 +131,7 @@ class Logs(logging.Logger):
 
     def __init__(self, name="logger", level=logging.ERROR):
         super().__init__(name, level=level)
-        file_handler = logging.FileHandler(Config.LOG_FILE_PATH)
-        file_handler.setLevel(level)
-        file_handler.setFormatter(
-            logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        )
-        self.addHandler(file_handler)
+        self.addHandler(get_handler())
 
     def log_error(self, message):
         """Logs error message"""
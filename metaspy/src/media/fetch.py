@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import os
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+from rich.progress import Progress
+
+from . import phash, store, thumbnails, validation
+from .store import StoredMedia
+from ..config import Config
+from ..logs import Logs
+from ..metrics import metrics
+from ..repository import media_repository
+from ..tracing import tracer
+
+logs = Logs()
+
+
+class MediaFetcher:
+    """
+    Download media files into the media store
+
+    All requests share one connection pool. The number of open connections is limited
+    in total and per host and response bodies are streamed to disk in chunks.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = Config.MEDIA_FETCH_CONCURRENCY,
+        per_host: int = Config.MEDIA_FETCH_PER_HOST,
+        timeout: int = Config.MEDIA_FETCH_TIMEOUT,
+    ) -> None:
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        extension: str,
+        sniff: Optional[Callable[[bytes], Optional[str]]],
+    ) -> Optional[StoredMedia]:
+        """Stream response body to the .part file, hash it and move it to the store
+        If the .part file exists the download is resumed with a Range request.
+        sniff gets the first bytes of the file and returns its extension,
+        the download is cancelled if it returns None"""
+        path = store.part_path(url)
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with tracer.span("download_media", "download", url=url, offset=offset):
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 416:
+                        # Remote file changed and it's shorter than the .part file
+                        os.remove(path)
+                    response.raise_for_status()
+
+                    # Server may ignore the Range header and send the whole file
+                    resumed = response.status == 206
+                    digest = store.sha256_digest(path) if resumed else hashlib.sha256()
+                    header = (
+                        store.read_header(path, validation.HEADER_SIZE)
+                        if resumed
+                        else b""
+                    )
+                    sniffed = sniff is None
+
+                    with open(path, "ab" if resumed else "wb") as file:
+                        async for chunk in response.content.iter_chunked(
+                            store.CHUNK_SIZE
+                        ):
+                            if not sniffed:
+                                header += chunk[: validation.HEADER_SIZE - len(header)]
+                                if len(header) == validation.HEADER_SIZE:
+                                    extension = self._sniff(sniff, header, url)
+                                    sniffed = True
+                                    if extension is None:
+                                        break
+                            digest.update(chunk)
+                            file.write(chunk)
+
+            if not sniffed:
+                # File is shorter than the header
+                extension = self._sniff(sniff, header, url)
+            if extension is None:
+                os.remove(path)
+                return None
+
+            return store.ingest_file(path, extension, digest.hexdigest())
+
+        except Exception as e:
+            logs.log_error(f"Request error {url}: {e}")
+            return None
+
+    @staticmethod
+    def _sniff(
+        sniff: Callable[[bytes], Optional[str]], header: bytes, url: str
+    ) -> Optional[str]:
+        extension = sniff(header)
+        if extension is None:
+            logs.log_error(f"Skipping {url}, unknown file type {header!r}")
+        return extension
+
+    async def _fetch_all(
+        self,
+        urls: List[str],
+        extension: str,
+        sniff: Optional[Callable[[bytes], Optional[str]]],
+        on_done: Optional[Callable[[str, Optional[StoredMedia]], None]],
+    ) -> Dict[str, Optional[StoredMedia]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=self.per_host
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+
+            async def fetch_one(url: str) -> Optional[StoredMedia]:
+                async with semaphore:
+                    stored = await self._fetch(session, url, extension, sniff)
+                if on_done is not None:
+                    on_done(url, stored)
+                return stored
+
+            results = await asyncio.gather(*(fetch_one(url) for url in urls))
+
+        return dict(zip(urls, results))
+
+    def fetch(
+        self,
+        urls: List[str],
+        extension: str,
+        sniff: Optional[Callable[[bytes], Optional[str]]] = None,
+        on_done: Optional[Callable[[str, Optional[StoredMedia]], None]] = None,
+    ) -> Dict[str, Optional[StoredMedia]]:
+        """Download urls concurrently, return stored file (or None if it failed) for every url
+        Files get the given extension unless sniff recognizes their type"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        return asyncio.run(self._fetch_all(urls, extension, sniff, on_done))
+
+
+def download_images(image_urls: List[str], directory: str) -> List[str]:
+    """Download images to the store and link them into the directory
+    Images with URL already in the store are only linked. Unfinished downloads of previous runs
+    are retried, their status is saved in the database. Near-duplicates of stored images
+    (by perceptual hash) are linked too and the original is recorded, the API collapses them.
+    Return paths of the linked images
+    """
+    image_paths = []
+    new_urls = []
+    # Stored files are linked into this directory too, it's recorded with them
+    known_files = []
+
+    retry_urls = media_repository.get_unfinished_urls(directory)
+    urls = list(dict.fromkeys([*image_urls, *retry_urls]))
+    stored_files = media_repository.get_media_files(urls)
+    for url in urls:
+        media_file = stored_files.get(url)
+        if media_file:
+            image_paths.append(
+                store.link(media_file.content_hash, media_file.extension, directory)
+            )
+            stored = store.stored_media(media_file)
+            known_files.append(store.media_file_row(url, stored, directory))
+        else:
+            new_urls.append(url)
+
+    media_repository.update_media_files(
+        known_files + store.pending_rows(new_urls, directory)
+    )
+
+    with Progress() as progress:
+        task = progress.add_task("[cyan]Downloading...", total=len(new_urls))
+        results = MediaFetcher().fetch(
+            new_urls,
+            "jpg",
+            sniff=validation.sniff_image_type,
+            on_done=lambda url, stored: progress.update(task, advance=1),
+        )
+
+    if Config.MEDIA_VERIFY_IMAGES:
+        verified = validation.verify_images(
+            [stored.path for stored in results.values() if stored]
+        )
+        # Content of a broken download may already be stored for another url
+        stored_hashes = media_repository.get_stored_hashes(
+            stored.content_hash for stored in results.values() if stored
+        )
+        for url, stored in results.items():
+            if stored and not verified[stored.path]:
+                if stored.content_hash not in stored_hashes and os.path.exists(
+                    stored.path
+                ):
+                    os.remove(stored.path)
+                results[url] = None
+
+    hashes = phash.compute_hashes(
+        [stored.path for stored in results.values() if stored]
+    )
+    index = phash.BKTree(
+        (phash.from_hex(image_hash), content_hash)
+        for image_hash, content_hash in media_repository.get_image_hashes()
+    )
+
+    media_files = []
+    originals = []
+    for url, stored in results.items():
+        if not stored:
+            partial = os.path.exists(store.part_path(url))
+            media_files.append(store.unfinished_row(url, directory, partial))
+            continue
+
+        media_file = store.media_file_row(url, stored, directory)
+        media_files.append(media_file)
+
+        image_hash = hashes.get(stored.path)
+        if image_hash is not None:
+            media_file["phash"] = phash.to_hex(image_hash)
+            matches = index.search(image_hash, Config.PHASH_MAX_DISTANCE)
+            if not matches:
+                index.add(image_hash, stored.content_hash)
+            elif matches[0][1] != stored.content_hash:
+                # Index covers all accounts, so the image is linked into this directory anyway
+                media_file["duplicate_of"] = matches[0][1]
+
+        if "duplicate_of" not in media_file:
+            originals.append(stored)
+        image_paths.append(store.link(stored.content_hash, stored.extension, directory))
+
+    with metrics.timer("db_write", items=len(media_files)):
+        media_repository.update_media_files(media_files)
+
+    with metrics.timer("thumbnails", items=len(originals)):
+        thumbnails.create_thumbnails(originals)
+
+    return image_paths
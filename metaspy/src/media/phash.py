@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config import Config
+from ..logs import Logs
+
+logs = Logs()
+
+HASH_SIZE = 8
+
+
+def dhash(path: str, hash_size: int = HASH_SIZE) -> int:
+    """Return difference hash of the image, similar images have hashes with few different bits
+    The image is scaled down to (hash_size + 1) x hash_size grayscale pixels and every bit
+    says if a pixel is brighter than its right neighbour"""
+    with Image.open(path) as image:
+        small = image.convert("L").resize(
+            (hash_size + 1, hash_size), Image.Resampling.LANCZOS
+        )
+    pixels = small.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            left = pixels[row * (hash_size + 1) + column]
+            right = pixels[row * (hash_size + 1) + column + 1]
+            value = value << 1 | (left > right)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_hex(value: int) -> str:
+    return f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def from_hex(value: str) -> int:
+    return int(value, 16)
+
+
+def _safe_dhash(path: str) -> Optional[int]:
+    try:
+        return dhash(path)
+    except Exception as e:
+        logs.log_error(f"Perceptual hash of {path} failed: {e}")
+        return None
+
+
+def compute_hashes(paths: List[str]) -> Dict[str, Optional[int]]:
+    """Compute hashes in a pool of Config.PHASH_WORKERS processes, None if the image can't be read"""
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+    with ProcessPoolExecutor(max_workers=Config.PHASH_WORKERS) as executor:
+        return dict(zip(paths, executor.map(_safe_dhash, paths)))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of hashes using hamming distance
+
+    Search compares the query only with nodes which distance to their parent
+    can be within the limit, so it doesn't check every stored hash.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, Any]] = ()) -> None:
+        self._root: Optional[Tuple[int, Any, Dict[int, tuple]]] = None
+        self._size = 0
+        for value, item in items:
+            self.add(value, item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: Any) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (value, item, {})
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, item, {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """Return (distance, item) of hashes not further than max_distance, the closest first"""
+        if self._root is None:
+            return []
+
+        result = []
+        nodes = [self._root]
+        while nodes:
+            node_value, item, children = nodes.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= max_distance:
+                result.append((distance, item))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    nodes.append(child)
+
+        return sorted(result, key=lambda match: match[0])
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import shutil
+import uuid
+from typing import List, NamedTuple, Optional
+
+from ..config import Config
+from ..logs import Logs
+from ..models import MediaStatus
+
+logs = Logs()
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredMedia(NamedTuple):
+    content_hash: str
+    extension: str
+    size: int
+    path: str
+
+
+def object_path(content_hash: str, extension: str) -> str:
+    """Return path of the stored file, objects are split into directories by the first 2 hash chars"""
+    return os.path.join(
+        Config.MEDIA_STORE_PATH,
+        "objects",
+        content_hash[:2],
+        f"{content_hash}.{extension}",
+    )
+
+
+def temporary_path(name: Optional[str] = None) -> str:
+    """Return path in the temporary directory of the store, it's on the same disk as objects"""
+    directory = os.path.join(Config.MEDIA_STORE_PATH, "tmp")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name or uuid.uuid4().hex)
+
+
+def url_key(url: str) -> str:
+    """Return name derived from the URL, it's the same in every run"""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def part_path(url: str) -> str:
+    """Return path of the partially downloaded file, download is resumed from its end"""
+    return temporary_path(f"{url_key(url)}.part")
+
+
+def read_header(path: str, size: int) -> bytes:
+    """Return first bytes of the file"""
+    with open(path, "rb") as file:
+        return file.read(size)
+
+
+def sha256_digest(path: str):
+    """Return SHA-256 object updated with the file content, more data can be added to it"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+
+def sha256_file(path: str) -> str:
+    """Return SHA-256 of the file content"""
+    return sha256_digest(path).hexdigest()
+
+
+def ingest_file(
+    path: str, extension: str, content_hash: Optional[str] = None
+) -> StoredMedia:
+    """Move the file into the store, the file is removed if the same content is already stored"""
+    content_hash = content_hash or sha256_file(path)
+    size = os.path.getsize(path)
+    destination = object_path(content_hash, extension)
+
+    if os.path.exists(destination):
+        os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(path, destination)
+
+    return StoredMedia(content_hash, extension, size, destination)
+
+
+def ingest_bytes(content: bytes, extension: str) -> StoredMedia:
+    """Save content in the store unless the same bytes are already there"""
+    content_hash = hashlib.sha256(content).hexdigest()
+    destination = object_path(content_hash, extension)
+
+    if not os.path.exists(destination):
+        path = temporary_path()
+        with open(path, "wb") as file:
+            file.write(content)
+        return ingest_file(path, extension, content_hash)
+
+    return StoredMedia(content_hash, extension, len(content), destination)
+
+
+def link(content_hash: str, extension: str, directory: str) -> str:
+    """Make stored file available in the given directory (e.g. images of a person)
+    Hardlink is used when it's possible, otherwise the file is copied"""
+    os.makedirs(directory, exist_ok=True)
+    source = object_path(content_hash, extension)
+    destination = os.path.join(directory, f"{content_hash}.{extension}")
+
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        # File is already linked, the name is the hash of its content
+        pass
+    except OSError as e:
+        logs.log_error(f"Hardlink not available, copying {source}: {e}")
+        shutil.copyfile(source, destination)
+
+    return destination
+
+
+def stored_media(media_file) -> StoredMedia:
+    """Return StoredMedia of the MediaFile object"""
+    return StoredMedia(
+        media_file.content_hash,
+        media_file.extension,
+        media_file.size,
+        object_path(media_file.content_hash, media_file.extension),
+    )
+
+
+def media_file_row(url: str, stored: StoredMedia, directory: str) -> dict:
+    """Return MediaFile fields mapping source URL to the stored content"""
+    return {
+        "url": url,
+        "status": MediaStatus.DONE,
+        "directory": directory,
+        "content_hash": stored.content_hash,
+        "extension": stored.extension,
+        "size": stored.size,
+    }
+
+
+def unfinished_row(url: str, directory: str, partial: bool) -> dict:
+    """Return MediaFile fields of a download which failed, partial downloads are resumed"""
+    return {
+        "url": url,
+        "status": MediaStatus.PARTIAL if partial else MediaStatus.FAILED,
+        "directory": directory,
+    }
+
+
+def pending_rows(urls: List[str], directory: str) -> List[dict]:
+    """Return MediaFile fields of downloads about to start"""
+    return [
+        {"url": url, "status": MediaStatus.PENDING, "directory": directory}
+        for url in urls
+    ]
@@ -0,0 +1,61 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from PIL import Image
+
+from . import store
+from .store import StoredMedia
+from ..config import Config
+from ..logs import Logs
+
+logs = Logs()
+
+
+def thumbnail_path(content_hash: str, size: int) -> str:
+    """Return path of the cached thumbnail, thumbnails are always saved as JPEG"""
+    return os.path.join(
+        Config.MEDIA_STORE_PATH,
+        "thumbnails",
+        str(size),
+        content_hash[:2],
+        f"{content_hash}.jpg",
+    )
+
+
+def create_thumbnail(source: str, content_hash: str, size: int) -> str:
+    """Scale the image down to fit in size x size pixels and return path of the thumbnail"""
+    path = thumbnail_path(content_hash, size)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file, so requests never get a half written thumbnail
+    temporary = store.temporary_path()
+    try:
+        with Image.open(source) as image:
+            image.thumbnail((size, size))
+            image.convert("RGB").save(temporary, "JPEG", quality=85)
+        os.replace(temporary, path)
+    except Exception:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return path
+
+
+def _create_thumbnails(stored: StoredMedia) -> None:
+    for size in Config.THUMBNAIL_SIZES:
+        try:
+            create_thumbnail(stored.path, stored.content_hash, size)
+        except Exception as e:
+            logs.log_error(f"Can't create thumbnail of {stored.path}: {e}")
+
+
+def create_thumbnails(images: List[StoredMedia]) -> None:
+    """Create thumbnails of all Config.THUMBNAIL_SIZES in a pool of Config.THUMBNAIL_WORKERS processes"""
+    images = list({image.content_hash: image for image in images}.values())
+    if not images:
+        return
+    with ProcessPoolExecutor(max_workers=Config.THUMBNAIL_WORKERS) as executor:
+        list(executor.map(_create_thumbnails, images))
@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config import Config
+from ..logs import Logs
+
+logs = Logs()
+
+# Number of bytes from the beginning of the file needed to recognize its type
+HEADER_SIZE = 12
+
+# Every signature is a list of (offset, bytes) which must all match
+IMAGE_SIGNATURES: List[Tuple[List[Tuple[int, bytes]], str]] = [
+    ([(0, b"\xff\xd8\xff")], "jpg"),
+    ([(0, b"\x89PNG\r\n\x1a\n")], "png"),
+    ([(0, b"GIF87a")], "gif"),
+    ([(0, b"GIF89a")], "gif"),
+    ([(0, b"RIFF"), (8, b"WEBP")], "webp"),
+    ([(4, b"ftypavif")], "avif"),
+    ([(4, b"ftypheic")], "heic"),
+    ([(0, b"BM")], "bmp"),
+]
+
+# Extensions of stored images, other stored files are videos
+IMAGE_EXTENSIONS = {extension for _, extension in IMAGE_SIGNATURES}
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Return extension of the image based on its first bytes, None if it's not an image"""
+    for signature, extension in IMAGE_SIGNATURES:
+        if all(
+            header[offset : offset + len(magic)] == magic for offset, magic in signature
+        ):
+            return extension
+    return None
+
+
+def verify_image(path: str) -> bool:
+    """Check if the whole image file can be decoded, it's slower than sniffing the header"""
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        return True
+    except Exception as e:
+        logs.log_error(f"Broken image {path}: {e}")
+        return False
+
+
+def verify_images(paths: List[str]) -> Dict[str, bool]:
+    """Verify images in a pool of Config.MEDIA_VERIFY_WORKERS processes"""
+    if not paths:
+        return {}
+    with ProcessPoolExecutor(max_workers=Config.MEDIA_VERIFY_WORKERS) as executor:
+        return dict(zip(paths, executor.map(verify_image, paths)))
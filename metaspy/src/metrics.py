@@ -0,0 +1,196 @@
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .context import current_account, current_pipeline, current_step
+from .logs import Logs
+from .tracing import tracer
+
+logs = Logs()
+
+
+class StepTimer:
+    """
+    Measured step, number of processed items can be updated before the step ends
+    """
+
+    def __init__(self, items: int = 0) -> None:
+        self.items = items
+
+
+class MetricsRegistry:
+    """
+    Collect durations and item counts of pipeline steps
+
+    Records are kept in memory while the pipeline is running and they are saved
+    to the metrics table when the outermost pipeline ends.
+    """
+
+    def __init__(self) -> None:
+        self.run_id = uuid.uuid4().hex
+        self._records: List[Dict[str, Any]] = []
+        self._lock = Lock()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener with the step name every time a pipeline ends"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str], None]) -> None:
+        self._listeners.remove(listener)
+
+    def record(self, step: str, duration: float, items: int = 0) -> None:
+        """Add a single measurement for the current pipeline"""
+        with self._lock:
+            self._records.append(
+                {
+                    "run_id": self.run_id,
+                    "pipeline": current_pipeline.get(),
+                    "account": current_account.get(),
+                    "step": step,
+                    "duration": duration,
+                    "items": items,
+                }
+            )
+
+    @contextmanager
+    def timer(
+        self, step: str, items: int = 0, category: str = "step"
+    ) -> Iterator[StepTimer]:
+        """Measure duration of the wrapped block, it's also recorded as a trace span"""
+        step_timer = StepTimer(items)
+        token = current_step.set(step)
+        start = perf_counter()
+        try:
+            yield step_timer
+        finally:
+            duration = perf_counter() - start
+            current_step.reset(token)
+            self.record(step, duration, step_timer.items)
+            tracer.add_span(step, category, start, duration, items=step_timer.items)
+            # Listeners (e.g. memory snapshots) are too slow for every scroll step
+            if category == "pipeline":
+                for listener in self._listeners:
+                    listener(step)
+
+    def timed(self, step: str) -> Callable:
+        """Decorator measuring a function, length of the returned value is saved as items"""
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(step) as step_timer:
+                    result = func(*args, **kwargs)
+                    step_timer.items = _count_items(result)
+                    return result
+
+            return wrapper
+
+        return decorator
+
+    @contextmanager
+    def pipeline(self, name: str, account: Optional[str] = None) -> Iterator[None]:
+        """Label measurements with pipeline name and save them once it ends"""
+        outermost = current_pipeline.get() is None
+        if outermost:
+            self._adopt_records(name, account)
+        pipeline_token = current_pipeline.set(name)
+        account_token = current_account.set(account)
+        try:
+            with self.timer("total", category="pipeline"):
+                yield
+        finally:
+            current_pipeline.reset(pipeline_token)
+            current_account.reset(account_token)
+            if outermost:
+                self.flush()
+
+    def _adopt_records(self, name: str, account: Optional[str]) -> None:
+        """Label measurements made before the pipeline started (e.g. driver start in
+        __init__ of a scraper) with the pipeline"""
+        with self._lock:
+            for record in self._records:
+                if record["pipeline"] is None:
+                    record["pipeline"] = name
+                    record["account"] = record["account"] or account
+
+    def track_pipeline(self, func: Callable) -> Callable:
+        """Decorator for pipeline methods of scrapers"""
+
+        @wraps(func)
+        def wrapper(scraper, *args, **kwargs):
+            name = f"{type(scraper).__name__}.{func.__name__}"
+            with self.pipeline(name, _account_of(scraper)):
+                return func(scraper, *args, **kwargs)
+
+        return wrapper
+
+    def flush(self) -> None:
+        """Save collected measurements to the database"""
+        from .repository import metric_repository
+
+        with self._lock:
+            records, self._records = self._records, []
+
+        if not records:
+            return
+
+        try:
+            metric_repository.create_metrics(records)
+        except Exception as e:
+            # Metrics should never break the scraper
+            logs.log_error(f"An error occurred while saving metrics {e}")
+
+
+def _count_items(result: Any) -> int:
+    """Return number of items in the result of a measured function"""
+    if result is None:
+        return 0
+    try:
+        return len(result)
+    except TypeError:
+        return 1
+
+
+def _account_of(scraper: Any) -> Optional[str]:
+    """Return facebook id, instagram username or search query used by a scraper"""
+    for attribute in ("_user_id", "person_facebook_id", "query"):
+        value = getattr(scraper, attribute, None)
+        if value:
+            return str(value)
+    return None
+
+
+def render_prometheus(rows: List[Dict[str, Any]]) -> str:
+    """Render aggregated metrics rows in Prometheus text exposition format"""
+    lines = [
+        "# HELP metaspy_step_duration_seconds Duration of pipeline steps",
+        "# TYPE metaspy_step_duration_seconds summary",
+    ]
+    for row in rows:
+        labels = _prometheus_labels(row)
+        lines.append(f"metaspy_step_duration_seconds_sum{{{labels}}} {row['duration']}")
+        lines.append(f"metaspy_step_duration_seconds_count{{{labels}}} {row['count']}")
+
+    lines.append("# HELP metaspy_step_items_total Items processed by pipeline steps")
+    lines.append("# TYPE metaspy_step_items_total counter")
+    for row in rows:
+        labels = _prometheus_labels(row)
+        lines.append(f"metaspy_step_items_total{{{labels}}} {row['items']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _prometheus_labels(row: Dict[str, Any]) -> str:
+    values = []
+    for name in ("pipeline", "step"):
+        value = str(row[name] or "")
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        values.append(f'{name}="{value}"')
+    return ",".join(values)
+
+
+metrics = MetricsRegistry()
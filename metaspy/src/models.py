@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import (
@@ -9,15 +10,24 @@ from sqlalchemy import (
     Float,
     Enum as EnumColumn,
     JSON,
+    DateTime,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+# Tables of scraped data have a unique index (uq_<table>) on the columns identifying a row
+# of the same person, repositories check them before creating a row and import skips them
+
 
 class FamilyMember(Base):
     __tablename__ = "family_members"
+    __table_args__ = (
+        Index("uq_family_members", "person_id", "full_name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     full_name = Column(String, nullable=False)
@@ -31,6 +41,9 @@ class FamilyMember(Base):
 
 class Friends(Base):
     __tablename__ = "friends"
+    __table_args__ = (
+        Index("uq_friends", "person_id", "full_name", "url", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     person_id = Column(Integer, ForeignKey("persons.id"))
@@ -43,6 +56,7 @@ class Friends(Base):
 
 class Image(Base):
     __tablename__ = "images"
+    __table_args__ = (Index("uq_images", "person_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     url = Column(String, nullable=False)
@@ -84,6 +98,7 @@ class Person(Base):
 
 class Places(Base):
     __tablename__ = "places"
+    __table_args__ = (Index("uq_places", "person_id", "name", "date", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -96,6 +111,7 @@ class Places(Base):
 
 class WorkAndEducation(Base):
     __tablename__ = "work_and_education"
+    __table_args__ = (Index("uq_work_and_education", "person_id", "name", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -107,6 +123,9 @@ class WorkAndEducation(Base):
 
 class RecentPlaces(Base):
     __tablename__ = "recent_places"
+    __table_args__ = (
+        Index("uq_recent_places", "person_id", "localization", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     localization = Column(String, nullable=False)
@@ -119,6 +138,7 @@ class RecentPlaces(Base):
 
 class Reels(Base):
     __tablename__ = "reels"
+    __table_args__ = (Index("uq_reels", "person_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     url = Column(String, nullable=False)
@@ -131,6 +151,7 @@ class Reels(Base):
 
 class Videos(Base):
     __tablename__ = "videos"
+    __table_args__ = (Index("uq_videos", "person_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     url = Column(String, nullable=False)
@@ -143,6 +164,9 @@ class Videos(Base):
 
 class Reviews(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("uq_reviews", "person_id", "company", "review", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     company = Column(String, nullable=False)
@@ -171,6 +195,7 @@ class PostSource(Enum):
 
 class Posts(Base):
     __tablename__ = "posts"
+    __table_args__ = (Index("uq_posts", "person_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     url = Column(String, nullable=False)
@@ -188,6 +213,7 @@ class Posts(Base):
 
 class Likes(Base):
     __tablename__ = "likes"
+    __table_args__ = (Index("uq_likes", "person_id", "name", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -199,6 +225,7 @@ class Likes(Base):
 
 class Groups(Base):
     __tablename__ = "groups"
+    __table_args__ = (Index("uq_groups", "person_id", "name", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -211,6 +238,7 @@ class Groups(Base):
 
 class Events(Base):
     __tablename__ = "events"
+    __table_args__ = (Index("uq_events", "person_id", "name", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -244,6 +272,7 @@ class InstagramAccount(Base):
 
 class InstagramImages(Base):
     __tablename__ = "iimages"
+    __table_args__ = (Index("uq_iimages", "account_id", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     url = Column(String, nullable=False)
@@ -251,3 +280,91 @@ class InstagramImages(Base):
 
     # Relationship
     account = relationship("InstagramAccount", back_populates="images")
+
+
+class Metric(Base):
+    __tablename__ = "metrics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String, nullable=False)
+    pipeline = Column(String, nullable=True)
+    account = Column(String, nullable=True)
+    step = Column(String, nullable=False)
+    duration = Column(Float, nullable=False)
+    items = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class MediaStatus(Enum):
+    PENDING = "PENDING"
+    PARTIAL = "PARTIAL"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class MediaFile(Base):
+    __tablename__ = "media_files"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, unique=True)
+    status = Column(EnumColumn(MediaStatus), default=MediaStatus.DONE, index=True)
+    attempts = Column(Integer, default=0)
+    content_hash = Column(String(64), nullable=True, index=True)
+    extension = Column(String, nullable=True)
+    size = Column(Integer, nullable=True)
+    # Perceptual hash of images, hex encoded
+    phash = Column(String(16), nullable=True, index=True)
+    # Content hash of the similar image stored earlier
+    duplicate_of = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MediaLink(Base):
+    __tablename__ = "media_links"
+    # The same file can be linked into directories of many persons
+    __table_args__ = (UniqueConstraint("url", "directory"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, index=True)
+    # Directory the file is linked into, used to retry unfinished downloads
+    directory = Column(String, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class VideoMetadata(Base):
+    __tablename__ = "video_metadata"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, unique=True)
+    # Name of the youtube_dl extractor and the id of the video it returned,
+    # different urls of the same video have the same pair
+    extractor = Column(String, nullable=False)
+    video_id = Column(String, nullable=False, index=True)
+    title = Column(String, nullable=True)
+    duration = Column(Float, nullable=True)
+    size = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JobStatus(Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # CLI arguments of the command run by the daemon, e.g. ["fb-account", "zuck", "--friends"]
+    arguments = Column(JSON, nullable=False)
+    status = Column(EnumColumn(JobStatus), default=JobStatus.QUEUED, index=True)
+    # Metrics of the job are saved with this run_id
+    run_id = Column(String, nullable=True)
+    duration = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
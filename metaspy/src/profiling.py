@@ -0,0 +1,97 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from typing import List, Optional
+
+from rich import print as rprint
+
+from .config import Config
+from .context import current_pipeline
+from .metrics import metrics
+
+
+class Profiler:
+    """
+    Profile a single CLI command
+
+    CPU usage is recorded with cProfile and saved as a pstats file, which can be
+    opened in snakeviz or converted to a flamegraph with flameprof.
+    Memory is traced with tracemalloc, a snapshot is taken every time a pipeline
+    ends and the biggest allocations since the previous pipeline are saved to a report.
+    """
+
+    def __init__(self, name: str, cpu: bool = False, memory: bool = False) -> None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._base_path = os.path.join(Config.PROFILE_PATH, f"{name}_{timestamp}")
+        self.cpu = cpu
+        self.memory = memory
+        self._profile: Optional[cProfile.Profile] = None
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._report: List[str] = []
+
+    def start(self) -> None:
+        if self.memory:
+            tracemalloc.start()
+            self._previous_snapshot = tracemalloc.take_snapshot()
+            metrics.add_listener(self.snapshot)
+
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def snapshot(self, step: str) -> None:
+        """Save the biggest allocations made since the previous snapshot"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+
+        self._report.append(
+            f"== {current_pipeline.get() or '-'} / {step}: "
+            f"current {current / 1024 / 1024:.2f} MiB, peak {peak / 1024 / 1024:.2f} MiB =="
+        )
+        statistics = snapshot.compare_to(self._previous_snapshot, "lineno")
+        for statistic in statistics[: Config.MEMPROFILE_TOP]:
+            self._report.append(str(statistic))
+        self._report.append("")
+
+        self._previous_snapshot = snapshot
+
+    def stop(self) -> None:
+        """Stop profiling and save results"""
+        if not os.path.exists(Config.PROFILE_PATH):
+            os.makedirs(Config.PROFILE_PATH)
+
+        if self._profile is not None:
+            self._profile.disable()
+
+        if self.memory:
+            self.snapshot("end")
+            metrics.remove_listener(self.snapshot)
+            tracemalloc.stop()
+            self._save_memory_report()
+
+        if self._profile is not None:
+            self._save_cpu_profile()
+
+    def _save_cpu_profile(self) -> None:
+        path = f"{self._base_path}.pstats"
+        self._profile.dump_stats(path)
+
+        summary = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=summary)
+        stats.sort_stats("cumulative").print_stats(30)
+        with open(f"{self._base_path}.cpu.txt", "w", encoding="utf-8") as file:
+            file.write(summary.getvalue())
+
+        rprint(f"CPU profile saved to {path}")
+
+    def _save_memory_report(self) -> None:
+        path = f"{self._base_path}.memory.txt"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(self._report))
+
+        rprint(f"Memory report saved to {path}")
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Iterator, List, Optional
+
+from rich import get_console
+from rich.progress import (
+    Progress,
+    SpinnerColumn,
+    TaskID,
+    TaskProgressColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+
+from .config import Config
+
+
+class Verbosity(IntEnum):
+    QUIET = 0
+    NORMAL = 1
+    VERBOSE = 2
+
+
+class ItemCounter:
+    """
+    Count extracted items, the live progress line is refreshed a few times per second
+    instead of printing every item
+    """
+
+    def __init__(
+        self, kind: str, progress: Optional[Progress], task: Optional[TaskID]
+    ) -> None:
+        self.kind = kind
+        self.count = 0
+        self._progress = progress
+        self._task = task
+
+    def add(self, item: Any = None) -> None:
+        self.count += 1
+        if self._progress is None:
+            return
+        self._progress.advance(self._task)
+        if reporter.verbosity >= Verbosity.VERBOSE:
+            self._progress.console.print(f"Extracted {self.kind}: {item}")
+
+
+class Reporter:
+    """
+    Terminal output with verbosity levels
+
+    QUIET doesn't render anything, NORMAL shows counters and rates of extracted items and
+    only the first Config.PRINT_PREVIEW_ITEMS scraped items, VERBOSE prints every item.
+    """
+
+    def __init__(self) -> None:
+        self.verbosity = Verbosity.NORMAL
+
+    def set_verbosity(self, verbosity: Verbosity) -> None:
+        self.verbosity = verbosity
+        get_console().quiet = verbosity == Verbosity.QUIET
+
+    @contextmanager
+    def counter(self, kind: str) -> Iterator[ItemCounter]:
+        """Show number of items counted inside the block and extraction rate"""
+        if self.verbosity == Verbosity.QUIET:
+            yield ItemCounter(kind, None, None)
+            return
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn(f"Extracting {kind}"),
+            TextColumn("{task.completed:.0f}"),
+            TaskProgressColumn(show_speed=True),
+            TimeElapsedColumn(),
+            transient=True,
+        ) as progress:
+            counter = ItemCounter(kind, progress, progress.add_task(kind, total=None))
+            yield counter
+        progress.console.print(f"Extracted {counter.count} {kind}")
+
+    def print_items(self, items: List[Any]) -> None:
+        """Print scraped items, in NORMAL mode only the first of them"""
+        if self.verbosity == Verbosity.QUIET:
+            return
+
+        console = get_console()
+        console.print("[bold green] Scraped data: [/bold green]")
+        limit = (
+            len(items)
+            if self.verbosity >= Verbosity.VERBOSE
+            else Config.PRINT_PREVIEW_ITEMS
+        )
+        for item in items[:limit]:
+            console.print(f" - {item}")
+        if len(items) > limit:
+            console.print(f" ... and {len(items) - limit} more")
+
+
+reporter = Reporter()
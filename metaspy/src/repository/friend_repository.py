@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Set
 
 from ..database import get_session
 from ..models import Friends, Person
@@ -84,3 +84,16 @@ def get_number_of_friends(person_id: int) -> int:
         return 0
 
     return len(person.friends)
+
+
+def get_friend_urls(person_id: int) -> Set[str]:
+    """Return a set of urls for every Friend object of a Person
+
+    Args:
+        person_id (int): Person ID
+    Returns:
+        Set[str]: Set of friend urls
+    """
+    session = get_session()
+    urls = session.query(Friends.url).filter_by(person_id=person_id).all()
+    return {url for (url,) in urls}
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Set
 
 from ..database import get_session
 from ..models import (
@@ -62,3 +62,17 @@ def get_image(image_id: int) -> Image:
     """
     session = get_session()
     return session.query(Image).filter_by(id=image_id).first()
+
+
+def get_image_urls(person_id: int) -> Set[str]:
+    """Get set of urls for every Image object of a Person
+
+    Args:
+        person_id (int): Person ID
+
+    Returns:
+        Set[str]: Set of image urls
+    """
+    session = get_session()
+    urls = session.query(Image.url).filter_by(person_id=person_id).all()
+    return {url for (url,) in urls}
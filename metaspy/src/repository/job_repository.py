@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from ..database import get_session
+from ..models import Job, JobStatus
+
+
+def create_job(arguments: List[str]) -> Job:
+    """Add job to the queue of the daemon
+
+    Args:
+        arguments (List[str]): CLI arguments of the command
+
+    Returns:
+        Job: Job object
+    """
+    session = get_session()
+    job = Job(arguments=arguments)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def claim_next_job(run_id: str) -> Optional[Job]:
+    """Mark the oldest queued job as running and return it
+
+    Args:
+        run_id (str): Run id of the job metrics
+
+    Returns:
+        Optional[Job]: Job object or None if the queue is empty
+    """
+    session = get_session()
+    while True:
+        job = (
+            session.query(Job)
+            .filter_by(status=JobStatus.QUEUED)
+            .order_by(Job.id)
+            .first()
+        )
+        if not job:
+            return None
+
+        # Another daemon could claim the job in the meantime
+        claimed = session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == JobStatus.QUEUED)
+            .values(
+                status=JobStatus.RUNNING, run_id=run_id, started_at=datetime.utcnow()
+            )
+        ).rowcount
+        session.commit()
+        if claimed:
+            session.refresh(job)
+            return job
+
+
+def finish_job(job_id: int, duration: float, error: Optional[str] = None) -> None:
+    """Save result of the job
+
+    Args:
+        job_id (int): Job ID
+        duration (float): Duration of the job in seconds
+        error (Optional[str]): Error message if the job failed
+    """
+    session = get_session()
+    job = session.query(Job).filter_by(id=job_id).first()
+    job.status = JobStatus.FAILED if error else JobStatus.DONE
+    job.duration = duration
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    session.commit()
+
+
+def requeue_running_jobs() -> int:
+    """Queue jobs again which were running when the daemon stopped
+
+    Returns:
+        int: Number of jobs
+    """
+    session = get_session()
+    count = (
+        session.query(Job)
+        .filter_by(status=JobStatus.RUNNING)
+        .update({Job.status: JobStatus.QUEUED})
+    )
+    session.commit()
+    return count
+
+
+def get_jobs(limit: int) -> List[Job]:
+    """Return the newest jobs
+
+    Args:
+        limit (int): Number of jobs
+
+    Returns:
+        List[Job]: Job objects
+    """
+    session = get_session()
+    return session.query(Job).order_by(Job.id.desc()).limit(limit).all()
@@ -0,0 +1,211 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import Config
+from ..database import get_session
+from ..models import MediaFile, MediaLink, MediaStatus
+
+
+def get_media_files(urls: Iterable[str]) -> Dict[str, MediaFile]:
+    """Return MediaFile objects of the stored files downloaded from the given URLs
+
+    Args:
+        urls (Iterable[str]): Source URLs of images or videos
+
+    Returns:
+        Dict[str, MediaFile]: URL mapped to the MediaFile object, URLs not stored yet are missing
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+    session = get_session()
+    media_files = session.query(MediaFile).filter(
+        MediaFile.url.in_(urls), MediaFile.status == MediaStatus.DONE
+    )
+    return {media_file.url: media_file for media_file in media_files}
+
+
+def get_media_file(url: str) -> Optional[MediaFile]:
+    """Return MediaFile object of the stored file downloaded from the given URL
+
+    Args:
+        url (str): Source URL of the image or video
+
+    Returns:
+        Optional[MediaFile]: MediaFile object or None if the file is not stored yet
+    """
+    session = get_session()
+    return session.query(MediaFile).filter_by(url=url, status=MediaStatus.DONE).first()
+
+
+def get_known_urls(urls: Iterable[str]) -> Set[str]:
+    """Return URLs which content is already in the media store
+
+    Args:
+        urls (Iterable[str]): Source URLs
+
+    Returns:
+        Set[str]: Known URLs
+    """
+    urls = list(urls)
+    if not urls:
+        return set()
+    session = get_session()
+    rows = (
+        session.query(MediaFile.url)
+        .filter(MediaFile.url.in_(urls), MediaFile.status == MediaStatus.DONE)
+        .all()
+    )
+    return {row.url for row in rows}
+
+
+def get_unfinished_urls(directory: str) -> List[str]:
+    """Return URLs of pending, partial and failed downloads which should be retried
+
+    Args:
+        directory (str): Directory the files are linked into
+
+    Returns:
+        List[str]: URLs downloaded less than Config.MEDIA_MAX_ATTEMPTS times
+    """
+    session = get_session()
+    rows = (
+        session.query(MediaFile.url)
+        .join(MediaLink, MediaLink.url == MediaFile.url)
+        .filter(
+            MediaLink.directory == directory,
+            MediaFile.status != MediaStatus.DONE,
+            MediaFile.attempts < Config.MEDIA_MAX_ATTEMPTS,
+        )
+        .all()
+    )
+    return [row.url for row in rows]
+
+
+def update_media_files(media_files: List[dict]) -> None:
+    """Create or update MediaFile objects in a single transaction
+    Stored files are never changed, every partial or failed download counts as an attempt.
+    Every directory a file is linked into is recorded, also for files stored earlier
+
+    Args:
+        media_files (List[dict]): Dictionaries with url, status and optionally directory,
+            content_hash, extension and size
+    """
+    if not media_files:
+        return
+
+    session = get_session()
+    urls = [media_file["url"] for media_file in media_files]
+    existing = {
+        media_file.url: media_file
+        for media_file in session.query(MediaFile).filter(MediaFile.url.in_(urls))
+    }
+    links = {
+        (link.url, link.directory)
+        for link in session.query(MediaLink).filter(MediaLink.url.in_(urls))
+    }
+
+    for fields in media_files:
+        fields = dict(fields)
+        directory = fields.pop("directory", None)
+        if directory is not None and (fields["url"], directory) not in links:
+            session.add(MediaLink(url=fields["url"], directory=directory))
+            links.add((fields["url"], directory))
+
+        media_file = existing.get(fields["url"])
+        if media_file is None:
+            media_file = MediaFile(attempts=0)
+            session.add(media_file)
+            existing[fields["url"]] = media_file
+        elif media_file.status == MediaStatus.DONE:
+            continue
+
+        for name, value in fields.items():
+            setattr(media_file, name, value)
+        if fields["status"] in (MediaStatus.PARTIAL, MediaStatus.FAILED):
+            media_file.attempts += 1
+
+    session.commit()
+
+
+def get_stored_hashes(content_hashes: Iterable[str]) -> Set[str]:
+    """Return content hashes which are used by stored files
+
+    Args:
+        content_hashes (Iterable[str]): SHA-256 of file contents
+
+    Returns:
+        Set[str]: Content hashes of MediaFile objects with DONE status
+    """
+    content_hashes = list(content_hashes)
+    if not content_hashes:
+        return set()
+    session = get_session()
+    rows = (
+        session.query(MediaFile.content_hash)
+        .filter(
+            MediaFile.content_hash.in_(content_hashes),
+            MediaFile.status == MediaStatus.DONE,
+        )
+        .distinct()
+        .all()
+    )
+    return {row.content_hash for row in rows}
+
+
+def get_image_hashes() -> List[Tuple[str, str]]:
+    """Return perceptual and content hashes of stored images which are not near-duplicates
+
+    Returns:
+        List[Tuple[str, str]]: Hex encoded perceptual hash and content hash
+    """
+    session = get_session()
+    rows = (
+        session.query(MediaFile.phash, MediaFile.content_hash)
+        .filter(
+            MediaFile.status == MediaStatus.DONE,
+            MediaFile.phash.isnot(None),
+            MediaFile.duplicate_of.is_(None),
+        )
+        .distinct()
+        .all()
+    )
+    return [(row.phash, row.content_hash) for row in rows]
+
+
+def get_duplicate_groups(session: Session, urls: List[str]) -> Dict[str, str]:
+    """Return content hash of the original image for every stored URL, near-duplicates share it
+
+    Args:
+        session (Session): Database session
+        urls (List[str]): Source URLs
+
+    Returns:
+        Dict[str, str]: URL mapped to the content hash of the original image
+    """
+    if not urls:
+        return {}
+    rows = (
+        session.query(MediaFile.url, MediaFile.content_hash, MediaFile.duplicate_of)
+        .filter(MediaFile.url.in_(urls), MediaFile.status == MediaStatus.DONE)
+        .all()
+    )
+    return {row.url: row.duplicate_of or row.content_hash for row in rows}
+
+
+def get_stored_file(session: Session, content_hash: str) -> Optional[MediaFile]:
+    """Return any MediaFile object of the stored content
+
+    Args:
+        session (Session): Database session
+        content_hash (str): SHA-256 of the file content
+
+    Returns:
+        Optional[MediaFile]: MediaFile object or None if the content is not stored
+    """
+    return (
+        session.query(MediaFile)
+        .filter_by(content_hash=content_hash, status=MediaStatus.DONE)
+        .first()
+    )
@@ -0,0 +1,51 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import get_session
+from ..models import Metric
+
+
+def create_metrics(records: List[Dict[str, Any]]) -> None:
+    """Save measurements of pipeline steps in a single transaction
+
+    Args:
+        records (List[Dict[str, Any]]): run_id, pipeline, account, step, duration and items
+    """
+    session = get_session()
+    session.add_all([Metric(**record) for record in records])
+    session.commit()
+
+
+def get_metrics_summary(session: Session) -> List[Dict[str, Any]]:
+    """Return total duration, number of measurements and items for every pipeline step
+
+    Args:
+        session (Session): Database session
+
+    Returns:
+        List[Dict[str, Any]]: pipeline, step, count, duration and items
+    """
+    rows = (
+        session.query(
+            Metric.pipeline,
+            Metric.step,
+            func.count(Metric.id),
+            func.sum(Metric.duration),
+            func.sum(Metric.items),
+        )
+        .group_by(Metric.pipeline, Metric.step)
+        .order_by(Metric.pipeline, Metric.step)
+        .all()
+    )
+    return [
+        {
+            "pipeline": pipeline,
+            "step": step,
+            "count": count,
+            "duration": duration or 0.0,
+            "items": items or 0,
+        }
+        for pipeline, step, count, duration, items in rows
+    ]
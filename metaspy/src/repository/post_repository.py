@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Set
 
 from ..database import get_session
 from ..models import Posts, PostSource
@@ -94,3 +94,10 @@ def get_posts_by_person(person_id: int) -> List[Posts]:
     session = get_session()
     posts = session.query(Posts).filter_by(person_id=person_id).all()
     return posts
+
+
+def get_post_urls(person_id: int) -> Set[str]:
+    """Return a set of urls for every post of a person"""
+    session = get_session()
+    urls = session.query(Posts.url).filter_by(person_id=person_id).all()
+    return {url for (url,) in urls}
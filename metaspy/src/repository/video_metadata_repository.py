@@ -0,0 +1,41 @@
+from typing import Dict, Iterable, List
+
+from ..database import get_session
+from ..models import VideoMetadata
+
+
+def get_video_metadata(urls: Iterable[str]) -> Dict[str, VideoMetadata]:
+    """Return saved metadata of videos
+
+    Args:
+        urls (Iterable[str]): Video URLs
+
+    Returns:
+        Dict[str, VideoMetadata]: URL mapped to VideoMetadata object, unknown URLs are missing
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+    session = get_session()
+    rows = session.query(VideoMetadata).filter(VideoMetadata.url.in_(urls)).all()
+    return {row.url: row for row in rows}
+
+
+def create_video_metadata(metadata: List[dict]) -> None:
+    """Create VideoMetadata objects in a single transaction, URLs already saved are skipped
+
+    Args:
+        metadata (List[dict]): Dictionaries with url, extractor, video_id, title, duration and size
+    """
+    known_urls = set(get_video_metadata(row["url"] for row in metadata))
+    session = get_session()
+    for row in metadata:
+        if row["url"] in known_urls:
+            continue
+        known_urls.add(row["url"])
+        session.add(VideoMetadata(**row))
+    try:
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Set
 
 from ..database import get_session
 from ..models import (
@@ -53,6 +53,15 @@ def update_videos_downloaded(video_id: int):
         session.commit()
 
 
+def update_videos_downloaded_bulk(video_ids: List[int]) -> None:
+    """Update the 'downloaded' field for many Videos objects in one transaction"""
+    session = get_session()
+    session.query(Videos).filter(Videos.id.in_(video_ids)).update(
+        {Videos.downloaded: True}, synchronize_session=False
+    )
+    session.commit()
+
+
 def get_new_videos(person_id: int) -> List[Videos]:
     """Return a list of videos with a bool field set to False"""
     session = get_session()
@@ -61,3 +70,10 @@ def get_new_videos(person_id: int) -> List[Videos]:
         .filter(Videos.person_id == person_id, Videos.downloaded == False)
         .all()
     )
+
+
+def get_video_urls(person_id: int) -> Set[str]:
+    """Return a set of urls for every video of specified person object"""
+    session = get_session()
+    urls = session.query(Videos.url).filter(Videos.person_id == person_id).all()
+    return {url for (url,) in urls}
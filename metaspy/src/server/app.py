@@ -1,20 +1,71 @@
+import os
+import re
+from typing import List
+
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, HTTPException, Request, Depends
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from .schemas import (
     PersonListSchema,
     PersonDetailSchema,
     InstagramProfileListSchema,
     InstagramAccountDetailsSchema,
 )
+from ..config import Config
 from ..models import Person, InstagramAccount
-from ..database import get_session, Session
+from ..database import get_session
+from ..logs import Logs
+from ..media import store, thumbnails, validation
+from ..metrics import render_prometheus
+from ..repository import media_repository, metric_repository
+
+logs = Logs()
 
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Stored files never change, their url contains the hash of the content
+IMMUTABLE_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+CONTENT_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def collapse_duplicate_images(db: Session, images: List[dict]) -> List[dict]:
+    """Keep the first image of every group of the same or similar images
+    Stored images get content hash of the original image to be served locally"""
+    groups = media_repository.get_duplicate_groups(
+        db, [image["url"] for image in images]
+    )
+    collapsed = {}
+    for image in images:
+        key = groups.get(image["url"], image["url"])
+        if key in collapsed:
+            collapsed[key]["duplicates"] += 1
+        else:
+            collapsed[key] = {
+                **image,
+                "duplicates": 0,
+                "content_hash": groups.get(image["url"]),
+            }
+    return list(collapsed.values())
+
+
+def get_stored_file_path(db: Session, content_hash: str) -> str:
+    """Return path of the stored file or raise 404"""
+    media_file = None
+    if CONTENT_HASH_PATTERN.match(content_hash):
+        media_file = media_repository.get_stored_file(db, content_hash)
+    if media_file is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    path = store.object_path(media_file.content_hash, media_file.extension)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return path
+
 
 @app.get("/", response_class=HTMLResponse)
 async def person(request: Request, db: Session = Depends(get_session)):
@@ -73,6 +124,7 @@ async def instagram_profile(
             }
             for image in account.images
         ]
+        images = collapse_duplicate_images(db, images)
 
     person_data = InstagramAccountDetailsSchema(
         id=account.id,
@@ -132,6 +184,7 @@ async def person_detail(
             }
             for image in person.images
         ]
+        images = collapse_duplicate_images(db, images)
 
     places = []
     if person.places is not None and isinstance(person.places, list):
@@ -274,3 +327,50 @@ async def person_detail(
     return templates.TemplateResponse(
         "person_detail.html", {"request": request, "person": person_data}
     )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(db: Session = Depends(get_session)):
+    """Pipeline step timings in Prometheus text format"""
+    summary = metric_repository.get_metrics_summary(db)
+    return PlainTextResponse(
+        render_prometheus(summary), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/metrics/json")
+async def metrics_json(db: Session = Depends(get_session)):
+    """Pipeline step timings as JSON"""
+    return metric_repository.get_metrics_summary(db)
+
+
+@app.get("/media/{content_hash}")
+async def media_file(content_hash: str, db: Session = Depends(get_session)):
+    """Image or video from the local media store"""
+    path = get_stored_file_path(db, content_hash)
+    return FileResponse(path, headers=IMMUTABLE_CACHE_HEADERS)
+
+
+@app.get("/thumbnails/{size}/{content_hash}")
+async def thumbnail(size: int, content_hash: str, db: Session = Depends(get_session)):
+    """Thumbnail of the stored image, it's created if the downloader didn't create it"""
+    if size not in Config.THUMBNAIL_SIZES or not CONTENT_HASH_PATTERN.match(
+        content_hash
+    ):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+
+    path = thumbnails.thumbnail_path(content_hash, size)
+    if not os.path.exists(path):
+        source = get_stored_file_path(db, content_hash)
+        extension = os.path.splitext(source)[1][1:]
+        if extension not in validation.IMAGE_EXTENSIONS:
+            raise HTTPException(status_code=404, detail="Thumbnail not found")
+        try:
+            path = await run_in_threadpool(
+                thumbnails.create_thumbnail, source, content_hash, size
+            )
+        # PIL raises UnidentifiedImageError (an OSError) for unknown or broken images
+        except OSError as e:
+            logs.log_error(f"Can't create thumbnail of {source}: {e}")
+            raise HTTPException(status_code=415, detail="Unsupported image")
+    return FileResponse(path, media_type="image/jpeg", headers=IMMUTABLE_CACHE_HEADERS)
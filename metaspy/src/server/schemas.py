@@ -29,6 +29,10 @@ class ImageSchema(BaseModel):
     id: int
     url: str
     person_id: int
+    # Number of collapsed near-duplicates
+    duplicates: int = 0
+    # Hash of the image in the local media store
+    content_hash: Optional[str] = None
 
 
 class PlacesSchema(BaseModel):
@@ -137,6 +141,10 @@ class InstagramImageSchema(BaseModel):
     id: int
     url: str
     account_id: int
+    # Number of collapsed near-duplicates
+    duplicates: int = 0
+    # Hash of the image in the local media store
+    content_hash: Optional[str] = None
 
 
 class InstagramProfileListSchema(BaseModel):
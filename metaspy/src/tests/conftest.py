@@ -1,24 +1,41 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 
-from metaspy.src.models import (
-    Base,
-)
+from metaspy.src.config import Config
+from metaspy.src import database
 from ..database import get_session
 from metaspy.src.server.app import app
 
-engine = create_engine("sqlite:///database_test.db")
+# Engine is created on first use, so tests never touch database.db
+Config.DATABASE_URL = "sqlite:///database_test.db"
+engine = database.get_engine()
 Session = sessionmaker(bind=engine)
-Base.metadata.create_all(engine)
+
+
+# pysqlite doesn't emit BEGIN itself, without it a released savepoint would commit
+@event.listens_for(engine, "connect")
+def disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+database.init_db()
 
 
 @pytest.fixture
-def session():
+def session(monkeypatch):
     connection = engine.connect()
     transaction = connection.begin()
-    session = Session(bind=connection)
+    # Rollback inside a test returns to a savepoint, the outer transaction stays open
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    # Repositories and metrics use the same session, everything is rolled back
+    monkeypatch.setattr(database, "_session_factory", lambda: session)
 
     yield session
 
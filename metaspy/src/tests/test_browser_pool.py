@@ -0,0 +1,102 @@
+import os
+import socket
+import subprocess
+import sys
+
+from metaspy.src.config import Config
+from metaspy.src.facebook import driver
+from metaspy.src.facebook.driver import BrowserPool
+
+
+class FakeOptions:
+    def __init__(self):
+        self.arguments = []
+
+    def add_argument(self, argument):
+        self.arguments.append(argument)
+
+
+class FakeChrome:
+    def __init__(self, options):
+        self.options = options
+        self.profile_directory = None
+        self.alive = True
+        self.closed = False
+
+    def is_alive(self):
+        return self.alive
+
+    def quit(self):
+        self.closed = True
+
+
+def test_pool_lends_healthy_drivers_with_own_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver, "Chrome", FakeChrome)
+    monkeypatch.setattr(Config, "BROWSER_PROFILE_PATH", str(tmp_path))
+    monkeypatch.setattr(Config, "BROWSER_POOL_SIZE", 1)
+    # Profile used by another Chrome process
+    os.makedirs(tmp_path / "profile_0")
+    os.symlink("host-123", tmp_path / "profile_0" / "SingletonLock")
+
+    pool = BrowserPool()
+    pool.start(FakeOptions)
+    first = pool.acquire(FakeOptions())
+    second = pool.acquire(FakeOptions())
+
+    assert first.profile_directory == str(tmp_path / "profile_1")
+    assert second.profile_directory == str(tmp_path / "profile_2")
+    assert pool.release(first)
+    assert pool.release(first)
+    assert pool.acquire(FakeOptions()) is first
+
+    pool.release(first)
+    first.alive = False
+    replacement = pool.acquire(FakeOptions())
+    assert replacement is not first
+    assert first.closed
+
+    pool.close()
+    assert second.closed and replacement.closed
+    assert not pool.release(second)
+
+
+def test_stale_profile_locks_are_removed_and_profiles_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver, "Chrome", FakeChrome)
+    monkeypatch.setattr(Config, "BROWSER_PROFILE_PATH", str(tmp_path))
+    monkeypatch.setattr(Config, "BROWSER_MAX_PROFILES", 2)
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    host = socket.gethostname()
+    for number, pid in enumerate((finished.pid, os.getpid())):
+        os.makedirs(tmp_path / f"profile_{number}")
+        os.symlink(f"{host}-{pid}", tmp_path / f"profile_{number}" / "SingletonLock")
+
+    pool = BrowserPool()
+    first = pool.launch(FakeOptions())
+    second = pool.launch(FakeOptions())
+
+    # Lock of a crashed Chrome, profile_1 is used by a running process
+    assert first.profile_directory == str(tmp_path / "profile_0")
+    assert not os.path.lexists(tmp_path / "profile_0" / "SingletonLock")
+    assert second.profile_directory is None
+    assert not any(
+        "--user-data-dir" in argument for argument in second.options.arguments
+    )
+
+
+def test_dead_lent_driver_is_replaced(tmp_path, monkeypatch):
+    monkeypatch.setattr(driver, "Chrome", FakeChrome)
+    monkeypatch.setattr(Config, "BROWSER_PROFILE_PATH", str(tmp_path))
+    monkeypatch.setattr(Config, "BROWSER_POOL_SIZE", 1)
+
+    pool = BrowserPool()
+    pool.start(FakeOptions)
+    lent = pool.acquire(FakeOptions())
+    lent.alive = False
+
+    assert pool.release(lent)
+    assert lent.closed
+    assert len(pool._idle) == 1
+    replacement = pool._idle[0]
+    assert replacement is not lent
+    assert pool.acquire(FakeOptions()) is replacement
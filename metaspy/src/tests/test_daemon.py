@@ -0,0 +1,74 @@
+import sys
+
+from rich import get_console
+
+from metaspy.src.commands import app
+from metaspy.src.daemon import Daemon
+from metaspy.src.models import Job, JobStatus
+from metaspy.src.reporting import Verbosity, reporter
+from metaspy.src.repository import job_repository
+from .conftest import session
+
+
+def test_daemon_runs_queued_jobs_in_order(session):
+    first = job_repository.create_job(["fb-account", "john", "--friends"]).id
+    second = job_repository.create_job(["fb-search", "query", "10", "--people"]).id
+    executed = []
+
+    def run_command(arguments):
+        executed.append(arguments)
+        if arguments[0] == "fb-search":
+            raise RuntimeError("Search failed")
+
+    daemon = Daemon(run_command)
+    assert daemon.run_next_job()
+    assert daemon.run_next_job()
+    assert not daemon.run_next_job()
+
+    assert [arguments[0] for arguments in executed] == ["fb-account", "fb-search"]
+    first_job = session.get(Job, first)
+    assert first_job.status == JobStatus.DONE
+    assert first_job.run_id is not None
+    assert first_job.duration is not None
+    second_job = session.get(Job, second)
+    assert second_job.status == JobStatus.FAILED
+    assert second_job.error == "Search failed"
+
+
+def test_running_jobs_are_queued_again(session):
+    job_id = job_repository.create_job(["fb-account", "john", "--posts"]).id
+    job_repository.claim_next_job("run")
+
+    assert job_repository.requeue_running_jobs() == 1
+    assert session.get(Job, job_id).status == JobStatus.QUEUED
+
+
+def test_submit_saves_command_without_global_options(session, monkeypatch):
+    arguments = ["-q", "fb-account", "john", "--friends", "--submit"]
+    monkeypatch.setattr(sys, "argv", ["main.py", *arguments])
+
+    try:
+        app(arguments, standalone_mode=False)
+    finally:
+        reporter.set_verbosity(Verbosity.NORMAL)
+
+    assert job_repository.get_jobs(1)[0].arguments == [
+        "fb-account",
+        "john",
+        "--friends",
+    ]
+
+
+def test_quiet_job_doesnt_silence_next_jobs(session, capsys):
+    job_repository.create_job(["-q", "jobs"])
+    job_repository.create_job(["jobs"])
+    daemon = Daemon(lambda arguments: app(arguments, standalone_mode=False))
+
+    assert daemon.run_next_job()
+    assert not get_console().quiet
+    capsys.readouterr()
+    assert daemon.run_next_job()
+
+    output = capsys.readouterr().out
+    assert "Jobs" in output
+    assert "done" in output
@@ -0,0 +1,78 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from metaspy.src import database
+from metaspy.src.models import MediaFile, MediaStatus
+
+
+def test_migrate_adds_missing_tables_and_columns(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE images (id INTEGER PRIMARY KEY, url VARCHAR)")
+        )
+    monkeypatch.setattr(database, "_engine", engine)
+
+    changes = database.migrate()
+
+    inspector = inspect(engine)
+    assert "Added column images.person_id" in changes
+    assert "Created table persons" in changes
+    assert "person_id" in {column["name"] for column in inspector.get_columns("images")}
+    assert "media_files" in inspector.get_table_names()
+    assert database.migrate() == []
+
+
+def test_migrate_fills_defaults_of_added_columns(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # media_files table created before download statuses were added
+        connection.execute(
+            text(
+                "CREATE TABLE media_files (id INTEGER PRIMARY KEY, url VARCHAR NOT NULL, "
+                "content_hash VARCHAR(64) NOT NULL, extension VARCHAR NOT NULL, "
+                "size INTEGER NOT NULL, created_at DATETIME)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO media_files (url, content_hash, extension, size) "
+                "VALUES ('https://example.com/a.jpg', 'abc', 'jpg', 1)"
+            )
+        )
+    monkeypatch.setattr(database, "_engine", engine)
+
+    database.migrate()
+
+    with Session(engine) as session:
+        media_file = session.query(MediaFile).one()
+        assert media_file.status == MediaStatus.DONE
+        assert media_file.attempts == 0
+        assert media_file.duplicate_of is None
+
+
+def test_migrate_skips_unique_index_of_table_with_duplicates(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE images (id INTEGER PRIMARY KEY, url VARCHAR, "
+                "person_id INTEGER)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO images (url, person_id) VALUES ('a.jpg', 1), ('a.jpg', 1)"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE videos (id INTEGER PRIMARY KEY, url VARCHAR, person_id INTEGER)"
+            )
+        )
+    monkeypatch.setattr(database, "_engine", engine)
+
+    changes = database.migrate()
+
+    assert "Skipped unique index uq_images, images has duplicate rows" in changes
+    assert "Created index uq_videos" in changes
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from metaspy.src.facebook import downloader
+from metaspy.src.facebook.downloader import Downloader, DownloadOrder
+
+
+def metadata(video_id, size):
+    return SimpleNamespace(extractor="Facebook", video_id=video_id, size=size)
+
+
+def test_plan_downloads_groups_urls_of_the_same_video(monkeypatch):
+    videos = [
+        SimpleNamespace(id=1, url="https://www.facebook.com/reel/1"),
+        SimpleNamespace(id=2, url="https://www.facebook.com/watch/?v=1"),
+        SimpleNamespace(id=3, url="https://www.facebook.com/watch/?v=2"),
+        SimpleNamespace(id=4, url="https://www.facebook.com/broken"),
+    ]
+    monkeypatch.setattr(
+        Downloader,
+        "collect_metadata",
+        lambda self, videos: {
+            videos[0].url: metadata("1", 100),
+            videos[1].url: metadata("1", 100),
+            videos[2].url: metadata("2", 500),
+        },
+    )
+
+    largest_first = Downloader("john", order=DownloadOrder.LARGEST).plan_downloads(
+        videos
+    )
+    smallest_first = Downloader("john", order=DownloadOrder.SMALLEST).plan_downloads(
+        videos
+    )
+
+    assert [[video.id for video in group] for group in largest_first] == [
+        [3],
+        [1, 2],
+        [4],
+    ]
+    assert [group[0].id for group in smallest_first] == [4, 1, 3]
+
+
+def test_video_size_falls_back_to_the_largest_format():
+    assert Downloader._video_size({"filesize": 10}) == 10
+    assert (
+        Downloader._video_size({"formats": [{"filesize": 5}, {"filesize_approx": 7}]})
+        == 7
+    )
+    assert Downloader._video_size({"formats": [{}]}) is None
+
+
+def test_extract_metadata_skips_videos_without_id(monkeypatch):
+    class FakeYoutubeDL:
+        def __init__(self, options):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def extract_info(self, url, download):
+            return {"extractor_key": "Facebook", "title": url}
+
+    monkeypatch.setattr(downloader.youtube_dl, "YoutubeDL", FakeYoutubeDL)
+
+    assert Downloader._extract_metadata("https://www.facebook.com/reel/1") is None
@@ -0,0 +1,47 @@
+from metaspy.src.config import Config
+from metaspy.src.facebook import driver
+from metaspy.src.facebook.driver import CommandStats, command_type
+from metaspy.src.facebook.scraper import Scraper
+
+
+def test_command_type_groups_webdriver_commands():
+    assert command_type("findChildElements") == "find_element"
+    assert command_type("getAttribute") == "get_attribute"
+    assert command_type("w3cExecuteScript") == "execute_script"
+    assert command_type("refresh") == "navigation"
+    assert command_type("getTitle") == "other"
+
+
+def test_command_stats_sums_commands_by_type():
+    stats = CommandStats()
+    stats.add("AccountFriend.extract_friends_data", "get_attribute", 0.5)
+    stats.add("AccountFriend.extract_friends_data", "get_attribute", 0.25)
+    stats.add("scroll_page", "get_attribute", 0.25)
+
+    assert stats.counts[("AccountFriend.extract_friends_data", "get_attribute")] == 2
+    assert stats.by_type() == {"get_attribute": (3, 1.0)}
+
+
+def test_lean_configuration_runs_headless_with_eager_page_load(monkeypatch):
+    monkeypatch.setattr(Config, "BROWSER_HEADLESS", True)
+    lean = Scraper._chrome_driver_configuration(lean=True)
+    full = Scraper._chrome_driver_configuration(lean=False)
+
+    assert "--headless=new" in lean.arguments
+    assert lean.page_load_strategy == "eager"
+    assert "--headless=new" not in full.arguments
+    assert full.page_load_strategy == "normal"
+
+
+def test_calling_extractor_walks_a_bounded_number_of_frames(monkeypatch):
+    def nested(depth):
+        if depth:
+            return nested(depth - 1)
+        return driver._calling_extractor()
+
+    assert nested(3).endswith("nested")
+
+    # Frames of this module are skipped like frames of driver, none is in reach
+    monkeypatch.setattr(driver, "__name__", __name__)
+    monkeypatch.setattr(driver, "MAX_CALLER_DEPTH", 2)
+    assert nested(5) == "unknown"
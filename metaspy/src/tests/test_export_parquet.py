@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from metaspy.src.models import Job, Person, Posts, PostSource
+from metaspy.src.utils.export_parquet import ParquetExporter
+from .conftest import session
+
+
+def read_table(path, name):
+    return pq.read_table(os.path.join(path, name)).to_pylist()
+
+
+def test_export_flattens_image_urls_and_exports_only_new_rows(
+    session, tmp_path, monkeypatch
+):
+    person = Person(facebook_id="john")
+    session.add(person)
+    session.commit()
+    session.add(
+        Posts(
+            url="https://www.facebook.com/post/1",
+            person_id=person.id,
+            image_urls={"0": "https://example.com/a.jpg", "1": "b.jpg"},
+        )
+    )
+    session.commit()
+
+    ParquetExporter(str(tmp_path), chunk_size=1).export()
+
+    posts = read_table(tmp_path, "posts")
+    assert posts[0]["source"] == PostSource.ACCOUNT.value
+    assert "image_urls" not in posts[0]
+    assert [row["url"] for row in read_table(tmp_path, "post_images")] == [
+        "https://example.com/a.jpg",
+        "b.jpg",
+    ]
+
+    session.add(Person(facebook_id="jane"))
+    session.commit()
+    ParquetExporter(str(tmp_path), incremental=True).export()
+
+    assert len(os.listdir(tmp_path / "persons")) == 2
+    assert [row["facebook_id"] for row in read_table(tmp_path, "persons")] == [
+        "john",
+        "jane",
+    ]
+
+
+def test_export_writes_other_json_columns_as_strings(session, tmp_path):
+    person = Person(facebook_id="john")
+    session.add(person)
+    session.commit()
+    post = Posts(
+        url="https://www.facebook.com/post/2",
+        person_id=person.id,
+        image_urls=["a.jpg"],
+    )
+    session.add_all(
+        [
+            Posts(url="https://www.facebook.com/post/1", person_id=person.id),
+            post,
+            Job(arguments=["fb-account", "john", "--friends"]),
+        ]
+    )
+    session.commit()
+    post_id = post.id
+
+    ParquetExporter(str(tmp_path)).export()
+
+    jobs = read_table(tmp_path, "jobs")
+    assert json.loads(jobs[0]["arguments"]) == ["fb-account", "john", "--friends"]
+    assert read_table(tmp_path, "post_images") == [
+        {"post_id": post_id, "position": "0", "url": "a.jpg"}
+    ]
+
+
+def test_failed_export_removes_written_files_and_state(session, tmp_path, monkeypatch):
+    session.add(Person(facebook_id="john"))
+    session.commit()
+    ParquetExporter(str(tmp_path), incremental=True).export()
+    export_table = ParquetExporter.export_table
+
+    def fail_on_posts(self, session, table, last_id):
+        if table.name == "posts":
+            raise RuntimeError("disk full")
+        return export_table(self, session, table, last_id)
+
+    monkeypatch.setattr(ParquetExporter, "export_table", fail_on_posts)
+    with pytest.raises(RuntimeError):
+        ParquetExporter(str(tmp_path)).export()
+
+    assert not os.path.exists(tmp_path / "export_state.json")
+    assert [name for _, _, names in os.walk(tmp_path) for name in names] == []
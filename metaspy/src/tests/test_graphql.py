@@ -0,0 +1,99 @@
+import json
+
+from metaspy.src.facebook import graphql
+
+
+FRIENDS_RESPONSE = {
+    "data": {
+        "node": {
+            "pageItems": {
+                "edges": [
+                    {
+                        "node": {
+                            "__typename": "TimelineAppCollectionItem",
+                            "title": {"text": "John Doe"},
+                            "url": "https://www.facebook.com/john.doe",
+                        }
+                    },
+                    {
+                        "node": {
+                            "__typename": "TimelineAppCollectionItem",
+                            "title": {"text": ""},
+                            "url": "https://www.facebook.com/nobody",
+                        }
+                    },
+                ]
+            }
+        }
+    }
+}
+
+
+def test_parse_response_body_reads_every_streamed_document():
+    body = "\n".join(
+        [
+            json.dumps({"data": 1}),
+            "for (;;);" + json.dumps({"data": 2}),
+            "",
+            "not json",
+        ]
+    )
+
+    assert graphql.parse_response_body(body) == [{"data": 1}, {"data": 2}]
+
+
+def test_parse_friends_returns_records_of_dom_extractor():
+    payloads = [FRIENDS_RESPONSE, FRIENDS_RESPONSE]
+
+    assert graphql.parse_friends(payloads) == [
+        {"username": "John Doe", "url": "https://www.facebook.com/john.doe"}
+    ]
+
+
+def test_parse_post_and_image_urls():
+    payloads = [
+        {
+            "data": {
+                "stories": [
+                    {"__typename": "Story", "url": "https://www.facebook.com/1"},
+                    {
+                        "__typename": "Story",
+                        "url": "https://www.facebook.com/2",
+                        "attachments": [
+                            {
+                                "media": {
+                                    "__typename": "Photo",
+                                    "image": {"uri": "https://scontent/1.jpg"},
+                                }
+                            }
+                        ],
+                    },
+                ]
+            }
+        },
+        {"data": {"__typename": "Story", "url": "https://www.facebook.com/1"}},
+    ]
+
+    assert graphql.parse_post_urls(payloads) == [
+        "https://www.facebook.com/1",
+        "https://www.facebook.com/2",
+    ]
+    assert graphql.parse_image_urls(payloads) == ["https://scontent/1.jpg"]
+
+
+def test_parse_search_results_filters_by_source():
+    payloads = [
+        {
+            "results": [
+                {"__typename": "User", "url": "https://www.facebook.com/user"},
+                {"__typename": "Group", "url": "https://www.facebook.com/groups/1"},
+            ]
+        }
+    ]
+
+    assert graphql.parse_search_results(payloads, "people") == [
+        "https://www.facebook.com/user"
+    ]
+    assert graphql.parse_search_results(payloads, "groups") == [
+        "https://www.facebook.com/groups/1"
+    ]
@@ -0,0 +1,80 @@
+import json
+
+from metaspy.src.config import Config
+from metaspy.src.models import Friends, Person, Posts
+from metaspy.src.utils.import_data import DataImporter
+from metaspy.src.utils.save_to_json import SaveJSON
+from .conftest import session
+
+
+def test_import_skips_existing_rows(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_FILE_PATH", str(tmp_path))
+    friends = [
+        {"username": "Jane", "url": "https://www.facebook.com/jane"},
+        {"username": "Jack", "url": "https://www.facebook.com/jack"},
+    ]
+    SaveJSON("john", friends, section="friends").save()
+    SaveJSON("john", friends[:1], section="friends").save()
+    SaveJSON("john", {"phone_number": "123", "email": None}, section="contact").save()
+    SaveJSON("john", ["https://www.facebook.com/post/2"], section="posts").save()
+    # File written by older versions, its section is recognized by the keys
+    with open(tmp_path / "john_1690000000.123.json", "w") as file:
+        json.dump(
+            [
+                {
+                    "url": "https://www.facebook.com/post/1",
+                    "content": "Hello",
+                    "number_of_likes": 3,
+                    "image_url": {"0": "a.jpg"},
+                    "author": "John",
+                }
+            ],
+            file,
+        )
+
+    counts = DataImporter(str(tmp_path), workers=1).import_data()
+    assert counts == {"friends": 2, "posts": 2, "persons": 1}
+
+    person = session.query(Person).filter_by(facebook_id="john").one()
+    assert person.phone_number == "123"
+    assert session.query(Friends).filter_by(person_id=person.id).count() == 2
+    post = session.query(Posts).filter_by(url="https://www.facebook.com/post/1").one()
+    assert post.image_urls == {"0": "a.jpg"}
+
+    person_id = person.id
+    assert DataImporter(str(tmp_path), workers=1).import_data() == {"persons": 1}
+    assert session.query(Friends).filter_by(person_id=person_id).count() == 2
+
+
+def test_import_is_rolled_back_on_error(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_FILE_PATH", str(tmp_path))
+    post_url = "https://www.facebook.com/post/1"
+    SaveJSON("john", [post_url], section="posts").save()
+    SaveJSON("jane", [post_url], section="posts").save()
+
+    def fail():
+        raise RuntimeError("disk full")
+
+    importer = DataImporter(str(tmp_path), workers=1)
+    monkeypatch.setattr(importer, "update_persons", fail)
+    assert importer.import_data() == {}
+    assert session.query(Posts).filter_by(url=post_url).count() == 0
+
+    # Posts are identified per person, the same url of two persons is imported twice
+    assert DataImporter(str(tmp_path), workers=1).import_data() == {"posts": 2}
+
+
+def test_legacy_lists_are_imported_with_the_given_section(session, tmp_path):
+    # Lists of urls written by older versions don't say what the urls are
+    with open(tmp_path / "john_1690000000.1.json", "w") as file:
+        json.dump(["a.jpg", "b.jpg"], file)
+
+    importer = DataImporter(str(tmp_path), workers=1)
+    assert importer.import_data() == {}
+    assert importer.skipped == 1
+
+    importer = DataImporter(str(tmp_path), workers=1, section="images")
+    assert importer.import_data() == {"images": 2}
+    assert importer.skipped == 0
+    person = session.query(Person).filter_by(facebook_id="john").one()
+    assert sorted(image.url for image in person.images) == ["a.jpg", "b.jpg"]
@@ -0,0 +1,54 @@
+from metaspy.src.facebook.account import account_videos
+from metaspy.src.facebook.account.account_videos import AccountVideo
+from metaspy.src.facebook.incremental import KnownItemsTracker
+
+
+def test_known_items_tracker_stops_after_run_of_known_items():
+    tracker = KnownItemsTracker({"a", "b", "c"}, stop_after=2)
+
+    assert tracker.is_new("x") is True
+    assert tracker.is_new("a") is False
+    assert tracker.should_stop is False
+    assert tracker.is_new("b") is False
+    assert tracker.should_stop is True
+
+
+def test_known_items_tracker_ignores_items_seen_in_current_run():
+    tracker = KnownItemsTracker({"a"}, stop_after=2)
+
+    assert tracker.is_new("a") is False
+    assert tracker.is_new("a") is False
+    assert tracker.should_stop is False
+    assert tracker.is_new("y") is True
+    assert tracker.is_new("y") is False
+
+
+class FakeVideoElement:
+    reads = 0
+
+    def __init__(self, url):
+        self.url = url
+
+    def get_attribute(self, name):
+        FakeVideoElement.reads += 1
+        return self.url
+
+
+def test_video_scroll_reads_only_new_elements(monkeypatch):
+    pages = [
+        [FakeVideoElement(f"video/{number}") for number in range(count)]
+        for count in (3, 6, 9)
+    ]
+    scraper = AccountVideo.__new__(AccountVideo)
+    scraper._driver = None
+    scraper._known_items = KnownItemsTracker(set(), stop_after=100)
+    monkeypatch.setattr(scraper, "_video_elements", lambda: pages.pop(0))
+    monkeypatch.setattr(
+        account_videos,
+        "scroll_page_callback",
+        lambda driver, callback: [callback(driver) for _ in range(3)],
+    )
+
+    scraper._scroll_until_known_videos()
+
+    assert FakeVideoElement.reads == 9
@@ -0,0 +1,76 @@
+import json
+import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from metaspy.src import logs
+from metaspy.src.config import Config
+from metaspy.src.context import current_account, current_pipeline
+
+
+def test_loggers_share_one_handler():
+    assert logs.Logs().handlers == logs.Logs("other").handlers == [logs.get_handler()]
+
+
+def test_records_contain_context_fields():
+    record = logging.LogRecord("logger", logging.ERROR, __file__, 1, "Failed", (), None)
+    pipeline_token = current_pipeline.set("AccountFriend")
+    account_token = current_account.set("john")
+    try:
+        logs.ContextFilter().filter(record)
+    finally:
+        current_pipeline.reset(pipeline_token)
+        current_account.reset(account_token)
+
+    data = json.loads(logs.JSONFormatter().format(record))
+    assert data["message"] == "Failed"
+    assert data["level"] == "ERROR"
+    assert data["pipeline"] == "AccountFriend"
+    assert data["account"] == "john"
+    assert data["step"] is None
+
+
+def test_queued_records_keep_traceback_apart_from_message():
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        record = logging.LogRecord(
+            "logger", logging.ERROR, __file__, 1, "Failed %s", ("job",), sys.exc_info()
+        )
+
+    data = json.loads(logs.JSONFormatter().format(logs.get_handler().prepare(record)))
+    assert data["message"] == "Failed job"
+    assert "ValueError: broken" in data["exception"]
+
+
+def log_in_worker(message):
+    logs.Logs().log_error(message)
+
+
+def test_worker_processes_write_records_to_log_file(tmp_path, monkeypatch):
+    path = tmp_path / "logs.log"
+    monkeypatch.setattr(Config, "LOG_FILE_PATH", str(path))
+
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        executor.submit(log_in_worker, "Failed in worker").result()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["message"] for record in records] == ["Failed in worker"]
+
+
+def test_records_queued_before_start_are_written(tmp_path, monkeypatch):
+    path = tmp_path / "logs.log"
+    monkeypatch.setattr(Config, "LOG_FILE_PATH", str(path))
+    handler = logs.SharedQueueHandler()
+    handler.stop()
+
+    handler.handle(
+        logging.LogRecord("logger", logging.ERROR, __file__, 1, "Queued", (), None)
+    )
+    handler.start()
+    handler.stop()
+
+    assert json.loads(path.read_text())["message"] == "Queued"
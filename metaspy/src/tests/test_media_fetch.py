@@ -0,0 +1,163 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from metaspy.src.config import Config
+from metaspy.src.media import phash, store, validation
+from metaspy.src.media.fetch import MediaFetcher, download_images
+from metaspy.src.repository import media_repository
+from metaspy.src.media.validation import sniff_image_type
+from .conftest import session
+
+BODY = b"same content"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = BODY
+        status = 200
+        if self.headers.get("Range"):
+            offset = int(self.headers["Range"][len("bytes=") : -1])
+            body = BODY[offset:]
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_fetch_stores_the_same_content_once(tmp_path, monkeypatch, server_url):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path))
+
+    results = MediaFetcher(concurrency=2, per_host=1).fetch(
+        [f"{server_url}/a", f"{server_url}/b", f"{server_url}/missing"], "jpg"
+    )
+
+    assert results[f"{server_url}/missing"] is None
+    assert results[f"{server_url}/a"] == results[f"{server_url}/b"]
+    assert len(list((tmp_path / "objects").rglob("*.jpg"))) == 1
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_fetch_resumes_from_part_file(tmp_path, monkeypatch, server_url):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path))
+    url = f"{server_url}/video"
+    with open(store.part_path(url), "wb") as file:
+        # Different bytes prove that the beginning is not downloaded again
+        file.write(b"SAME")
+
+    stored = MediaFetcher().fetch([url], "mp4")[url]
+
+    assert stored.content_hash == hashlib.sha256(b"SAME" + BODY[4:]).hexdigest()
+    assert stored.size == len(BODY)
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_fetch_cancels_download_of_unknown_file_type(tmp_path, monkeypatch, server_url):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path))
+    url = f"{server_url}/image"
+
+    results = MediaFetcher().fetch([url], "jpg", sniff=sniff_image_type)
+
+    assert results[url] is None
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_failed_verification_keeps_content_used_by_stored_file(
+    session, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+    monkeypatch.setattr(Config, "MEDIA_VERIFY_IMAGES", True)
+    stored = store.ingest_bytes(b"broken image", "jpg")
+    media_repository.update_media_files(
+        [store.media_file_row("http://a/1.jpg", stored, str(tmp_path / "a"))]
+    )
+    monkeypatch.setattr(
+        MediaFetcher,
+        "fetch",
+        lambda self, urls, *args, **kwargs: {url: stored for url in urls},
+    )
+    monkeypatch.setattr(
+        validation, "verify_images", lambda paths: {path: False for path in paths}
+    )
+
+    image_paths = download_images(["http://b/1.jpg"], str(tmp_path / "b"))
+
+    assert image_paths == []
+    assert os.path.exists(stored.path)
+
+
+def test_near_duplicate_of_other_account_is_linked(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+    original = store.ingest_bytes(b"original", "jpg")
+    row = store.media_file_row("http://a/1.jpg", original, str(tmp_path / "a"))
+    media_repository.update_media_files([{**row, "phash": "0" * 16}])
+    duplicate = store.ingest_bytes(b"resized", "jpg")
+    monkeypatch.setattr(
+        MediaFetcher,
+        "fetch",
+        lambda self, urls, *args, **kwargs: {url: duplicate for url in urls},
+    )
+    monkeypatch.setattr(
+        phash, "compute_hashes", lambda paths: {path: 1 for path in paths}
+    )
+
+    image_paths = download_images(["http://b/1.jpg"], str(tmp_path / "b"))
+
+    assert len(image_paths) == 1
+    assert os.path.samefile(image_paths[0], duplicate.path)
+    assert (
+        media_repository.get_media_file("http://b/1.jpg").duplicate_of
+        == original.content_hash
+    )
+    assert download_images(["http://b/1.jpg"], str(tmp_path / "b")) == image_paths
+
+
+def test_stored_image_is_recorded_for_every_directory(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+    stored = store.ingest_bytes(b"shared image", "jpg")
+    media_repository.update_media_files(
+        [store.media_file_row("http://a/1.jpg", stored, str(tmp_path / "a"))]
+    )
+    media_repository.update_media_files(
+        store.pending_rows(["http://a/2.jpg"], str(tmp_path / "a"))
+    )
+    monkeypatch.setattr(
+        media_repository,
+        "get_media_file",
+        lambda url: pytest.fail("stored files are looked up in one query"),
+    )
+    monkeypatch.setattr(MediaFetcher, "fetch", lambda self, urls, *args, **kwargs: {})
+
+    image_paths = download_images(
+        ["http://a/1.jpg", "http://a/2.jpg"], str(tmp_path / "b")
+    )
+
+    assert len(image_paths) == 1
+    assert os.path.samefile(image_paths[0], stored.path)
+    # The unfinished download is retried in both directories
+    assert media_repository.get_unfinished_urls(str(tmp_path / "a")) == [
+        "http://a/2.jpg"
+    ]
+    assert media_repository.get_unfinished_urls(str(tmp_path / "b")) == [
+        "http://a/2.jpg"
+    ]
@@ -0,0 +1,66 @@
+from io import BytesIO
+
+from PIL import Image
+
+from metaspy.src.config import Config
+from metaspy.src.media import store
+from metaspy.src.media.thumbnails import thumbnail_path
+from metaspy.src.models import MediaFile, MediaStatus
+from .conftest import session, client
+
+
+def stored_image(session, tmp_path, monkeypatch, content=None, extension="png"):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path))
+    if content is None:
+        image = BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(image, "PNG")
+        content = image.getvalue()
+    stored = store.ingest_bytes(content, extension)
+    session.add(
+        MediaFile(
+            url=f"https://example.com/file.{extension}",
+            status=MediaStatus.DONE,
+            content_hash=stored.content_hash,
+            extension=stored.extension,
+            size=stored.size,
+        )
+    )
+    session.commit()
+    return stored
+
+
+def test_media_endpoint_serves_stored_file(session, client, tmp_path, monkeypatch):
+    stored = stored_image(session, tmp_path, monkeypatch)
+
+    response = client.get(f"/media/{stored.content_hash}")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert len(response.content) == stored.size
+    assert client.get(f"/media/{'0' * 64}").status_code == 404
+
+
+def test_thumbnail_endpoint_creates_and_caches_thumbnail(
+    session, client, tmp_path, monkeypatch
+):
+    stored = stored_image(session, tmp_path, monkeypatch)
+
+    response = client.get(f"/thumbnails/128/{stored.content_hash}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert Image.open(BytesIO(response.content)).size == (128, 96)
+    with open(thumbnail_path(stored.content_hash, 128), "rb") as file:
+        assert file.read() == response.content
+    assert client.get(f"/thumbnails/100/{stored.content_hash}").status_code == 404
+
+
+def test_thumbnail_endpoint_rejects_videos_and_broken_images(
+    session, client, tmp_path, monkeypatch
+):
+    video = stored_image(session, tmp_path, monkeypatch, b"video", "mp4")
+    broken = stored_image(session, tmp_path, monkeypatch, b"not an image", "jpg")
+
+    assert client.get(f"/thumbnails/128/{video.content_hash}").status_code == 404
+    assert client.get(f"/thumbnails/128/{broken.content_hash}").status_code == 415
+    assert list((tmp_path / "tmp").iterdir()) == []
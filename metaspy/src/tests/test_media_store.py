@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from metaspy.src.config import Config
+from metaspy.src.media import store
+
+
+def test_ingest_bytes_stores_the_same_content_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+
+    first = store.ingest_bytes(b"image", "jpg")
+    second = store.ingest_bytes(b"image", "jpg")
+
+    assert first == second
+    assert first.size == 5
+    assert os.path.dirname(first.path).endswith(first.content_hash[:2])
+    assert len(list((tmp_path / "store" / "objects").rglob("*.jpg"))) == 1
+
+
+def test_link_points_to_stored_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+    stored = store.ingest_bytes(b"video", "mp4")
+
+    path = store.link(stored.content_hash, "mp4", str(tmp_path / "videos" / "john"))
+
+    assert os.path.basename(path) == f"{stored.content_hash}.mp4"
+    assert os.path.samefile(path, stored.path)
+    assert store.link(stored.content_hash, "mp4", os.path.dirname(path)) == path
+
+
+def test_link_of_linked_file_is_not_copied(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MEDIA_STORE_PATH", str(tmp_path / "store"))
+    stored = store.ingest_bytes(b"image", "jpg")
+    path = store.link(stored.content_hash, "jpg", str(tmp_path / "images"))
+    monkeypatch.setattr(
+        store.shutil,
+        "copyfile",
+        lambda *args: pytest.fail("existing link is not replaced by a copy"),
+    )
+
+    assert store.link(stored.content_hash, "jpg", str(tmp_path / "images")) == path
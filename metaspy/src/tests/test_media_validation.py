@@ -0,0 +1,21 @@
+from PIL import Image
+
+from metaspy.src.media.validation import sniff_image_type, verify_image
+
+
+def test_sniff_image_type_recognizes_images_by_first_bytes():
+    assert sniff_image_type(b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01") == "jpg"
+    assert sniff_image_type(b"\x89PNG\r\n\x1a\n\x00\x00\x00\r") == "png"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WEBP") == "webp"
+    assert sniff_image_type(b"RIFF\x00\x00\x00\x00WAVE") is None
+    assert sniff_image_type(b"<!DOCTYPE html>") is None
+
+
+def test_verify_image_detects_truncated_file(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (64, 64), "red").save(path)
+    truncated_path = tmp_path / "truncated.png"
+    truncated_path.write_bytes(path.read_bytes()[:40])
+
+    assert verify_image(str(path)) is True
+    assert verify_image(str(truncated_path)) is False
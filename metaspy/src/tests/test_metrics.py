@@ -0,0 +1,74 @@
+from metaspy.src.metrics import MetricsRegistry, render_prometheus
+from metaspy.src.models import Metric
+from .conftest import session, client
+
+
+def test_render_prometheus_escapes_labels():
+    text = render_prometheus(
+        [
+            {
+                "pipeline": 'Account"Friend',
+                "step": "scroll",
+                "count": 2,
+                "duration": 1.5,
+                "items": 10,
+            }
+        ]
+    )
+
+    assert (
+        'metaspy_step_duration_seconds_sum{pipeline="Account\\"Friend",step="scroll"} 1.5'
+        in text
+    )
+    assert (
+        'metaspy_step_items_total{pipeline="Account\\"Friend",step="scroll"} 10' in text
+    )
+
+
+def test_steps_before_pipeline_are_labelled_with_it(monkeypatch):
+    registry = MetricsRegistry()
+    saved = []
+    monkeypatch.setattr(registry, "flush", lambda: saved.extend(registry._records))
+
+    with registry.timer("driver_start"):
+        pass
+    with registry.pipeline("AccountFriend.pipeline", "john.doe"):
+        pass
+
+    driver_start = next(record for record in saved if record["step"] == "driver_start")
+    assert driver_start["pipeline"] == "AccountFriend.pipeline"
+    assert driver_start["account"] == "john.doe"
+
+
+def test_metrics_endpoint_returns_aggregated_steps(session, client):
+    session.add_all(
+        [
+            Metric(
+                run_id="a",
+                pipeline="AccountPost.pipeline",
+                step="db_write",
+                duration=1.0,
+                items=2,
+            ),
+            Metric(
+                run_id="b",
+                pipeline="AccountPost.pipeline",
+                step="db_write",
+                duration=2.0,
+                items=3,
+            ),
+        ]
+    )
+    session.commit()
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert (
+        'metaspy_step_duration_seconds_count{pipeline="AccountPost.pipeline",step="db_write"} 2'
+        in response.text
+    )
+    assert (
+        'metaspy_step_items_total{pipeline="AccountPost.pipeline",step="db_write"} 5'
+        in response.text
+    )
@@ -15,6 +15,9 @@ from metaspy.src.models import (
     Likes,
     Groups,
     Events,
+    Metric,
+    MediaFile,
+    VideoMetadata,
 )
 from .conftest import session
 
@@ -244,3 +247,45 @@ def test_events_model_successfully_create_object(session):
     assert event.id is not None
     assert event.name == "Event 1"
     assert event.person == person_object
+
+
+def test_metric_model_successfully_create_object(session):
+    metric = Metric(
+        run_id="run", pipeline="AccountFriend.pipeline", step="scroll", duration=1.5
+    )
+    session.add(metric)
+    session.commit()
+
+    assert metric.id is not None
+    assert metric.step == "scroll"
+    assert metric.items == 0
+    assert metric.created_at is not None
+
+
+def test_media_file_model_successfully_create_object(session):
+    media_file = MediaFile(
+        url="https://example.com/image.jpg",
+        content_hash="a" * 64,
+        extension="jpg",
+        size=1024,
+    )
+    session.add(media_file)
+    session.commit()
+
+    assert media_file.id is not None
+    assert media_file.created_at is not None
+
+
+def test_video_metadata_model_successfully_create_object(session):
+    metadata = VideoMetadata(
+        url="https://www.facebook.com/reel/1",
+        extractor="Facebook",
+        video_id="1",
+        duration=12.5,
+        size=1024,
+    )
+    session.add(metadata)
+    session.commit()
+
+    assert metadata.id is not None
+    assert metadata.created_at is not None
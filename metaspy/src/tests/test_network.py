@@ -0,0 +1,79 @@
+import json
+
+from metaspy.src.facebook import network
+from metaspy.src.facebook.incremental import KnownItemsTracker
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def response_received(request_id, url, loader_id="page"):
+    return log_entry(
+        "Network.responseReceived",
+        requestId=request_id,
+        loaderId=loader_id,
+        response={"url": url},
+    )
+
+
+class FakeDriver:
+    def __init__(self, logs, bodies, page_data=None):
+        self.logs = list(logs)
+        self.bodies = bodies
+        self.page_data = page_data or []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"loaderId": "page"}}}
+        return {"body": self.bodies[params["requestId"]], "base64Encoded": False}
+
+    def execute_script(self, script):
+        return self.page_data
+
+    def get_log(self, log_type):
+        logs, self.logs = self.logs, []
+        return logs
+
+
+def test_capture_reads_finished_graphql_responses_of_current_page():
+    driver = FakeDriver(
+        [
+            response_received("1", "https://www.facebook.com/api/graphql/"),
+            response_received("2", "https://www.facebook.com/ajax/bz"),
+            response_received("3", "https://www.facebook.com/api/graphql/", "old"),
+            log_entry("Network.loadingFinished", requestId="1"),
+            log_entry("Network.loadingFinished", requestId="2"),
+            log_entry("Network.loadingFinished", requestId="3"),
+        ],
+        {"1": '{"data": 1}\n{"data": 2}', "2": '{"data": 3}', "3": '{"data": 4}'},
+    )
+
+    capture = network.NetworkCapture(driver)
+
+    assert capture.read() == [{"data": 1}, {"data": 2}]
+    assert capture.read() == []
+
+
+def test_extract_records_skips_known_items_and_stops_at_max_records():
+    page_data = [
+        json.dumps(
+            [
+                {"__typename": "Story", "url": "https://www.facebook.com/1"},
+                {"__typename": "Story", "url": "https://www.facebook.com/2"},
+                {"__typename": "Story", "url": "https://www.facebook.com/3"},
+            ]
+        )
+    ]
+    driver = FakeDriver([], {}, page_data)
+    known_items = KnownItemsTracker({"https://www.facebook.com/1"})
+
+    records = network.extract_records(
+        driver,
+        network.graphql.parse_post_urls,
+        "post urls",
+        known_items,
+        max_records=1,
+    )
+
+    assert records == ["https://www.facebook.com/2"]
@@ -0,0 +1,64 @@
+import random
+
+from PIL import Image, ImageDraw
+
+from metaspy.src.media.phash import BKTree, dhash, hamming_distance, to_hex, from_hex
+from metaspy.src.models import MediaFile, MediaStatus
+from metaspy.src.server.app import collapse_duplicate_images
+from .conftest import session
+
+
+def test_bk_tree_search_returns_the_same_hashes_as_linear_scan():
+    rng = random.Random(1)
+    values = [rng.getrandbits(64) for _ in range(500)]
+    tree = BKTree((value, index) for index, value in enumerate(values))
+    query = values[10] ^ 0b101
+
+    expected = sorted(
+        index
+        for index, value in enumerate(values)
+        if hamming_distance(query, value) <= 6
+    )
+
+    assert len(tree) == 500
+    assert sorted(index for _, index in tree.search(query, 6)) == expected
+    assert tree.search(query, 6)[0] == (2, 10)
+
+
+def test_dhash_is_close_for_resized_image_and_far_for_different_image(tmp_path):
+    image = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((50, 50, 250, 250), fill="black")
+    draw.rectangle((260, 20, 380, 120), fill="gray")
+    image.save(tmp_path / "original.png")
+    image.resize((200, 150)).save(tmp_path / "small.jpg", quality=70)
+    image.transpose(Image.Transpose.FLIP_LEFT_RIGHT).save(tmp_path / "other.png")
+
+    original = dhash(str(tmp_path / "original.png"))
+
+    assert hamming_distance(original, dhash(str(tmp_path / "small.jpg"))) <= 6
+    assert hamming_distance(original, dhash(str(tmp_path / "other.png"))) > 6
+    assert from_hex(to_hex(original)) == original
+
+
+def test_collapse_duplicate_images_keeps_the_first_image(session):
+    session.add_all(
+        [
+            MediaFile(url="a", status=MediaStatus.DONE, content_hash="1", size=1),
+            MediaFile(
+                url="b",
+                status=MediaStatus.DONE,
+                content_hash="2",
+                size=1,
+                duplicate_of="1",
+            ),
+            MediaFile(url="c", status=MediaStatus.DONE, content_hash="3", size=1),
+        ]
+    )
+    session.commit()
+    images = [{"id": 1, "url": "a"}, {"id": 2, "url": "b"}, {"id": 3, "url": "c"}]
+
+    collapsed = collapse_duplicate_images(session, images)
+
+    assert [image["id"] for image in collapsed] == [1, 3]
+    assert collapsed[0]["duplicates"] == 1
@@ -0,0 +1,36 @@
+import os
+
+from metaspy.src import profiling
+from metaspy.src.config import Config
+from metaspy.src.metrics import MetricsRegistry
+from metaspy.src.profiling import Profiler
+
+
+def test_profiler_saves_cpu_profile_and_memory_report(tmp_path, monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(registry, "flush", lambda: None)
+    monkeypatch.setattr(profiling, "metrics", registry)
+    monkeypatch.setattr(Config, "PROFILE_PATH", str(tmp_path))
+
+    profiler = Profiler("fb-account", cpu=True, memory=True)
+    profiler.start()
+    with registry.pipeline("AccountFriend.pipeline"):
+        with registry.timer("scroll"):
+            data = [str(number) for number in range(1000)]
+    profiler.stop()
+
+    files = sorted(os.listdir(tmp_path))
+    assert [name.split("_")[0] for name in files] == ["fb-account"] * 3
+    assert [name.split(".", 1)[1] for name in files] == [
+        "cpu.txt",
+        "memory.txt",
+        "pstats",
+    ]
+    assert data
+
+    with open(tmp_path / files[1], encoding="utf-8") as file:
+        report = file.read()
+    # A snapshot is taken at the end of the pipeline and of the command, not per step
+    assert "== AccountFriend.pipeline / total" in report
+    assert "== - / end" in report
+    assert "/ scroll" not in report
@@ -0,0 +1,42 @@
+from rich import get_console
+
+from metaspy.src.config import Config
+from metaspy.src.facebook.driver import CommandStats
+from metaspy.src.reporting import Reporter, Verbosity
+
+
+def test_counter_counts_items_in_quiet_mode():
+    reporter = Reporter()
+    reporter.set_verbosity(Verbosity.QUIET)
+    try:
+        with reporter.counter("friends") as counter:
+            for url in ["a", "b", "c"]:
+                counter.add(url)
+        assert counter.count == 3
+        assert get_console().quiet
+    finally:
+        reporter.set_verbosity(Verbosity.NORMAL)
+    assert not get_console().quiet
+
+
+def test_print_items_shows_preview(capsys, monkeypatch):
+    monkeypatch.setattr(Config, "PRINT_PREVIEW_ITEMS", 2)
+    Reporter().print_items(["a", "b", "c", "d"])
+
+    output = capsys.readouterr().out
+    assert " - b" in output
+    assert " - c" not in output
+    assert "and 2 more" in output
+
+
+def test_quiet_mode_hides_webdriver_summary(capsys):
+    stats = CommandStats()
+    stats.add("AccountFriend.extract_friends_data", "get_attribute", 0.5)
+    reporter = Reporter()
+    reporter.set_verbosity(Verbosity.QUIET)
+    try:
+        stats.print_summary()
+    finally:
+        reporter.set_verbosity(Verbosity.NORMAL)
+
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,49 @@
+import gzip
+import os
+
+import orjson
+
+from metaspy.src.config import Config
+from metaspy.src.utils.save_to_json import SaveJSON, read_records
+
+
+def test_save_appends_records_and_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_FILE_PATH", str(tmp_path))
+    monkeypatch.setattr(Config, "JSONL_COMPRESSION", None)
+
+    SaveJSON("john", [{"name": "a"}, {"name": "b"}], section="friends").save()
+    SaveJSON("john", [{"name": "c"}], section="friends").save()
+
+    segment = tmp_path / "john" / "friends.00001.jsonl"
+    records = list(read_records(str(segment)))
+    assert [record["data"]["name"] for record in records] == ["a", "b", "c"]
+
+    index = [
+        orjson.loads(line)
+        for line in (tmp_path / "john" / "friends.index.jsonl")
+        .read_bytes()
+        .splitlines()
+    ]
+    assert [entry["count"] for entry in index] == [2, 1]
+    with open(segment, "rb") as file:
+        file.seek(index[1]["offset"])
+        assert orjson.loads(file.read(index[1]["length"]))["data"] == {"name": "c"}
+
+
+def test_save_rotates_compressed_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "JSON_FILE_PATH", str(tmp_path))
+    monkeypatch.setattr(Config, "JSONL_COMPRESSION", "gzip")
+    monkeypatch.setattr(Config, "JSONL_ROTATE_SIZE", 1)
+    url = "https://www.facebook.com/post/1"
+
+    SaveJSON(url, ["first"], section="post_details").save()
+    SaveJSON(url, ["second"], section="post_details").save()
+
+    directory = tmp_path / "https___www.facebook.com_post_1"
+    assert sorted(os.listdir(directory)) == [
+        "post_details.00001.jsonl.gz",
+        "post_details.00002.jsonl.gz",
+        "post_details.index.jsonl",
+    ]
+    with gzip.open(directory / "post_details.00002.jsonl.gz") as file:
+        assert orjson.loads(file.read())["data"] == "second"
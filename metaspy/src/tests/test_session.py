@@ -0,0 +1,100 @@
+import os
+import pickle
+
+from metaspy.src.facebook import session
+
+
+class FakeDriver:
+    def __init__(self, cdp_available: bool = True) -> None:
+        self.cdp_available = cdp_available
+        self.calls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if not self.cdp_available:
+            raise Exception("CDP is not available")
+        self.calls.append((cmd, params))
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def refresh(self):
+        self.calls.append(("refresh", None))
+
+    def delete_all_cookies(self):
+        self.calls.append(("delete_all_cookies", None))
+
+    def add_cookie(self, cookie):
+        self.calls.append(("add_cookie", cookie))
+
+
+COOKIE = {
+    "name": "c_user",
+    "value": "123",
+    "domain": ".facebook.com",
+    "path": "/",
+    "secure": True,
+    "httpOnly": False,
+    "expiry": 1700000000,
+    "sameSite": "None",
+}
+
+
+def test_to_cdp_cookie_converts_expiry_and_same_site():
+    cdp_cookie = session.to_cdp_cookie({**COOKIE, "sameSite": "lax"})
+
+    assert cdp_cookie["expires"] == 1700000000
+    assert "expiry" not in cdp_cookie
+    assert cdp_cookie["sameSite"] == "Lax"
+    assert "sameSite" not in session.to_cdp_cookie({"name": "a", "value": "b"})
+
+
+def test_load_cookies_reads_file_once_until_it_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "cookies.pkl")
+    with open(path, "wb") as file:
+        pickle.dump([COOKIE], file)
+
+    loads = []
+    original_load = pickle.load
+    monkeypatch.setattr(
+        session.pickle, "load", lambda file: loads.append(1) or original_load(file)
+    )
+
+    assert session.load_cookies(path) == [COOKIE]
+    assert session.load_cookies(path) == [COOKIE]
+    assert len(loads) == 1
+
+    with open(path, "wb") as file:
+        pickle.dump([], file)
+    os.utime(path, (0, 0))
+    assert session.load_cookies(path) == []
+    assert len(loads) == 2
+
+
+def test_load_cookies_returns_empty_list_for_missing_file(tmp_path):
+    assert session.load_cookies(str(tmp_path / "missing.pkl")) == []
+
+
+def test_open_with_cookies_sets_cookies_before_single_navigation():
+    driver = FakeDriver()
+
+    session.open_with_cookies(driver, "https://www.facebook.com/", [COOKIE])
+
+    assert [call[0] for call in driver.calls] == [
+        "Network.clearBrowserCookies",
+        "Network.setCookies",
+        "get",
+    ]
+    assert driver.calls[1][1]["cookies"] == [session.to_cdp_cookie(COOKIE)]
+
+
+def test_open_with_cookies_falls_back_to_add_cookie():
+    driver = FakeDriver(cdp_available=False)
+
+    session.open_with_cookies(driver, "https://www.facebook.com/", [COOKIE])
+
+    assert [call[0] for call in driver.calls] == [
+        "get",
+        "delete_all_cookies",
+        "add_cookie",
+        "refresh",
+    ]
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import metaspy
+
+# Cumulative import time of the CLI module in microseconds
+IMPORT_TIME_BUDGET = 1_000_000
+HEAVY_MODULES = [
+    "selenium",
+    "sqlalchemy",
+    "youtube_dl",
+    "PIL",
+    "networkx",
+    "matplotlib",
+    "aiohttp",
+]
+
+
+def import_commands():
+    return subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, metaspy.src.commands; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        cwd=os.path.dirname(os.path.dirname(metaspy.__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_cli_doesnt_import_heavy_dependencies():
+    result = import_commands()
+
+    assert result.stdout.strip() == "[]"
+    cumulative = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.endswith("| metaspy.src.commands")
+    )
+    assert cumulative < IMPORT_TIME_BUDGET
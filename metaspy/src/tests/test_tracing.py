@@ -0,0 +1,46 @@
+import json
+
+from metaspy.src.config import Config
+from metaspy.src.facebook.driver import command_name
+from metaspy.src.tracing import Tracer
+
+
+def test_tracer_saves_nested_spans_in_chrome_trace_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TRACE_PATH", str(tmp_path))
+    tracer = Tracer()
+    tracer.start()
+
+    with tracer.span("pipeline", "pipeline"):
+        with tracer.span("scroll", "step", items=2):
+            pass
+
+    with open(tracer.save("zuck"), encoding="utf-8") as file:
+        events = json.load(file)["traceEvents"]
+
+    scroll, pipeline = events
+    assert pipeline["name"] == "pipeline"
+    assert scroll["ph"] == "X"
+    assert scroll["args"] == {"items": 2}
+    assert pipeline["ts"] <= scroll["ts"]
+    assert scroll["ts"] + scroll["dur"] <= pipeline["ts"] + pipeline["dur"]
+
+
+def test_tracer_ignores_spans_when_disabled():
+    tracer = Tracer()
+
+    with tracer.span("scroll", "step"):
+        pass
+
+    assert tracer._events == []
+
+
+def test_command_name_recognizes_get_attribute_script():
+    params = {
+        "script": "/* getAttribute */return (function(){}).apply(null, arguments);"
+    }
+
+    assert command_name("w3cExecuteScript", params) == "getAttribute"
+    assert (
+        command_name("w3cExecuteScript", {"script": "return 1"}) == "w3cExecuteScript"
+    )
+    assert command_name("findElements", {}) == "findElements"
@@ -0,0 +1,125 @@
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import Config
+
+
+class Tracer:
+    """
+    Record nested spans of a single run in Chrome trace event format
+
+    Saved files can be opened in chrome://tracing or https://ui.perfetto.dev
+    Spans are recorded only after start() is called.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._events: List[Dict[str, Any]] = []
+        self._lock = Lock()
+        self._origin = perf_counter()
+
+    def start(self) -> None:
+        """Enable tracing and drop previously recorded spans"""
+        with self._lock:
+            self._events = []
+        self._origin = perf_counter()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def add_span(
+        self, name: str, category: str, start: float, duration: float, **args: Any
+    ) -> None:
+        """Add a finished span, start is a value returned by time.perf_counter()"""
+        if not self.enabled:
+            return
+
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1_000_000,
+            "dur": duration * 1_000_000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+
+        with self._lock:
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """Record duration of the wrapped block as a span"""
+        if not self.enabled:
+            yield
+            return
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, perf_counter() - start, **args)
+
+    def save(self, name: str) -> str:
+        """Save recorded spans to a trace file and return its path"""
+        if not os.path.exists(Config.TRACE_PATH):
+            os.makedirs(Config.TRACE_PATH)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(Config.TRACE_PATH, f"{name}_{timestamp}.json")
+
+        with self._lock:
+            events = list(self._events)
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+        return path
+
+
+tracer = Tracer()
+
+
+def _repository_caller() -> Optional[str]:
+    """Return name of the repository function that runs the current query"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if ".repository." in module:
+            return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def trace_engine(engine: Engine) -> None:
+    """Record every SQL statement as a span named after the calling repository function"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if tracer.enabled:
+            conn.info.setdefault("trace_query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        starts = conn.info.get("trace_query_start")
+        if not tracer.enabled or not starts:
+            return
+
+        start = starts.pop()
+        name = _repository_caller() or statement.split(" ", 1)[0]
+        tracer.add_span(
+            name, "repository", start, perf_counter() - start, statement=statement
+        )
@@ -0,0 +1,232 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from rich import print as rprint
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, Table, select
+
+from ..config import Config
+from ..database import get_session
+from ..logs import Logs
+from ..metrics import metrics
+from ..models import Base
+
+logs = Logs()
+
+# Posts.image_urls is saved as rows of this table instead of a JSON column,
+# other JSON columns are exported as JSON strings
+POST_IMAGES_TABLE = "post_images"
+IMAGE_URLS_COLUMN = "image_urls"
+
+
+class ParquetExporter:
+    """
+    Export every table to Parquet files, one directory per table
+
+    Rows are read in chunks of Config.EXPORT_CHUNK_SIZE ordered by id and written
+    as row groups, so memory usage doesn't depend on the size of the database.
+    Incremental export writes only rows with id bigger than the last exported one,
+    the last ids are saved in the state file of the export directory.
+    Files are written under temporary names and renamed only when every table is
+    exported, so a failed export doesn't leave files the state doesn't know about.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.EXPORT_PATH,
+        incremental: bool = False,
+        chunk_size: int = Config.EXPORT_CHUNK_SIZE,
+    ) -> None:
+        self.path = path
+        self.incremental = incremental
+        self.chunk_size = chunk_size
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        # Temporary and final paths of the files written by this export
+        self._written: List[Tuple[str, str]] = []
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.path, "export_state.json")
+
+    def load_state(self) -> Dict[str, int]:
+        """Return the last exported id of every table"""
+        if not self.incremental or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def save_state(self, state: Dict[str, int]) -> None:
+        with open(self.state_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+
+    @staticmethod
+    def arrow_type(column) -> pa.DataType:
+        """Return Arrow type of the SQLAlchemy column"""
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
+
+    @staticmethod
+    def exported_columns(table: Table) -> List:
+        return [column for column in table.columns if column.name != IMAGE_URLS_COLUMN]
+
+    def schema(self, table: Table) -> pa.Schema:
+        return pa.schema(
+            [
+                (column.name, self.arrow_type(column))
+                for column in self.exported_columns(table)
+            ]
+        )
+
+    @staticmethod
+    def post_images_schema() -> pa.Schema:
+        return pa.schema(
+            [
+                ("post_id", pa.int64()),
+                ("position", pa.string()),
+                ("url", pa.string()),
+            ]
+        )
+
+    @staticmethod
+    def convert(column, value: Any) -> Any:
+        if isinstance(column.type, JSON):
+            return None if value is None else json.dumps(value, ensure_ascii=False)
+        return value.value if isinstance(value, Enum) else value
+
+    @staticmethod
+    def post_images(row) -> List[Tuple[int, str, str]]:
+        """Return post id, position and url of every image of the post"""
+        image_urls = row._mapping[IMAGE_URLS_COLUMN]
+        if isinstance(image_urls, dict):
+            items = image_urls.items()
+        elif isinstance(image_urls, list):
+            items = enumerate(image_urls)
+        else:
+            return []
+        return [(row.id, str(position), url) for position, url in items]
+
+    def table_directory(self, name: str) -> str:
+        directory = os.path.join(self.path, name)
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def remove_previous_export(self) -> None:
+        """Full export replaces files and the state of previous exports"""
+        for name in [table.name for table in Base.metadata.sorted_tables] + [
+            POST_IMAGES_TABLE
+        ]:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    def open_writer(self, name: str, schema: pa.Schema) -> pq.ParquetWriter:
+        """Return writer of a temporary file, it's renamed by commit_files"""
+        path = os.path.join(self.table_directory(name), f"{self.timestamp}.parquet")
+        temporary = f"{path}.tmp"
+        self._written.append((temporary, path))
+        return pq.ParquetWriter(temporary, schema)
+
+    def commit_files(self) -> None:
+        for temporary, path in self._written:
+            os.replace(temporary, path)
+        self._written = []
+
+    def remove_files(self) -> None:
+        for temporary, _ in self._written:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._written = []
+
+    def export_table(self, session, table: Table, last_id: int) -> int:
+        """Write rows with id bigger than last_id, return the biggest exported id"""
+        columns = self.exported_columns(table)
+        schema = self.schema(table)
+        writer = None
+        images_writer = None
+        exported = 0
+
+        try:
+            while True:
+                rows = session.execute(
+                    select(table)
+                    .where(table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(self.chunk_size)
+                ).all()
+                if not rows:
+                    break
+
+                if writer is None:
+                    writer = self.open_writer(table.name, schema)
+                writer.write_table(
+                    pa.Table.from_pydict(
+                        {
+                            column.name: [
+                                self.convert(column, row._mapping[column.name])
+                                for row in rows
+                            ]
+                            for column in columns
+                        },
+                        schema=schema,
+                    )
+                )
+
+                if IMAGE_URLS_COLUMN in table.c:
+                    images = [image for row in rows for image in self.post_images(row)]
+                    if images and images_writer is None:
+                        images_writer = self.open_writer(
+                            POST_IMAGES_TABLE, self.post_images_schema()
+                        )
+                    if images:
+                        images_writer.write_table(
+                            pa.Table.from_pydict(
+                                dict(zip(("post_id", "position", "url"), zip(*images))),
+                                schema=self.post_images_schema(),
+                            )
+                        )
+
+                exported += len(rows)
+                last_id = rows[-1].id
+        finally:
+            if writer is not None:
+                writer.close()
+            if images_writer is not None:
+                images_writer.close()
+
+        rprint(f"{table.name}: {exported} rows")
+        return last_id
+
+    @metrics.track_pipeline
+    def export(self) -> None:
+        """Export all tables, files written by a failed export are removed and the error is raised"""
+        os.makedirs(self.path, exist_ok=True)
+        if not self.incremental:
+            self.remove_previous_export()
+        state = self.load_state()
+        session = get_session()
+        try:
+            for table in Base.metadata.sorted_tables:
+                with metrics.timer(f"export.{table.name}"):
+                    state[table.name] = self.export_table(
+                        session, table, state.get(table.name, 0)
+                    )
+            self.commit_files()
+            self.save_state(state)
+        except Exception as e:
+            self.remove_files()
+            logs.log_error(f"An error occurred while exporting database: {e}")
+            raise
+        finally:
+            session.close()
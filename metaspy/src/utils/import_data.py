@@ -0,0 +1,361 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from rich import print as rprint
+from rich.progress import Progress
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .save_to_json import read_records
+from ..config import Config
+from ..database import get_session
+from ..logs import Logs
+from ..metrics import metrics
+from ..models import (
+    Events,
+    FamilyMember,
+    Friends,
+    Groups,
+    Image,
+    InstagramAccount,
+    InstagramImages,
+    Likes,
+    Person,
+    Places,
+    Posts,
+    RecentPlaces,
+    Reels,
+    Reviews,
+    Videos,
+    WorkAndEducation,
+)
+
+logs = Logs()
+
+# <section>.<segment>.jsonl written by SaveJSON, optionally compressed
+SEGMENT_FILE = re.compile(r"^(?P<section>\w+)\.\d+\.jsonl(\.gz|\.zst)?$")
+# <facebook_id>_<timestamp>.json written by older versions
+LEGACY_FILE = re.compile(r"^(?P<owner>.+)_\d+(\.\d+)?\.json$")
+
+# Data of a single post scraped by url (not by person) belongs to this person
+ANONYMOUS = "Anonymous"
+
+# Person fields updated by contact and full_name sections
+PERSON_UPDATES = "persons"
+
+
+def _opinion(record: Dict[str, Any]) -> str:
+    return "".join(record["opinions"])
+
+
+# Section -> model and function returning values of a new row
+ROW_BUILDERS: Dict[str, Tuple[Any, Callable[[Any], Dict[str, Any]]]] = {
+    "friends": (
+        Friends,
+        lambda record: {"full_name": record["username"], "url": record["url"]},
+    ),
+    "images": (Image, lambda record: {"url": record}),
+    "places": (
+        Places,
+        lambda record: {"name": record["name"], "date": record["date"]},
+    ),
+    "work_and_education": (WorkAndEducation, lambda record: {"name": record["name"]}),
+    "family_members": (
+        FamilyMember,
+        lambda record: {
+            "full_name": record["name"],
+            "role": record["relationship"],
+            "url": record["url"],
+        },
+    ),
+    "recent_places": (
+        RecentPlaces,
+        lambda record: {"localization": record["localization"], "date": record["date"]},
+    ),
+    "reels": (Reels, lambda record: {"url": record}),
+    "videos": (Videos, lambda record: {"url": record}),
+    "reviews": (
+        Reviews,
+        lambda record: {"company": record["company"], "review": _opinion(record)},
+    ),
+    "posts": (Posts, lambda record: {"url": record}),
+    "post_details": (
+        Posts,
+        lambda record: {
+            "url": record["url"],
+            "content": record["content"],
+            "number_of_likes": record["number_of_likes"],
+            "image_urls": record["image_url"],
+            "author": record["author"],
+        },
+    ),
+    "likes": (Likes, lambda record: {"name": record}),
+    "groups": (Groups, lambda record: {"name": record["name"], "url": record["url"]}),
+    "events": (Events, lambda record: {"name": record["name"], "url": record["url"]}),
+    "instagram_images": (InstagramImages, lambda record: {"url": record}),
+}
+
+
+def infer_section(record: Any) -> Optional[str]:
+    """Return section of a record from legacy JSON files by its keys
+    Lists of strings and name/url pairs (events or groups) can't be recognized"""
+    if not isinstance(record, dict):
+        return None
+    keys = set(record)
+    if {"username", "url"} <= keys:
+        return "friends"
+    if {"name", "relationship"} <= keys:
+        return "family_members"
+    if {"company", "opinions"} <= keys:
+        return "reviews"
+    if {"localization", "date"} <= keys:
+        return "recent_places"
+    if {"phone_number", "email"} <= keys:
+        return "contact"
+    if {"url", "content", "image_url"} <= keys:
+        return "post_details"
+    if keys == {"name", "date"}:
+        return "places"
+    if keys == {"name"}:
+        return "work_and_education"
+    return None
+
+
+def read_file(path: str) -> Tuple[str, Optional[str], List[Any]]:
+    """Return owner (facebook id, instagram username or search query), section and records of
+    a JSONL segment or a legacy JSON file"""
+    filename = os.path.basename(path)
+    segment = SEGMENT_FILE.match(filename)
+    if segment:
+        owner = os.path.basename(os.path.dirname(path))
+        records = [record["data"] for record in read_records(path)]
+        return owner, segment.group("section"), records
+
+    with open(path, "rb") as file:
+        data = orjson.loads(file.read())
+    records = data if isinstance(data, list) else [data]
+    legacy = LEGACY_FILE.match(filename)
+    owner = legacy.group("owner") if legacy else os.path.splitext(filename)[0]
+    return owner, infer_section(records[0]) if records else None, records
+
+
+def parse_file(
+    path: str, section: Optional[str] = None
+) -> Tuple[str, Optional[Dict[str, List[Dict[str, Any]]]]]:
+    """Return owner of the file and values of rows to insert, grouped by table
+    section is used for legacy files which section can't be inferred (e.g. lists of urls),
+    rows are None if the file is skipped. Runs in worker processes"""
+    try:
+        owner, inferred, records = read_file(path)
+    except Exception as e:
+        logs.log_error(f"Skipping {path}, it can't be read: {e}")
+        return "", None
+
+    if not records:
+        return owner, {}
+    section = inferred or section
+
+    if section == "post_details" and owner.startswith("http"):
+        owner = ANONYMOUS
+
+    if section == "contact":
+        values = {}
+        for record in records:
+            values.update(
+                {
+                    key: record.get(key)
+                    for key in ("phone_number", "email")
+                    if record.get(key)
+                }
+            )
+        return owner, {PERSON_UPDATES: [values]} if values else {}
+    if section == "full_name":
+        return owner, {PERSON_UPDATES: [{"full_name": records[-1]}]}
+    if section is None:
+        logs.log_error(
+            f"Skipping {path}, its section isn't known, pass it with --section"
+        )
+        return owner, None
+    if section not in ROW_BUILDERS:
+        logs.log_error(f"Skipping {path}, {section} data isn't imported")
+        return owner, None
+
+    model, build_row = ROW_BUILDERS[section]
+    rows = []
+    for record in records:
+        try:
+            rows.append(build_row(record))
+        except (KeyError, TypeError) as e:
+            logs.log_error(f"Skipping invalid {section} record in {path}: {e}")
+    return owner, {model.__tablename__: rows}
+
+
+class DataImporter:
+    """
+    Load scraped data archives back into the database
+
+    Files are decoded in a process pool, rows are inserted in bulk in batches of
+    Config.IMPORT_BATCH_SIZE. Rows that already exist in the database (or earlier in the
+    import) are skipped by the unique index of the table, so the same archives can be
+    imported more than once. Legacy files of an unknown section are skipped unless
+    the section is given. The whole import is a single transaction, nothing is saved if it fails.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.JSON_FILE_PATH,
+        workers: int = Config.IMPORT_WORKERS,
+        batch_size: int = Config.IMPORT_BATCH_SIZE,
+        section: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.section = section
+        self.session = None
+        self._owners: Dict[Tuple[Any, str], int] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._person_updates: Dict[int, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {}
+        self.skipped = 0
+
+    def get_files(self) -> List[str]:
+        """Return paths of JSONL segments and JSON files, index files are skipped"""
+        if os.path.isfile(self.path):
+            return [self.path]
+
+        paths = []
+        for directory, _, filenames in os.walk(self.path):
+            for filename in sorted(filenames):
+                if SEGMENT_FILE.match(filename) or filename.endswith(".json"):
+                    paths.append(os.path.join(directory, filename))
+        return sorted(paths)
+
+    def get_owner_id(self, model, owner: str) -> int:
+        """Return id of the person (or instagram account), missing ones are created"""
+        if (model, owner) not in self._owners:
+            if model is InstagramAccount:
+                column, values = InstagramAccount.username, {"username": owner}
+            else:
+                column, values = Person.facebook_id, {"facebook_id": owner}
+
+            owner_id = self.session.scalar(select(model.id).where(column == owner))
+            if owner_id is None:
+                owner_id = self.session.scalar(
+                    insert(model).values(**values).returning(model.id)
+                )
+            self._owners[(model, owner)] = owner_id
+        return self._owners[(model, owner)]
+
+    @staticmethod
+    def get_model(table: str):
+        return next(
+            model for model, _ in ROW_BUILDERS.values() if model.__tablename__ == table
+        )
+
+    def add_rows(self, owner: str, tables: Dict[str, List[Dict[str, Any]]]) -> None:
+        for table, rows in tables.items():
+            if table == PERSON_UPDATES:
+                person_id = self.get_owner_id(Person, owner)
+                for values in rows:
+                    self._person_updates.setdefault(person_id, {}).update(values)
+                continue
+
+            if table == InstagramImages.__tablename__:
+                owner_column = "account_id"
+                owner_id = self.get_owner_id(InstagramAccount, owner)
+            else:
+                owner_column = "person_id"
+                owner_id = self.get_owner_id(Person, owner)
+
+            pending = self._pending.setdefault(table, [])
+            for row in rows:
+                row[owner_column] = owner_id
+                pending.append(row)
+
+            if len(pending) >= self.batch_size:
+                self.flush(table)
+
+    def insert_ignore(self, table: str):
+        """Return INSERT statement skipping rows which break the unique index of the table"""
+        dialect = (
+            postgresql
+            if self.session.get_bind().dialect.name == "postgresql"
+            else sqlite
+        )
+        return dialect.insert(self.get_model(table).__table__).on_conflict_do_nothing()
+
+    def flush(self, table: str) -> None:
+        """Insert pending rows of the table, they are committed at the end of the import"""
+        rows = self._pending.pop(table, [])
+        if not rows:
+            return
+        # Rows of different sections of the same table (posts, post_details) have other columns
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+
+        statement = self.insert_ignore(table)
+        inserted = 0
+        with metrics.timer(f"import.{table}", items=len(rows)):
+            for group in groups.values():
+                inserted += self.session.execute(statement, group).rowcount
+        if inserted:
+            self.counts[table] = self.counts.get(table, 0) + inserted
+
+    def update_persons(self) -> None:
+        if not self._person_updates:
+            return
+        self.session.execute(
+            update(Person),
+            [
+                {"id": person_id, **values}
+                for person_id, values in self._person_updates.items()
+            ],
+        )
+        self.counts[PERSON_UPDATES] = len(self._person_updates)
+
+    def parse_files(self, paths: List[str]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(
+                partial(parse_file, section=self.section), paths, chunksize=4
+            )
+
+    @metrics.track_pipeline
+    def import_data(self) -> Dict[str, int]:
+        """Import all files, return number of inserted rows of every table"""
+        paths = self.get_files()
+        self.session = get_session()
+        try:
+            with Progress() as progress:
+                task = progress.add_task("[cyan]Importing...", total=len(paths))
+                for owner, tables in self.parse_files(paths):
+                    if tables is None:
+                        self.skipped += 1
+                    elif tables:
+                        self.add_rows(owner, tables)
+                    progress.update(task, advance=1)
+
+            for table in list(self._pending):
+                self.flush(table)
+            self.update_persons()
+            with metrics.timer("db_write"):
+                self.session.commit()
+
+        except Exception as e:
+            self.session.rollback()
+            self.counts = {}
+            logs.log_error(f"An error occurred while importing data: {e}")
+            rprint(f"An error occurred {e}")
+        finally:
+            self.session.close()
+
+        for table, count in self.counts.items():
+            rprint(f"{table}: {count} rows")
+        if self.skipped:
+            rprint(f"Skipped files: {self.skipped}, see {Config.LOG_FILE_PATH}")
+        return self.counts
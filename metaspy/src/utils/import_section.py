@@ -0,0 +1,24 @@
+from enum import Enum
+
+
+class ImportSection(str, Enum):
+    """Section of imported legacy files which can't be inferred from their records,
+    kept apart from the importer so the CLI can use it without importing orjson"""
+
+    FRIENDS = "friends"
+    IMAGES = "images"
+    PLACES = "places"
+    WORK_AND_EDUCATION = "work_and_education"
+    FAMILY_MEMBERS = "family_members"
+    RECENT_PLACES = "recent_places"
+    REELS = "reels"
+    VIDEOS = "videos"
+    REVIEWS = "reviews"
+    POSTS = "posts"
+    POST_DETAILS = "post_details"
+    LIKES = "likes"
+    GROUPS = "groups"
+    EVENTS = "events"
+    INSTAGRAM_IMAGES = "instagram_images"
+    CONTACT = "contact"
+    FULL_NAME = "full_name"
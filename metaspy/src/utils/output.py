@@ -1,12 +1,11 @@
 from typing import List, Dict
 from rich import print as rprint
 
+from ..reporting import reporter
 
-def print_data_from_list_of_dict(data: List[Dict]) -> None:
-    rprint("[bold green] Scraped data: [/bold green]")
 
-    for entry in data:
-        rprint(f" - {entry}")
+def print_data_from_list_of_dict(data: List[Dict]) -> None:
+    reporter.print_items(data)
 
 
 def print_data_from_dict(data: Dict) -> None:
@@ -21,10 +20,7 @@ def print_string(data: str) -> None:
 
 
 def print_list(data: List) -> None:
-    rprint("[bold green] Scraped data: [/bold green]")
-
-    for item in data:
-        rprint(f" - {item}")
+    reporter.print_items(data)
 
 
 def print_no_data_info() -> None:
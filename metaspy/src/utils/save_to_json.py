@@ -1,39 +1,168 @@
-import json
-from typing import List, Dict, Any
+import gzip
+import os
+import re
 from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+
 from ..config import Config
-import os
+from ..logs import Logs
+from ..metrics import metrics
+
+logs = Logs()
+
+EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
 
-config = Config()
+def safe_name(name: str) -> str:
+    """Return name usable as a file name, e.g. for urls of posts"""
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+def _zstandard():
+    """zstandard is an optional dependency, it's needed only for zstd compression"""
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
 
 
 class SaveJSON:
+    """
+    Append scraped data to the JSONL archive of a person (or search query)
+
+    Records are appended to scraped_data/<id>/<section>.<segment>.jsonl, a new segment is started
+    when the current one is bigger than Config.JSONL_ROTATE_SIZE. Segments can be compressed
+    with gzip or zstd, every save() appends one compressed member. The byte offset and length
+    of every save() are written to scraped_data/<id>/<section>.index.jsonl
+    """
+
     def __init__(
         self,
         facebook_id: str,
-        data: List[Dict[str, Any]] | List[str],
+        data: List[Dict[str, Any]] | List[str] | Dict[str, Any],
+        section: str = "data",
     ):
         self.facebook_id = facebook_id
         self.data = data
+        self.section = section
+
+    @property
+    def records(self) -> List[Any]:
+        return self.data if isinstance(self.data, list) else [self.data]
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(Config.JSON_FILE_PATH, safe_name(self.facebook_id))
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, f"{self.section}.index.jsonl")
 
     @staticmethod
-    def get_timestamp() -> str:
-        """Generate timestamp"""
-        dt = datetime.now()
-        timestamp = datetime.timestamp(dt)
-        return str(timestamp).replace(" ", "_")
+    def get_compression() -> Optional[str]:
+        """Return configured compression, gzip is used if zstandard is not installed"""
+        compression = Config.JSONL_COMPRESSION
+        if compression == "zstd" and _zstandard() is None:
+            logs.log_error("zstandard is not installed, using gzip compression")
+            return "gzip"
+        return compression
+
+    def get_segments(self) -> List[str]:
+        """Return file names of the section segments, the oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        pattern = re.compile(rf"^{re.escape(self.section)}\.\d+\.jsonl(\.gz|\.zst)?$")
+        return sorted(
+            filename
+            for filename in os.listdir(self.directory)
+            if pattern.match(filename)
+        )
+
+    def get_segment_path(self, extension: str) -> str:
+        """Return path of the segment the records are appended to
+        A new segment is started if the current one is too big or uses other compression
+        """
+        segments = self.get_segments()
+        if segments:
+            current = os.path.join(self.directory, segments[-1])
+            if (
+                current.endswith(f".jsonl{extension}")
+                and os.path.getsize(current) < Config.JSONL_ROTATE_SIZE
+            ):
+                return current
 
-    def generate_file_name(self) -> str:
-        """Generate filename including module name, facebook id and timestamp"""
-        filename = f"{self.facebook_id}_{self.get_timestamp()}.json"
-        return filename
+        number = int(segments[-1].split(".")[1]) + 1 if segments else 1
+        return os.path.join(
+            self.directory, f"{self.section}.{number:05d}.jsonl{extension}"
+        )
+
+    def encode(self, scraped_at: str) -> bytes:
+        """Return records as JSON lines"""
+        return b"".join(
+            orjson.dumps({"scraped_at": scraped_at, "data": record}) + b"\n"
+            for record in self.records
+        )
+
+    @staticmethod
+    def compress(payload: bytes, compression: Optional[str]) -> bytes:
+        if compression == "gzip":
+            return gzip.compress(payload)
+        if compression == "zstd":
+            return _zstandard().ZstdCompressor().compress(payload)
+        return payload
 
     def save(self) -> None:
-        """Save scraped data to JSON file"""
-        dir = Config.JSON_FILE_PATH
-        if not os.path.exists(dir):
-            os.makedirs(dir)
-        with open(f"{dir}/{self.generate_file_name()}", "w", encoding="utf-8") as f:
-            json.dump(
-                self.data, f, indent=config.INDENT, ensure_ascii=config.ENSURE_ASCII
-            )
+        """Append scraped data to the current segment and its offset to the index"""
+        if not self.data:
+            return
+
+        with metrics.timer("json_save", items=len(self.records)):
+            os.makedirs(self.directory, exist_ok=True)
+            scraped_at = datetime.now().isoformat()
+            compression = self.get_compression()
+            payload = self.compress(self.encode(scraped_at), compression)
+            segment_path = self.get_segment_path(EXTENSIONS[compression])
+
+            with open(segment_path, "ab") as file:
+                offset = file.tell()
+                file.write(payload)
+
+            entry = {
+                "segment": os.path.basename(segment_path),
+                "offset": offset,
+                "length": len(payload),
+                "count": len(self.records),
+                "scraped_at": scraped_at,
+                "run_id": metrics.run_id,
+            }
+            with open(self.index_path, "ab") as file:
+                file.write(orjson.dumps(entry) + b"\n")
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records of a JSONL segment, compressed segments are decompressed while reading"""
+    if path.endswith(".gz"):
+        file = gzip.open(path, "rb")
+    elif path.endswith(".zst"):
+        file = (
+            _zstandard()
+            .ZstdDecompressor()
+            .stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        )
+    else:
+        file = open(path, "rb")
+
+    with file:
+        buffer = b""
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line:
+                    yield orjson.loads(line)
+        if buffer.strip():
+            yield orjson.loads(buffer)